@@ -0,0 +1,91 @@
+"""
+Canonical city keys.
+
+``city_key`` turns a free-text city into the key stored next to it on
+CustomerProfile and ProviderProfile (on every save, see CityKeyMixin): accents and case folded, punctuation
+dropped, whitespace collapsed, and former or alternate names resolved to
+the gazetteer's name (``"Bangalore"`` and ``" bengaluru "`` are both
+``"bengaluru"``). Provider search compares keys, so it is an exact match
+on an indexed column.
+
+After changing ALIASES, run ``manage.py backfill_city_keys`` to rekey
+existing profiles.
+"""
+
+import re
+import unicodedata
+
+# Alternate spelling -> gazetteer name, both in key form.
+ALIASES = {
+    "allahabad": "prayagraj",
+    "banaras": "varanasi",
+    "bangalore": "bengaluru",
+    "baroda": "vadodara",
+    "belgaum": "belagavi",
+    "bellary": "ballari",
+    "benares": "varanasi",
+    "bengaluru urban": "bengaluru",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "calicut": "kozhikode",
+    "cochin": "kochi",
+    "ernakulam": "kochi",
+    "gulbarga": "kalaburagi",
+    "gurgaon": "gurugram",
+    "hubli": "hubballi",
+    "hubli dharwad": "hubballi",
+    "madras": "chennai",
+    "mangalore": "mangaluru",
+    "mysore": "mysuru",
+    "new delhi": "delhi",
+    "new mumbai": "navi mumbai",
+    "panjim": "panaji",
+    "pondicherry": "puducherry",
+    "poona": "pune",
+    "secunderabad": "hyderabad",
+    "simla": "shimla",
+    "trichy": "tiruchirappalli",
+    "trivandrum": "thiruvananthapuram",
+    "vizag": "visakhapatnam",
+}
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(city):
+    """Accent-, case- and punctuation-insensitive form of ``city``."""
+    text = unicodedata.normalize("NFKD", city or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_SEPARATORS.sub(" ", text.casefold()).split())
+
+
+def city_key(city):
+    """The canonical key for ``city``; empty when it has no letters or digits."""
+    key = normalize(city)
+    return ALIASES.get(key, key)
+
+
+def backfill(model, batch_size=1000, dry_run=False):
+    """
+    Recompute ``city_key`` for every row of ``model`` (a profile model, or
+    its historical version in a migration). Returns the number of rows
+    whose key changed; with ``dry_run`` nothing is written.
+    """
+    changed = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "city", "city_key")[:batch_size]
+        )
+        if not rows:
+            return changed
+        last_pk = rows[-1].pk
+        stale = []
+        for row in rows:
+            key = city_key(row.city)
+            if row.city_key != key:
+                row.city_key = key
+                stale.append(row)
+        changed += len(stale)
+        if stale and not dry_run:
+            model.objects.bulk_update(stale, ["city_key"], batch_size=batch_size)
@@ -0,0 +1,189 @@
+"""
+Offline coordinate-to-city lookups against a gazetteer of city centroids.
+
+The dataset lives in GazetteerCity (load or refresh it with
+``manage.py load_gazetteer``); until it is loaded the bundled
+accounts/data/gazetteer_in.csv is used as is. Each process builds a k-d
+tree over the centroids as unit vectors on first use, so a lookup is a
+nearest-neighbour walk in memory: no network, no query. Chord distance on
+the unit sphere orders points exactly like great-circle distance, so the
+tree needs no special handling near the antimeridian or the poles.
+"""
+
+import csv
+import math
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import GazetteerCity
+
+BUNDLED_DATASET = Path(__file__).resolve().parent / "data" / "gazetteer_in.csv"
+EARTH_RADIUS_KM = 6371.0088
+FIELDS = ("name", "state", "country", "latitude", "longitude")
+
+
+def unit_vector(lat, lon):
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+class KDTree:
+    """Static 3-d tree; ``nearest`` returns (index, squared distance)."""
+
+    def __init__(self, points):
+        self.points = points
+        # node -> (point index, split axis, left node, right node); -1 is empty.
+        self._nodes = []
+        self._root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indexes, depth):
+        if not indexes:
+            return -1
+        axis = depth % 3
+        indexes.sort(key=lambda i: self.points[i][axis])
+        mid = len(indexes) // 2
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(indexes[:mid], depth + 1)
+        right = self._build(indexes[mid + 1:], depth + 1)
+        self._nodes[node] = (indexes[mid], axis, left, right)
+        return node
+
+    def nearest(self, target):
+        nodes = self._nodes
+        points = self.points
+        tx, ty, tz = target
+        best_index = -1
+        best = math.inf
+        # (node, squared distance from the target to that subtree's splitting plane)
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane = stack.pop()
+            if node < 0 or plane >= best:
+                continue
+            index, axis, left, right = nodes[node]
+            px, py, pz = points[index]
+            distance = (px - tx) ** 2 + (py - ty) ** 2 + (pz - tz) ** 2
+            if distance < best:
+                best_index, best = index, distance
+            diff = target[axis] - points[index][axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Near side first (pushed last); the far side is skipped on pop
+            # once the best match is closer than the splitting plane.
+            stack.append((far, diff * diff))
+            stack.append((near, 0.0))
+        return best_index, best
+
+
+class Gazetteer:
+    def __init__(self, cities):
+        self.cities = cities
+        self.tree = KDTree([unit_vector(c["latitude"], c["longitude"]) for c in cities])
+
+    def nearest(self, lat, lon, max_km=None):
+        """The closest city to (lat, lon), or None if there is none within ``max_km``."""
+        if not self.cities:
+            return None
+        index, chord_squared = self.tree.nearest(unit_vector(lat, lon))
+        km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+        if max_km is not None and km > max_km:
+            return None
+        city = self.cities[index]
+        return {
+            "city": city["name"],
+            "state": city["state"],
+            "country": city["country"],
+            "distance_km": round(km, 1),
+        }
+
+
+def read_dataset(path=BUNDLED_DATASET):
+    """Rows of a gazetteer CSV with a name,state,country,latitude,longitude header."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            try:
+                lat = float(row["latitude"])
+                lon = float(row["longitude"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"{path}:{line}: latitude and longitude must be numbers")
+            name = (row.get("name") or "").strip()
+            if not name or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError(f"{path}:{line}: needs a name and in-range coordinates")
+            rows.append({
+                "name": name,
+                "state": (row.get("state") or "").strip(),
+                "country": (row.get("country") or "").strip(),
+                "latitude": lat,
+                "longitude": lon,
+            })
+    return rows
+
+
+def load_dataset(rows, replace=False):
+    """Upsert ``rows`` into GazetteerCity; with ``replace``, drop cities not in them.
+
+    Returns ``(upserted, deleted)``.
+    """
+    cities = [GazetteerCity(**row) for row in rows]
+    deleted = 0
+    with transaction.atomic():
+        GazetteerCity.objects.bulk_create(
+            cities,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["name", "state", "country"],
+            update_fields=["latitude", "longitude", "updated_at"],
+        )
+        if replace:
+            keep = {(row["name"], row["state"], row["country"]) for row in rows}
+            stale = [
+                pk
+                for pk, name, state, country in GazetteerCity.objects.values_list("pk", "name", "state", "country")
+                if (name, state, country) not in keep
+            ]
+            deleted, _ = GazetteerCity.objects.filter(pk__in=stale).delete()
+    return len(cities), deleted
+
+
+def _signature():
+    return tuple(GazetteerCity.objects.aggregate(count=Count("id"), latest=Max("updated_at")).values())
+
+
+def _build():
+    cities = list(GazetteerCity.objects.values(*FIELDS))
+    return Gazetteer(cities or read_dataset())
+
+
+_index = None
+_index_signature = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """This process's index; rebuilt when the table has changed, checked every GAZETTEER_REFRESH_SECONDS."""
+    global _index, _index_signature, _checked_at
+    refresh = float(getattr(settings, "GAZETTEER_REFRESH_SECONDS", 600))
+    with _index_lock:
+        now = time.monotonic()
+        if _index is None or now - _checked_at >= refresh:
+            signature = _signature()
+            if _index is None or signature != _index_signature:
+                _index = _build()
+                _index_signature = signature
+            _checked_at = now
+        return _index
+
+
+def nearest_city(lat, lon, max_km=None):
+    if max_km is None:
+        max_km = float(getattr(settings, "GAZETTEER_MAX_DISTANCE_KM", 75))
+    return get_gazetteer().nearest(lat, lon, max_km=max_km)
@@ -0,0 +1,256 @@
+"""
+Cached reverse geocoding for ReverseGeocodeAPIView.
+
+Coordinates are bucketed into geohash cells of GEOCODE_PRECISION characters
+(9 is about 5 m square, so one cell is one street address), and each cell
+is resolved upstream at most once per TTL:
+
+1. an in-process LRU of recent cells;
+2. the GeocodeCacheEntry table, shared by every worker and restarts;
+3. the upstream client, with concurrent lookups of one cell coalesced so
+   only the first caller goes out and the rest wait for its answer.
+
+Cells the upstream has no address for are stored too (negative caching,
+shorter TTL). Upstream failures are remembered in memory only, briefly,
+so an outage does not turn every request into a full timeout.
+
+Every resolved address also stores its city-level fields (no
+``display_name``) under the coarser locality cell around it
+(GEOCODE_LOCALITY_PRECISION; 6 is about 1 km). Those are only served when
+the upstream is unavailable, so a street address is never handed to a
+caller standing somewhere else.
+
+The client is the import path in GEOCODE_CLIENT: any class with
+``reverse(lat, lon)`` returning a result dict or None, and raising
+GeocodeUnavailable on failure.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import timedelta
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import GeocodeCacheEntry
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+EMPTY_RESULT = {
+    "display_name": "",
+    "city": "",
+    "postcode": "",
+    "state": "",
+    "country": "",
+}
+
+
+LOCALITY_FIELDS = ("city", "postcode", "state", "country")
+
+
+class GeocodeUnavailable(Exception):
+    pass
+
+
+def locality(result):
+    """The city-level part of ``result``, without the street address."""
+    return {**EMPTY_RESULT, **{field: result.get(field, "") for field in LOCALITY_FIELDS}}
+
+
+def geohash(lat, lon, precision):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+class NominatimClient:
+    url = "https://nominatim.openstreetmap.org/reverse"
+
+    def reverse(self, lat, lon):
+        req = Request(
+            f"{self.url}?format=jsonv2&lat={lat}&lon={lon}&zoom=18&addressdetails=1",
+            headers={
+                "User-Agent": "serviceapp/1.0 (support@serviceapp.local)",
+                "Accept": "application/json",
+            },
+        )
+        timeout = float(getattr(settings, "GEOCODE_TIMEOUT_SECONDS", 5))
+        try:
+            with urlopen(req, timeout=timeout) as resp:
+                payload = json.loads(resp.read().decode("utf-8"))
+        except Exception as exc:
+            raise GeocodeUnavailable(str(exc))
+
+        if not isinstance(payload, dict) or payload.get("error"):
+            return None
+        addr = payload.get("address", {}) or {}
+        return {
+            "display_name": payload.get("display_name", ""),
+            "city": addr.get("city") or addr.get("town") or addr.get("village") or addr.get("county") or "",
+            "postcode": addr.get("postcode", ""),
+            "state": addr.get("state", ""),
+            "country": addr.get("country", ""),
+        }
+
+
+class ReverseGeocoder:
+    def __init__(self, client, precision=9, locality_precision=6, lru_size=5000,
+                 ttl=30 * 86400, negative_ttl=86400, error_ttl=30, clock=time.time):
+        self.client = client
+        self.precision = precision
+        self.locality_precision = locality_precision
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        # cell -> (expires_at, result or None, error or None)
+        self._lru = OrderedDict()
+        self._inflight = {}
+
+    def reverse(self, lat, lon):
+        """The result dict for the address cell of (lat, lon), or None if it has no address.
+
+        While the upstream is unavailable, falls back to the city-level
+        fields of the surrounding locality cell when those are cached.
+        """
+        cell = geohash(lat, lon, self.precision)
+        try:
+            found, result = self._cached(cell)
+            if found:
+                return result
+            return self._fetch(cell, lat, lon)
+        except GeocodeUnavailable:
+            found, area = self._cached(geohash(lat, lon, self.locality_precision))
+            if found and area:
+                return area
+            raise
+
+    def _cached(self, cell):
+        """``(found, result)`` from memory or the table; raises for a remembered failure."""
+        hit = self._memory_get(cell)
+        if hit is not None:
+            result, error = hit
+            if error:
+                raise GeocodeUnavailable(error)
+            return True, result
+
+        stored = self._load(cell)
+        if stored is not None:
+            result, expires_at = stored
+            self._memory_put(cell, expires_at, result)
+            return True, result
+        return False, None
+
+    def _fetch(self, cell, lat, lon):
+        with self._lock:
+            future = self._inflight.get(cell)
+            leader = future is None
+            if leader:
+                future = self._inflight[cell] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            try:
+                result = self.client.reverse(lat, lon)
+            except GeocodeUnavailable as exc:
+                self._memory_put(cell, self.clock() + self.error_ttl, None, error=str(exc))
+                raise
+            ttl = self.ttl if result else self.negative_ttl
+            self._store(cell, result, ttl)
+            if result:
+                self._store(geohash(lat, lon, self.locality_precision), locality(result), self.ttl)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(cell, None)
+
+    def _store(self, cell, result, ttl):
+        self._save(cell, result, ttl)
+        self._memory_put(cell, self.clock() + ttl, result)
+
+    def _memory_get(self, cell):
+        with self._lock:
+            entry = self._lru.get(cell)
+            if entry is None:
+                return None
+            expires_at, result, error = entry
+            if expires_at <= self.clock():
+                del self._lru[cell]
+                return None
+            self._lru.move_to_end(cell)
+            return result, error
+
+    def _memory_put(self, cell, expires_at, result, error=None):
+        with self._lock:
+            self._lru[cell] = (expires_at, result, error)
+            self._lru.move_to_end(cell)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _load(self, cell):
+        entry = GeocodeCacheEntry.objects.filter(cell=cell, expires_at__gt=timezone.now()).first()
+        if entry is None:
+            return None
+        return entry.result, entry.expires_at.timestamp()
+
+    def _save(self, cell, result, ttl):
+        now = timezone.now()
+        GeocodeCacheEntry.objects.update_or_create(
+            cell=cell,
+            defaults={"result": result, "fetched_at": now, "expires_at": now + timedelta(seconds=ttl)},
+        )
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            client_class = import_string(getattr(settings, "GEOCODE_CLIENT", "accounts.geocode.NominatimClient"))
+            _geocoder = ReverseGeocoder(
+                client_class(),
+                precision=int(getattr(settings, "GEOCODE_PRECISION", 9)),
+                locality_precision=int(getattr(settings, "GEOCODE_LOCALITY_PRECISION", 6)),
+                lru_size=int(getattr(settings, "GEOCODE_LRU_SIZE", 5000)),
+                ttl=int(getattr(settings, "GEOCODE_CACHE_TTL_SECONDS", 30 * 86400)),
+                negative_ttl=int(getattr(settings, "GEOCODE_NEGATIVE_TTL_SECONDS", 86400)),
+                error_ttl=int(getattr(settings, "GEOCODE_ERROR_TTL_SECONDS", 30)),
+            )
+        return _geocoder
+
+
+def reverse(lat, lon):
+    return get_geocoder().reverse(lat, lon)
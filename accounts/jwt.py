@@ -1,8 +1,41 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def user_claims(user):
+    return {
+        "role": user.role,
+        "is_active": user.is_active,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+    }
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token (and, by copy, its access tokens) carrying the user's role and flags."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
 
 
 class CaseInsensitiveTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
     def validate(self, attrs):
         username = (attrs.get(self.username_field) or "").strip()
         if username:
@@ -10,3 +43,97 @@ class CaseInsensitiveTokenObtainPairSerializer(TokenObtainPairSerializer):
             if user:
                 attrs[self.username_field] = user.username
         return super().validate(attrs)
+
+
+class UserCache:
+    """
+    Per-process LRU of authenticated users with a short TTL.
+
+    Entries are dropped on User/UserPhone saves in this process (see
+    accounts/signals.py); other processes see the change once the TTL runs
+    out. Callers get a copy, so a view mutating ``request.user`` never
+    touches the cached instance. Keys are ``str(pk)``, matching the user id
+    claim simplejwt writes.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= self.clock():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+        return copy.copy(user)
+
+    def put(self, user):
+        ttl = float(getattr(settings, "AUTH_USER_CACHE_SECONDS", 30))
+        if ttl <= 0:
+            return
+        size = int(getattr(settings, "AUTH_USER_CACHE_SIZE", 10000))
+        with self._lock:
+            self._users[str(user.pk)] = (self.clock() + ttl, copy.copy(user))
+            self._users.move_to_end(str(user.pk))
+            while len(self._users) > size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the user from ``user_cache``.
+
+    Tokens issued by ClaimsRefreshToken carry role and is_active: an
+    inactive claim is rejected without any lookup, and a cached user whose
+    role no longer matches the token is reloaded. The cached user's own
+    is_active still decides access, so deactivation takes effect within
+    AUTH_USER_CACHE_SECONDS everywhere (at once in the process that did it).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if validated_token.get("is_active") is False:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        user = user_cache.get(user_id)
+        role = validated_token.get("role")
+        if user is not None and role is not None and user.role != role:
+            user = None
+        if user is None:
+            user = self._load_user(user_id)
+            user_cache.put(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+    def _load_user(self, user_id):
+        try:
+            # ProfileAPIView reads the phone, so it rides along in the cache.
+            return self.user_model.objects.select_related("phone_record").get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from accounts.cities import backfill
+from accounts.models import CustomerProfile, ProviderProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the canonical city_key of every customer and provider profile, "
+        "in batches. Run after changing accounts.cities.ALIASES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would change.")
+
+    def handle(self, *args, **options):
+        verb = "would be rekeyed" if options["dry_run"] else "rekeyed"
+        for model in (CustomerProfile, ProviderProfile):
+            changed = backfill(model, batch_size=options["batch_size"], dry_run=options["dry_run"])
+            self.stdout.write(f"{model.__name__}: {changed} row(s) {verb}.")
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("City keys are up to date."))
@@ -0,0 +1,55 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.gazetteer import get_gazetteer, unit_vector
+
+# Roughly the bounding box of India, where the bundled dataset lives.
+LAT_RANGE = (8.0, 35.0)
+LON_RANGE = (68.0, 97.0)
+
+
+class Command(BaseCommand):
+    help = "Measure gazetteer lookups per second and check them against a linear scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lookups", type=int, default=100000)
+        parser.add_argument("--verify", type=int, default=1000,
+                            help="How many of the lookups to check against a brute-force scan.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        points = [
+            (rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE))
+            for _ in range(options["lookups"])
+        ]
+
+        started = time.perf_counter()
+        gazetteer = get_gazetteer()
+        built = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for lat, lon in points:
+            gazetteer.nearest(lat, lon)
+        elapsed = time.perf_counter() - started
+
+        mismatches = 0
+        centroids = gazetteer.tree.points
+        for lat, lon in points[: options["verify"]]:
+            target = unit_vector(lat, lon)
+            expected = min(
+                range(len(centroids)),
+                key=lambda i: sum((a - b) ** 2 for a, b in zip(centroids[i], target)),
+            )
+            if gazetteer.nearest(lat, lon)["city"] != gazetteer.cities[expected]["name"]:
+                mismatches += 1
+
+        self.stdout.write(
+            f"{len(gazetteer.cities)} cities, index built in {built * 1000:.1f} ms\n"
+            f"{len(points)} lookups in {elapsed:.3f}s: "
+            f"{len(points) / elapsed:,.0f} lookups/s, {elapsed / len(points) * 1e6:.1f} us/lookup\n"
+            f"{mismatches} mismatch(es) against a linear scan of {min(options['verify'], len(points))} lookups"
+        )
+
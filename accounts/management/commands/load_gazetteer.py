@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.gazetteer import BUNDLED_DATASET, read_dataset, load_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Load or refresh the city gazetteer from a CSV (name,state,country,latitude,longitude). "
+        "Defaults to the bundled dataset; running processes pick the change up within "
+        "GAZETTEER_REFRESH_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=str(BUNDLED_DATASET), help="CSV to load.")
+        parser.add_argument("--replace", action="store_true",
+                            help="Also delete cities that are not in the file.")
+
+    def handle(self, *args, **options):
+        try:
+            rows = read_dataset(options["file"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        upserted, deleted = load_dataset(rows, replace=options["replace"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {upserted} cit(ies) from {options['file']}; removed {deleted}."
+        ))
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import PhoneOTP
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete PhoneOTP rows that expired more than --hours ago, in batches. "
+        "Used and unused codes are both removed once expired."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int,
+                            default=int(getattr(settings, "OTP_RETENTION_HOURS", 24)))
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would go.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        expired = PhoneOTP.objects.filter(expires_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} OTP(s) expired before {cutoff:%Y-%m-%d %H:%M} would be purged.")
+            return
+
+        total = 0
+        while True:
+            # Short batches keep each DELETE's locks and WAL footprint small.
+            ids = list(expired.order_by("expires_at").values_list("id", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            deleted, _ = PhoneOTP.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {total} OTP(s) expired before {cutoff:%Y-%m-%d %H:%M}."
+        ))
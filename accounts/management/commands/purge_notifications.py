@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import Notification, NotificationCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications older than the retention window in batches. "
+        "Unread notifications are never purged, so unread counters are unaffected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            default=int(getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)))
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would go.")
+        parser.add_argument("--rebuild-counters", action="store_true",
+                            help="Also recompute every per-user unread counter from the table.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} read notification(s) older than {cutoff:%Y-%m-%d} would be purged.")
+            return
+
+        total = 0
+        while True:
+            # Short batches keep each DELETE's locks and WAL footprint small.
+            ids = list(expired.order_by("created_at").values_list("id", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            deleted, _ = Notification.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {total} read notification(s) older than {cutoff:%Y-%m-%d}."
+        ))
+        if options["rebuild_counters"]:
+            rebuilt = NotificationCounter.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt unread counters for {rebuilt} user(s)."))
@@ -0,0 +1,76 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.query_budget import percentile
+
+
+class Command(BaseCommand):
+    help = "Aggregate the QueryBudgetMiddleware request log into a per-route report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=None, help="Log file (defaults to QUERY_BUDGET_LOG).")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["log"] or getattr(settings, "QUERY_BUDGET_LOG", "")
+        if not path:
+            raise CommandError("Pass --log or set QUERY_BUDGET_LOG")
+
+        grouped = defaultdict(list)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    grouped[(entry["method"], entry["route"])].append(entry)
+        except FileNotFoundError:
+            raise CommandError(f"Log file not found: {path}")
+
+        budgets = getattr(settings, "QUERY_BUDGETS", {})
+        report = []
+        for (method, route), entries in sorted(grouped.items(), key=lambda kv: kv[0][1]):
+            queries = [e["queries"] for e in entries]
+            budget = budgets.get(route)
+            duplicates = defaultdict(int)
+            for e in entries:
+                for sql, n in e.get("duplicates", {}).items():
+                    duplicates[sql] += n
+            report.append({
+                "method": method,
+                "route": route,
+                "requests": len(entries),
+                "queries_avg": round(sum(queries) / len(queries), 2),
+                "queries_max": max(queries),
+                "db_ms_avg": round(sum(e["db_ms"] for e in entries) / len(entries), 3),
+                "render_ms_avg": round(sum(e["render_ms"] for e in entries) / len(entries), 3),
+                "total_ms_p50": percentile([e["total_ms"] for e in entries], 50),
+                "total_ms_p95": percentile([e["total_ms"] for e in entries], 95),
+                "budget": budget,
+                "over_budget": sum(1 for q in queries if budget is not None and q > budget),
+                "top_duplicates": [
+                    {"sql": sql[:200], "count": n}
+                    for sql, n in sorted(duplicates.items(), key=lambda kv: -kv[1])[:3]
+                ],
+            })
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for row in report:
+            budget = row["budget"] if row["budget"] is not None else "-"
+            line = (
+                f"{row['method']:6} /{row['route']:45} n={row['requests']:<5} "
+                f"queries avg={row['queries_avg']:<6} max={row['queries_max']:<4} budget={budget:<4} "
+                f"db={row['db_ms_avg']}ms render={row['render_ms_avg']}ms "
+                f"p50={row['total_ms_p50']}ms p95={row['total_ms_p95']}ms"
+            )
+            if row["over_budget"]:
+                self.stdout.write(self.style.ERROR(f"{line} OVER BUDGET x{row['over_budget']}"))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import ProviderRating
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-provider rating aggregates from bookings.Review."
+
+    def handle(self, *args, **options):
+        total = ProviderRating.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {total} provider(s)."))
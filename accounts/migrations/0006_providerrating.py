@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_provider_ratings(apps, schema_editor):
+    Review = apps.get_model("bookings", "Review")
+    ProviderRating = apps.get_model("accounts", "ProviderRating")
+
+    rows = (
+        Review.objects.filter(booking__provider__isnull=False)
+        .values("booking__provider")
+        .annotate(total=Sum("rating"), count=Count("id"))
+    )
+    ProviderRating.objects.bulk_create(
+        [
+            ProviderRating(
+                provider_id=row["booking__provider"],
+                rating_sum=row["total"],
+                rating_count=row["count"],
+                average_rating=round(row["total"] / row["count"], 1),
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_providerserviceprice'),
+        ('bookings', '0003_booking_additional_services'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderRating',
+            fields=[
+                ('provider', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_provider_ratings, migrations.RunPython.noop),
+    ]
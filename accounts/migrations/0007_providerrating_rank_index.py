@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_providerrating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='providerrating',
+            index=models.Index(fields=['-average_rating', '-rating_count'], name='provider_rating_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_providerrating_rank_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='providerprofile',
+            index=models.Index(django.db.models.functions.text.Lower('city'), name='provider_city_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+# (index name, table, column) for every column the admin user list filters
+# with a prefix match.
+SEARCH_COLUMNS = [
+    ("user_username_search_idx", "accounts_user", "username"),
+    ("user_first_name_search_idx", "accounts_user", "first_name"),
+    ("user_last_name_search_idx", "accounts_user", "last_name"),
+    ("userphone_phone_search_idx", "accounts_userphone", "phone"),
+    ("provider_city_search_idx", "accounts_providerprofile", "city"),
+    ("customer_city_search_idx", "accounts_customerprofile", "city"),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    istartswith compiles to ``UPPER(col::text) LIKE UPPER('q%')`` on
+    PostgreSQL, which a trigram index on UPPER(col) serves for any locale.
+    SQLite compiles it to a case-insensitive LIKE, which only uses an index
+    declared with the NOCASE collation. Other backends keep the plain scan.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)'
+            )
+    elif vendor == "sqlite":
+        for name, table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ("{column}" COLLATE NOCASE)'
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        for name, _, _ in SEARCH_COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_notificationcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_date_joined_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='phoneotp',
+            index=models.Index(fields=['expires_at'], name='phoneotp_expires_idx'),
+        ),
+    ]
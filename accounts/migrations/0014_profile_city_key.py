@@ -0,0 +1,90 @@
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of accounts.cities as of this migration, so later alias
+# changes do not alter what it does (backfill_city_keys applies those).
+ALIASES = {
+    "allahabad": "prayagraj",
+    "banaras": "varanasi",
+    "bangalore": "bengaluru",
+    "baroda": "vadodara",
+    "belgaum": "belagavi",
+    "bellary": "ballari",
+    "benares": "varanasi",
+    "bengaluru urban": "bengaluru",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "calicut": "kozhikode",
+    "cochin": "kochi",
+    "ernakulam": "kochi",
+    "gulbarga": "kalaburagi",
+    "gurgaon": "gurugram",
+    "hubli": "hubballi",
+    "hubli dharwad": "hubballi",
+    "madras": "chennai",
+    "mangalore": "mangaluru",
+    "mysore": "mysuru",
+    "new delhi": "delhi",
+    "new mumbai": "navi mumbai",
+    "panjim": "panaji",
+    "pondicherry": "puducherry",
+    "poona": "pune",
+    "secunderabad": "hyderabad",
+    "simla": "shimla",
+    "trichy": "tiruchirappalli",
+    "trivandrum": "thiruvananthapuram",
+    "vizag": "visakhapatnam",
+}
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def _city_key(city):
+    text = unicodedata.normalize("NFKD", city or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    key = " ".join(_SEPARATORS.sub(" ", text.casefold()).split())
+    return ALIASES.get(key, key)
+
+
+def fill_city_keys(apps, schema_editor):
+    for name in ("CustomerProfile", "ProviderProfile"):
+        model = apps.get_model("accounts", name)
+        batch = []
+        for row in model.objects.only("pk", "city").iterator(chunk_size=1000):
+            row.city_key = _city_key(row.city)
+            batch.append(row)
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, ["city_key"])
+                batch = []
+        model.objects.bulk_update(batch, ["city_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_gazetteercity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerprofile',
+            name='city_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='providerprofile',
+            name='city_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(fill_city_keys, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='providerprofile',
+            name='provider_city_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='providerprofile',
+            index=models.Index(fields=['city_key'], name='provider_city_key_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_geocode_cache(apps, schema_editor):
+    # Entries were keyed by ~150 m cells holding one point's street address;
+    # the new address cells are finer, so drop them rather than serve them.
+    apps.get_model("accounts", "GeocodeCacheEntry").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_profile_city_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_geocode_cache, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,15 @@
+from collections import Counter
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest
 from bookings.models import Review
 from services.models import Service
 from django.conf import settings
 
+from .cities import city_key
+
 
 
 class User(AbstractUser):
@@ -19,28 +25,47 @@ class User(AbstractUser):
         default=Role.CUSTOMER
     )
 
-    def average_rating(self):
-        reviews = Review.objects.filter(
-            booking__provider=self
-        )
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset for the admin user list; the prefix-search indexes are
+            # vendor specific and live in migration 0010.
+            models.Index(fields=["-date_joined", "-id"], name="user_date_joined_idx"),
+        ]
 
-        if not reviews.exists():
+    def average_rating(self):
+        # Reads the maintained aggregate; use select_related("rating_summary")
+        # on list querysets to keep this free of extra queries.
+        summary = getattr(self, "rating_summary", None)
+        if not summary or not summary.rating_count:
             return 0
+        return summary.average_rating
 
-        return round(
-            sum(r.rating for r in reviews) / reviews.count(),
-            1
-        )
-    
     def __str__(self):
         return f"{self.username} ({self.role})"
 
 
-class CustomerProfile(models.Model):
+class CityKeyMixin:
+    """Keeps ``city_key`` equal to ``city_key(city)`` on every save.
+
+    Bulk writes (bulk_create, update) skip save(); set the key there too or
+    run backfill_city_keys.
+    """
+
+    def save(self, *args, **kwargs):
+        self.city_key = city_key(self.city)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "city" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "city_key"}
+        super().save(*args, **kwargs)
+
+
+class CustomerProfile(CityKeyMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone = models.CharField(max_length=15, blank=True)
     address = models.TextField(blank=True)
     city = models.CharField(max_length=100, blank=True)
+    # accounts.cities.city_key(city), maintained by CityKeyMixin.
+    city_key = models.CharField(max_length=100, blank=True, default="")
 
     def __str__(self):
         return self.user.username
@@ -51,7 +76,7 @@ from django.conf import settings
 from services.models import Service
 
 
-class ProviderProfile(models.Model):
+class ProviderProfile(CityKeyMixin, models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -64,9 +89,16 @@ class ProviderProfile(models.Model):
     )
 
     city = models.CharField(max_length=100, blank=True)
+    # accounts.cities.city_key(city), maintained by CityKeyMixin; provider search matches on it.
+    city_key = models.CharField(max_length=100, blank=True, default="")
     is_verified = models.BooleanField(default=True)  # keep simple for now
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["city_key"], name="provider_city_key_idx"),
+        ]
+
     def __str__(self):
         return f"ProviderProfile({self.user.username})"
 
@@ -92,6 +124,74 @@ class ProviderServicePrice(models.Model):
         return f"{self.provider_profile.user.username} - {self.service.name}: {self.price}"
    
 
+class ProviderRating(models.Model):
+    provider = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_summary",
+    )
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-average_rating", "-rating_count"],
+                name="provider_rating_rank_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Rating for user #{self.provider_id}: {self.average_rating} ({self.rating_count})"
+
+    @staticmethod
+    def compute_average(rating_sum, rating_count):
+        if not rating_count:
+            return 0
+        return round(rating_sum / rating_count, 1)
+
+    @classmethod
+    def apply_review(cls, provider_id, rating, delta=1):
+        """Add (delta=1) or remove (delta=-1) a single review from a provider's aggregate."""
+        if not provider_id:
+            return
+        with transaction.atomic():
+            cls.objects.get_or_create(provider_id=provider_id)
+            summary = cls.objects.select_for_update().get(provider_id=provider_id)
+            summary.rating_count = max(summary.rating_count + delta, 0)
+            if summary.rating_count:
+                summary.rating_sum = max(summary.rating_sum + rating * delta, 0)
+            else:
+                summary.rating_sum = 0
+            summary.average_rating = cls.compute_average(summary.rating_sum, summary.rating_count)
+            summary.save()
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every provider aggregate from bookings.Review."""
+        rows = (
+            Review.objects.filter(booking__provider__isnull=False)
+            .values("booking__provider")
+            .annotate(total=Sum("rating"), count=Count("id"))
+        )
+        summaries = [
+            cls(
+                provider_id=row["booking__provider"],
+                rating_sum=row["total"],
+                rating_count=row["count"],
+                average_rating=cls.compute_average(row["total"], row["count"]),
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(summaries, batch_size=500)
+        return len(summaries)
+
+
 class Notification(models.Model):
     user = models.ForeignKey(
         User,
@@ -102,10 +202,99 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="notification_user_created_idx",
+            ),
+            # Serves the purge_notifications retention job.
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_read=True),
+                name="notification_read_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.username}"
 
 
+class NotificationCounter(models.Model):
+    """
+    Per-user unread notification count, kept in step with Notification so
+    the nav badge is a primary-key lookup instead of a COUNT over the inbox.
+    Code that creates or reads notifications must go through the helpers below.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Unread notifications for user #{self.user_id}: {self.unread_count}"
+
+    @classmethod
+    def unread_for(cls, user_id):
+        return (
+            cls.objects.filter(user_id=user_id)
+            .values_list("unread_count", flat=True)
+            .first()
+        ) or 0
+
+    @classmethod
+    def add_unread(cls, user_ids):
+        """Count newly created unread notifications; ``user_ids`` may repeat."""
+        per_user = Counter(user_ids)
+        if not per_user:
+            return
+        cls.objects.bulk_create(
+            [cls(user_id=user_id) for user_id in per_user],
+            ignore_conflicts=True,
+        )
+        by_delta = {}
+        for user_id, delta in per_user.items():
+            by_delta.setdefault(delta, []).append(user_id)
+        for delta, ids in by_delta.items():
+            cls.objects.filter(user_id__in=ids).update(unread_count=F("unread_count") + delta)
+
+    @classmethod
+    def mark_read(cls, user_id, count=1):
+        if count:
+            cls.objects.filter(user_id=user_id).update(
+                unread_count=Greatest(F("unread_count") - count, 0)
+            )
+
+    @classmethod
+    def mark_all_read(cls, user_id):
+        """Mark every notification read; returns how many were unread."""
+        with transaction.atomic():
+            # Lock the counter first so a concurrent delivery cannot slip
+            # between the bulk update and the reset.
+            list(cls.objects.select_for_update().filter(user_id=user_id))
+            updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+            cls.objects.filter(user_id=user_id).update(unread_count=0)
+        return updated
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every counter from the Notification table."""
+        rows = (
+            Notification.objects.filter(is_read=False)
+            .values("user")
+            .annotate(count=Count("id"))
+        )
+        counters = [cls(user_id=row["user"], unread_count=row["count"]) for row in rows]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(counters, batch_size=500)
+        return len(counters)
+
+
 class UserPhone(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -131,7 +320,47 @@ class PhoneOTP(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
     attempts = models.PositiveIntegerField(default=0)
+    # Set when the SMS was given up on; the code is withdrawn (is_used) with it.
+    send_error = models.CharField(max_length=255, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the purge_expired_otps retention job.
+            models.Index(fields=["expires_at"], name="phoneotp_expires_idx"),
+        ]
+
     def __str__(self):
         return f"OTP {self.phone} ({self.purpose})"
+
+
+class GeocodeCacheEntry(models.Model):
+    """Persistent tier of the reverse-geocode cache (accounts/geocode.py), one row per geohash cell."""
+
+    cell = models.CharField(max_length=12, unique=True)
+    # Empty for cells the geocoder had no address for (negative entries).
+    result = models.JSONField(null=True, blank=True)
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Geocode {self.cell}"
+
+
+class GazetteerCity(models.Model):
+    """City centroids for offline coordinate-to-city lookups (accounts/gazetteer.py)."""
+
+    name = models.CharField(max_length=100)
+    state = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=100, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name", "state", "country"], name="gazetteer_city_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.name}, {self.state}" if self.state else self.name
@@ -0,0 +1,278 @@
+"""
+OTP state and send/verify rate limits.
+
+Two interchangeable stores keep OTP codes, resend cooldowns and attempt
+counts (setting ``OTP_STORE``):
+
+- ``cache`` keeps everything in Django's cache (``OTP_CACHE_ALIAS``), so the
+  OTP endpoints never touch PhoneOTP. It needs a cache every worker shares
+  (Redis); tests run it on the local-memory backend.
+- ``database`` keeps the PhoneOTP rows, for deployments without a shared
+  cache.
+
+Both verify atomically: the attempt is counted and the code consumed with
+single conditional writes (cache ``incr``/``delete``, or a filtered UPDATE),
+so concurrent guesses cannot share one attempt or use one code twice.
+
+SMS goes out in the background (accounts/sms.py). When a message is given
+up on, ``fail`` withdraws its code and lifts the resend cooldown, and
+``last_failure`` lets the next send or verify tell the user why no code
+arrived.
+
+The sliding-window limiter always uses the cache. On the local-memory
+backend every process counts on its own, so the effective limit is per
+worker.
+"""
+
+import math
+import secrets
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PhoneOTP
+
+
+class RateLimited(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(int(math.ceil(retry_after)), 1)
+
+
+def _cache():
+    return caches[getattr(settings, "OTP_CACHE_ALIAS", "default")]
+
+
+def _expiry_seconds():
+    return int(getattr(settings, "OTP_EXPIRY_SECONDS", 300))
+
+
+def _cooldown_seconds():
+    return int(getattr(settings, "OTP_RESEND_COOLDOWN_SECONDS", 30))
+
+
+def _max_attempts():
+    return int(getattr(settings, "OTP_MAX_ATTEMPTS", 5))
+
+
+def _new_code():
+    return f"{secrets.randbelow(900000) + 100000}"
+
+
+def _cooldown_error(wait):
+    return RateLimited(f"Please wait {max(int(wait), 1)} seconds before requesting a new OTP", wait)
+
+
+UNDELIVERED_MESSAGE = "We could not deliver your last OTP. Please request a new one"
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter: the previous fixed window's count, weighted by
+    how much of it still overlaps the sliding window, plus the current
+    window's count. Two cache keys per client and one atomic ``incr`` per hit.
+    """
+
+    def __init__(self, name, limit, window_seconds, clock=time.time):
+        self.name = name
+        self.limit = limit
+        self.window = window_seconds
+        self.clock = clock
+
+    def hit(self, key):
+        """Count one request for ``key``; raises RateLimited once over the limit."""
+        if not key or self.limit <= 0:
+            return
+        cache = _cache()
+        now = self.clock()
+        bucket, elapsed = divmod(now, self.window)
+        current_key = f"ratelimit:{self.name}:{key}:{int(bucket)}"
+        previous = cache.get(f"ratelimit:{self.name}:{key}:{int(bucket) - 1}", 0)
+
+        cache.add(current_key, 0, self.window * 2)
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            # Evicted between add and incr.
+            cache.set(current_key, 1, self.window * 2)
+            count = 1
+
+        weight = (self.window - elapsed) / self.window
+        if previous * weight + count > self.limit:
+            # Rejected requests do not use up the window.
+            cache.decr(current_key)
+            if previous:
+                # When the weighted previous window has decayed enough.
+                retry_after = self.window - elapsed - (self.limit - count) * self.window / previous
+            else:
+                retry_after = self.window - elapsed
+            raise RateLimited("Too many requests. Try again later", min(max(retry_after, 1), self.window))
+
+
+def send_limiters():
+    window = int(getattr(settings, "OTP_SEND_WINDOW_SECONDS", 3600))
+    return (
+        SlidingWindowLimiter("otp-send-phone", int(getattr(settings, "OTP_SEND_LIMIT_PER_PHONE", 10)), window),
+        SlidingWindowLimiter("otp-send-ip", int(getattr(settings, "OTP_SEND_LIMIT_PER_IP", 30)), window),
+    )
+
+
+def verify_limiter():
+    return SlidingWindowLimiter(
+        "otp-verify-ip",
+        int(getattr(settings, "OTP_VERIFY_LIMIT_PER_IP", 60)),
+        int(getattr(settings, "OTP_SEND_WINDOW_SECONDS", 3600)),
+    )
+
+
+def client_ip(request):
+    """The connecting client's address; behind the platform router that is
+    the right-most X-Forwarded-For entry (the one the router appended)."""
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if forwarded:
+        return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_send_limits(request, phone):
+    phone_limiter, ip_limiter = send_limiters()
+    ip_limiter.hit(client_ip(request))
+    phone_limiter.hit(phone)
+
+
+def check_verify_limits(request):
+    verify_limiter().hit(client_ip(request))
+
+
+class CacheOTPStore:
+    def _key(self, phone, purpose, part):
+        return f"otp:{purpose}:{phone}:{part}"
+
+    def issue(self, phone, purpose):
+        """Create a fresh code for ``phone`` or raise RateLimited during the resend cooldown."""
+        cache = _cache()
+        now = time.time()
+        cooldown = _cooldown_seconds()
+        cooldown_key = self._key(phone, purpose, "cooldown")
+        # add() is atomic: of two concurrent sends only one gets past here.
+        if cooldown and not cache.add(cooldown_key, now + cooldown, cooldown):
+            raise _cooldown_error(cache.get(cooldown_key, now + cooldown) - now)
+
+        code = _new_code()
+        expiry = _expiry_seconds()
+        cache.set_many(
+            {self._key(phone, purpose, "code"): code, self._key(phone, purpose, "attempts"): 0},
+            expiry,
+        )
+        cache.delete(self._key(phone, purpose, "failed"))
+        return code
+
+    def fail(self, phone, purpose, code, reason):
+        """Withdraw ``code`` after its SMS could not be delivered, so a resend works at once."""
+        cache = _cache()
+        if cache.get(self._key(phone, purpose, "code")) != code:
+            return  # A newer code has been issued since.
+        cache.delete_many([self._key(phone, purpose, part) for part in ("code", "attempts", "cooldown")])
+        cache.set(self._key(phone, purpose, "failed"), reason, _expiry_seconds())
+
+    def last_failure(self, phone, purpose):
+        """Why the latest code was withdrawn undelivered, or None."""
+        return _cache().get(self._key(phone, purpose, "failed"))
+
+    def verify(self, phone, purpose, code):
+        """Check and consume a code. Returns ``(ok, error)``."""
+        cache = _cache()
+        try:
+            attempts = cache.incr(self._key(phone, purpose, "attempts"))
+        except ValueError:
+            if self.last_failure(phone, purpose):
+                return False, UNDELIVERED_MESSAGE
+            return False, "OTP expired or not found"
+        if attempts > _max_attempts():
+            return False, "Maximum attempts reached. Request a new OTP"
+
+        code_key = self._key(phone, purpose, "code")
+        expected = cache.get(code_key)
+        if expected is None:
+            return False, "OTP expired or not found"
+        if not secrets.compare_digest(expected, str(code).strip()):
+            return False, "Invalid OTP"
+        # Only one of two concurrent correct guesses deletes the key.
+        if not cache.delete(code_key):
+            return False, "OTP expired or not found"
+        cache.delete(self._key(phone, purpose, "attempts"))
+        return True, None
+
+
+class DatabaseOTPStore:
+    def _latest(self, phone, purpose):
+        return PhoneOTP.objects.filter(
+            phone=phone,
+            purpose=purpose,
+            is_used=False,
+            expires_at__gt=timezone.now(),
+        ).order_by("-created_at").first()
+
+    def issue(self, phone, purpose):
+        latest = self._latest(phone, purpose)
+        if latest:
+            elapsed = (timezone.now() - latest.created_at).total_seconds()
+            if elapsed < _cooldown_seconds():
+                raise _cooldown_error(_cooldown_seconds() - elapsed)
+
+        code = _new_code()
+        PhoneOTP.objects.create(
+            phone=phone,
+            code=code,
+            purpose=purpose,
+            expires_at=timezone.now() + timedelta(seconds=_expiry_seconds()),
+        )
+        return code
+
+    def fail(self, phone, purpose, code, reason):
+        """Withdraw ``code`` after its SMS could not be delivered, so a resend works at once."""
+        PhoneOTP.objects.filter(phone=phone, purpose=purpose, code=code, is_used=False).update(
+            is_used=True, send_error=reason[:255]
+        )
+
+    def last_failure(self, phone, purpose):
+        """Why the latest code was withdrawn undelivered, or None."""
+        latest = (
+            PhoneOTP.objects.filter(phone=phone, purpose=purpose, expires_at__gt=timezone.now())
+            .order_by("-created_at")
+            .values_list("send_error", flat=True)
+            .first()
+        )
+        return latest or None
+
+    def verify(self, phone, purpose, code):
+        otp = self._latest(phone, purpose)
+        if not otp:
+            if self.last_failure(phone, purpose):
+                return False, UNDELIVERED_MESSAGE
+            return False, "OTP expired or not found"
+
+        counted = PhoneOTP.objects.filter(
+            pk=otp.pk, is_used=False, attempts__lt=_max_attempts()
+        ).update(attempts=F("attempts") + 1)
+        if not counted:
+            return False, "Maximum attempts reached. Request a new OTP"
+        if not secrets.compare_digest(otp.code, str(code).strip()):
+            return False, "Invalid OTP"
+        if not PhoneOTP.objects.filter(pk=otp.pk, is_used=False).update(is_used=True):
+            return False, "OTP expired or not found"
+        return True, None
+
+
+STORES = {
+    "cache": CacheOTPStore,
+    "database": DatabaseOTPStore,
+}
+
+
+def get_store():
+    return STORES[getattr(settings, "OTP_STORE", "cache")]()
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ProviderPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class NotificationCursorPagination(CursorPagination):
+    # Walks the (user, -created_at, -id) index; cost is flat however deep the inbox.
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class AdminUserCursorPagination(CursorPagination):
+    # The cursor is a date_joined position (DRF breaks ties with an offset,
+    # not id), so page N costs about the same as page 1.
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-date_joined", "-id")
@@ -130,6 +130,9 @@ class ProviderListSerializer(serializers.ModelSerializer):
         ]
 
     def get_average_rating(self, obj):
+        rating = getattr(obj, "rating", None)
+        if rating is not None:
+            return rating
         return obj.average_rating()
 
 
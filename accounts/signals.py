@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .jwt import user_cache
+from .models import User, UserPhone
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # Covers AdminUserToggleAPIView, UpdateProfileAPIView and ChangePasswordAPIView.
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=UserPhone)
+@receiver(post_delete, sender=UserPhone)
+def drop_cached_phone_owner(sender, instance, **kwargs):
+    user_cache.invalidate(instance.user_id)
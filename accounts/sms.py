@@ -0,0 +1,310 @@
+"""
+Background SMS dispatch for OTP messages.
+
+The OTP endpoints only validate, store the code and queue the message; a
+small pool of worker threads per process does the HTTP call. Each worker
+keeps one persistent (keep-alive) connection to the provider, so the pool
+size bounds both concurrency and open sockets. Transport errors, 429 and
+5xx responses are retried with exponential backoff; enough consecutive
+failures open a circuit breaker that makes new sends fail fast until the
+provider has had time to recover. A message that is finally given up on
+is reported to the ``on_failure`` callback it was queued with, so the
+caller can undo state that assumed it would arrive.
+"""
+
+import http.client
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "https://ninzasms.in.net/auth/send_sms"
+
+
+class SmsUnavailable(Exception):
+    """The message was not queued: SMS is not configured, the queue is full or the circuit is open."""
+
+
+class SmsError(Exception):
+    def __init__(self, message, retryable):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failures. Once ``reset_seconds``
+    have passed one probe is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, threshold=5, reset_seconds=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None and (
+                self._probing or self.clock() - self._opened_at < self.reset_seconds
+            )
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or self.clock() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = self.clock()
+            self._probing = False
+
+
+def _accepted(data):
+    """Whether a 2xx provider response body reports the message as sent."""
+    return_value = data.get("return")
+    status_value = str(data.get("status", "")).strip().lower()
+    message_value = str(data.get("message", "")).strip().lower()
+    return (
+        return_value is True
+        or str(return_value).strip().lower() in {"true", "1", "yes"}
+        or status_value in {"success", "ok", "sent", "200", "1", "true"}
+        or ("success" in message_value or "sent" in message_value)
+    )
+
+
+def _error_message(raw):
+    try:
+        data = json.loads(raw) if raw else {}
+    except ValueError:
+        data = {"raw": raw}
+    if not isinstance(data, dict):
+        data = {"raw": raw}
+    errors = data.get("errors") or []
+    first_error = errors[0] if isinstance(errors, list) and errors else {}
+    return (
+        (first_error.get("message") if isinstance(first_error, dict) else None)
+        or data.get("message")
+        or data.get("error")
+        or data.get("raw")
+        or "no details"
+    )
+
+
+class _Connection:
+    """One keep-alive connection, reopened after any transport error."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += f"?{parts.query}"
+        self.timeout = timeout
+        self._conn = None
+
+    def post(self, body, headers):
+        if self._conn is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = factory(self.host, self.port, timeout=self.timeout)
+        try:
+            self._conn.request("POST", self.path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            raw = response.read().decode("utf-8", errors="ignore")
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, raw
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SmsDispatcher:
+    def __init__(
+        self,
+        url,
+        api_key,
+        sender_id,
+        route="",
+        workers=4,
+        queue_size=1000,
+        max_attempts=3,
+        backoff_seconds=0.5,
+        timeout=8,
+        breaker=None,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.sender_id = sender_id
+        self.route = route
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"sms-dispatch-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def send_otp(self, phone, otp, on_failure=None):
+        """Queue an OTP message; raises SmsUnavailable instead of blocking.
+
+        ``on_failure(reason)`` runs on the worker thread if the message is
+        not delivered in the end.
+        """
+        if self.breaker.is_open:
+            raise SmsUnavailable("SMS provider is unavailable, try again shortly")
+        try:
+            self._queue.put_nowait((phone, otp, on_failure))
+        except queue.Full:
+            raise SmsUnavailable("Too many OTP requests in flight, try again shortly")
+
+    def join(self):
+        """Block until every queued message has been handled (tests, shutdown)."""
+        self._queue.join()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        connection = _Connection(self.url, self.timeout)
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    connection.close()
+                    return
+                phone, otp, on_failure = job
+                error = self._deliver(connection, phone, otp)
+                if error and on_failure:
+                    on_failure(error)
+            except Exception:
+                logger.exception("SMS dispatch crashed for one message")
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, connection, phone, otp):
+        """Send one message with retries. Returns None once delivered, else why it was not."""
+        payload = {
+            "sender_id": self.sender_id,
+            "variables_values": otp,
+            "numbers": phone,
+        }
+        if self.route:
+            payload["rout"] = self.route
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"authorization": self.api_key, "Content-Type": "application/json"}
+
+        for attempt in range(1, self.max_attempts + 1):
+            if not self.breaker.allow():
+                logger.warning("SMS to %s dropped: circuit open", phone)
+                return "SMS provider is unavailable"
+            try:
+                self._post(connection, body, headers)
+            except SmsError as exc:
+                if not exc.retryable:
+                    # The provider answered; a rejection says nothing about its health.
+                    self.breaker.record_success()
+                    logger.warning("SMS to %s rejected: %s", phone, exc)
+                    return str(exc)
+                self.breaker.record_failure()
+                if attempt == self.max_attempts:
+                    logger.warning("SMS to %s failed after %s attempts: %s", phone, attempt, exc)
+                    return str(exc)
+                # Exponential backoff with jitter so workers do not retry in lockstep.
+                time.sleep(self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            else:
+                self.breaker.record_success()
+                return None
+        return "SMS was not sent"
+
+    def _post(self, connection, body, headers):
+        try:
+            status_code, raw = connection.post(body, headers)
+        except (OSError, http.client.HTTPException) as exc:
+            raise SmsError(f"OTP network error: {exc}", retryable=True)
+
+        if status_code == 429 or status_code >= 500:
+            raise SmsError(f"OTP provider HTTP {status_code}: {_error_message(raw)}", retryable=True)
+        if status_code >= 400:
+            raise SmsError(f"OTP provider HTTP {status_code}: {_error_message(raw)}", retryable=False)
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict) or not _accepted(data):
+            message = data.get("message") if isinstance(data, dict) else None
+            raise SmsError(message or "OTP provider rejected request", retryable=False)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """This process's dispatcher, started on first use (after any worker fork)."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = SmsDispatcher(
+                url=getattr(settings, "NINZA_SMS_URL", "") or DEFAULT_URL,
+                api_key=(getattr(settings, "NINZA_SMS_AUTH_KEY", "") or "").strip(),
+                sender_id=(getattr(settings, "NINZA_SMS_SENDER_ID", "") or "").strip(),
+                route=(getattr(settings, "NINZA_SMS_ROUTE", "") or "").strip(),
+                workers=int(getattr(settings, "SMS_DISPATCH_WORKERS", 4)),
+                queue_size=int(getattr(settings, "SMS_DISPATCH_QUEUE_SIZE", 1000)),
+                max_attempts=int(getattr(settings, "SMS_MAX_ATTEMPTS", 3)),
+                backoff_seconds=float(getattr(settings, "SMS_RETRY_BACKOFF_SECONDS", 0.5)),
+                timeout=float(getattr(settings, "SMS_TIMEOUT_SECONDS", 8)),
+                breaker=CircuitBreaker(
+                    threshold=int(getattr(settings, "SMS_BREAKER_THRESHOLD", 5)),
+                    reset_seconds=float(getattr(settings, "SMS_BREAKER_RESET_SECONDS", 30)),
+                ),
+            )
+        return _dispatcher
+
+
+def send_otp(phone, otp, on_failure=None):
+    """Queue an OTP SMS. Raises SmsUnavailable if it cannot be queued."""
+    if not (getattr(settings, "NINZA_SMS_AUTH_KEY", "") or "").strip():
+        raise SmsUnavailable("NINZA_SMS_AUTH_KEY is not configured")
+    if not (getattr(settings, "NINZA_SMS_SENDER_ID", "") or "").strip():
+        raise SmsUnavailable("NINZA_SMS_SENDER_ID is not configured")
+    get_dispatcher().send_otp(phone, otp, on_failure=on_failure)
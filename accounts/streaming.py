@@ -0,0 +1,272 @@
+"""
+Server-Sent Events stream of a user's notifications (ASGI only).
+
+Each process runs one NotificationHub. While at least one stream is open it
+polls the Notification table once per interval for rows newer than its
+cursor and fans them out to the subscribed users' queues, so the DB cost is
+per process rather than per open tab, and no external broker is needed.
+
+Ids are allocated before commit, so a row can become visible after a higher
+id has already been seen. Each poll (and each Last-Event-ID backlog) also
+re-reads the last NOTIFICATION_STREAM_WINDOW_SECONDS by created_at, and the
+hub remembers which of those ids every subscriber already has.
+
+EventSource cannot send an Authorization header, and query strings end up
+in access logs, so browsers never put their JWT in the stream URL. They
+POST to notifications/stream/ticket/ for a short-lived signed ticket and
+open the stream with ``?ticket=``. A ticket is good for one connection
+(checked through the default cache; on the local-memory backend that is
+per process) and for NOTIFICATION_STREAM_TICKET_SECONDS.
+"""
+
+import asyncio
+import json
+import secrets
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .jwt import CachedJWTAuthentication, user_cache
+from .models import Notification, NotificationCounter, User
+
+NOTIFICATION_FIELDS = ("id", "user_id", "message", "is_read", "created_at")
+TICKET_SALT = "accounts.streaming.ticket"
+
+
+def _poll_seconds():
+    return float(getattr(settings, "NOTIFICATION_STREAM_POLL_SECONDS", 2))
+
+
+def _window_start():
+    """Rows created after this may still be committing; they are re-read every poll."""
+    seconds = float(getattr(settings, "NOTIFICATION_STREAM_WINDOW_SECONDS", 10))
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+def _unread_counts(user_ids):
+    counts = dict(
+        NotificationCounter.objects.filter(user_id__in=user_ids)
+        .values_list("user_id", "unread_count")
+    )
+    return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+
+def _latest_id():
+    close_old_connections()
+    return Notification.objects.aggregate(v=Max("id"))["v"] or 0
+
+
+def _fetch_new(cursor, user_ids):
+    """Rows past ``cursor`` plus the trailing window, for ``user_ids``; and the new cursor."""
+    close_old_connections()
+    latest = Notification.objects.aggregate(v=Max("id"))["v"] or 0
+    rows = list(
+        Notification.objects.filter(Q(id__gt=cursor) | Q(created_at__gte=_window_start()), user_id__in=user_ids)
+        .order_by("id")
+        .values(*NOTIFICATION_FIELDS)
+    )
+    return max(cursor, latest), rows
+
+
+class NotificationHub:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        # queue -> ids of the current window it has already been given.
+        self._sent = {}
+        self._cursor = None
+        self._task = None
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=100)
+        self._subscribers[user_id].add(queue)
+        self._sent[queue] = set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        self._sent.pop(queue, None)
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def mark_sent(self, queue, ids):
+        """Record ids a stream delivered itself (its backlog) so polls skip them."""
+        sent = self._sent.get(queue)
+        if sent is not None:
+            sent.update(ids)
+
+    def _put(self, queue, event, payload):
+        try:
+            queue.put_nowait((event, payload))
+            return True
+        except asyncio.QueueFull:
+            # A stalled client; it will resync from Last-Event-ID on reconnect.
+            return False
+
+    def publish(self, user_id, event, payload):
+        for queue in list(self._subscribers.get(user_id, ())):
+            self._put(queue, event, payload)
+
+    def deliver(self, rows):
+        """Push each row to the subscribers that do not have it yet; returns the users who got one."""
+        window = {row["id"] for row in rows}
+        notified = set()
+        for row in rows:
+            for queue in list(self._subscribers.get(row["user_id"], ())):
+                sent = self._sent[queue]
+                if row["id"] not in sent and self._put(queue, "notification", row):
+                    sent.add(row["id"])
+                    notified.add(row["user_id"])
+        # Ids that have left the window are never read again.
+        for sent in self._sent.values():
+            sent.intersection_update(window)
+        return notified
+
+    async def _run(self):
+        if self._cursor is None:
+            self._cursor = await sync_to_async(_latest_id)()
+        while self._subscribers:
+            await asyncio.sleep(_poll_seconds())
+            user_ids = list(self._subscribers)
+            if not user_ids:
+                break
+            self._cursor, rows = await sync_to_async(_fetch_new)(self._cursor, user_ids)
+            notified = self.deliver(rows)
+            if notified:
+                counts = await sync_to_async(_unread_counts)(sorted(notified))
+                for user_id, count in counts.items():
+                    self.publish(user_id, "unread", {"unread_count": count})
+
+
+hub = NotificationHub()
+
+
+def _format_event(event, payload, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(payload, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _initial_state(user_id, since_id):
+    backlog = []
+    if since_id is not None:
+        backlog = list(
+            Notification.objects.filter(Q(id__gt=since_id) | Q(created_at__gte=_window_start()), user_id=user_id)
+            .order_by("id")
+            .values(*NOTIFICATION_FIELDS)[:100]
+        )
+    return backlog, _unread_counts([user_id])[user_id]
+
+
+async def _event_stream(user_id, since_id):
+    loop = asyncio.get_running_loop()
+    keepalive = float(getattr(settings, "NOTIFICATION_STREAM_KEEPALIVE_SECONDS", 15))
+    deadline = loop.time() + float(getattr(settings, "NOTIFICATION_STREAM_MAX_SECONDS", 300))
+
+    queue = hub.subscribe(user_id)
+    try:
+        backlog, unread = await sync_to_async(_initial_state)(user_id, since_id)
+        seen = {row["id"] for row in backlog}
+        hub.mark_sent(queue, seen)
+        yield "retry: 5000\n\n"
+        for row in backlog:
+            yield _format_event("notification", row, row["id"])
+        yield _format_event("unread", {"unread_count": unread})
+
+        # Streams end periodically; EventSource reconnects with Last-Event-ID.
+        while loop.time() < deadline:
+            timeout = min(keepalive, max(deadline - loop.time(), 0))
+            try:
+                event, payload = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            event_id = None
+            if event == "notification":
+                # The hub may have queued it before the backlog was read.
+                if payload["id"] in seen:
+                    continue
+                event_id = payload["id"]
+                seen.add(event_id)
+            yield _format_event(event, payload, event_id)
+    finally:
+        hub.unsubscribe(user_id, queue)
+
+
+def ticket_seconds():
+    return int(getattr(settings, "NOTIFICATION_STREAM_TICKET_SECONDS", 30))
+
+
+def issue_ticket(user):
+    """A signed, single-use ticket that opens one stream for ``user``."""
+    return signing.dumps({"user_id": user.pk, "nonce": secrets.token_urlsafe(16)}, salt=TICKET_SALT)
+
+
+def redeem_ticket(ticket):
+    """The user a ticket was issued to, or None if it is invalid, expired or already used."""
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT, max_age=ticket_seconds())
+    except signing.BadSignature:
+        return None
+    if not cache.add(f"stream-ticket:{data['nonce']}", 1, ticket_seconds()):
+        return None
+
+    user = user_cache.get(data["user_id"])
+    if user is None:
+        user = User.objects.select_related("phone_record").filter(pk=data["user_id"]).first()
+        if user is None:
+            return None
+        user_cache.put(user)
+    return user if user.is_active else None
+
+
+def _authenticate(request):
+    """A ?ticket= from issue_ticket, or a JWT in the Authorization header (non-browser clients)."""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return redeem_ticket(ticket)
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+def _parse_since_id(request):
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("since_id")
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+async def notification_stream(request):
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+
+    response = StreamingHttpResponse(
+        _event_stream(user.id, _parse_since_id(request)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
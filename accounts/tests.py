@@ -1,3 +1,469 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from services.models import Service, ServiceCategory
+
+from .cities import ALIASES, backfill, city_key
+from .gazetteer import Gazetteer, load_dataset, nearest_city, read_dataset
+from .geocode import GeocodeUnavailable, ReverseGeocoder, geohash
+from .jwt import ClaimsRefreshToken, user_cache
+from .models import CustomerProfile, GeocodeCacheEntry, Notification, PhoneOTP, ProviderProfile, User, UserPhone
+from .otp import UNDELIVERED_MESSAGE, CacheOTPStore, DatabaseOTPStore, RateLimited, SlidingWindowLimiter
+from .sms import CircuitBreaker, SmsDispatcher, SmsUnavailable
+from .streaming import NotificationHub, _authenticate, _fetch_new
+
+
+class _StubProvider(BaseHTTPRequestHandler):
+    """Answers with the next scripted (status, body) and records each request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.server.received.append((self.client_address, json.loads(self.rfile.read(length))))
+        status, body = self.server.script.pop(0) if self.server.script else (200, {"return": True})
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+class SmsDispatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubProvider)
+        self.server.script = []
+        self.server.received = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def dispatcher(self, **kwargs):
+        options = {"workers": 1, "backoff_seconds": 0, "timeout": 2}
+        options.update(kwargs)
+        dispatcher = SmsDispatcher(
+            f"http://127.0.0.1:{self.server.server_port}/auth/send_sms",
+            api_key="key",
+            sender_id="SENDER",
+            **options,
+        )
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def test_sends_over_one_persistent_connection(self):
+        dispatcher = self.dispatcher()
+        for phone in ("9876500001", "9876500002", "9876500003"):
+            dispatcher.send_otp(phone, "123456")
+        dispatcher.join()
+
+        self.assertEqual([body["numbers"] for _, body in self.server.received], ["9876500001", "9876500002", "9876500003"])
+        self.assertEqual(len({address for address, _ in self.server.received}), 1)
+
+    def test_retries_server_errors(self):
+        self.server.script = [(503, {"message": "busy"}), (500, {}), (200, {"status": "success"})]
+        dispatcher = self.dispatcher(max_attempts=3)
+        dispatcher.send_otp("9876500001", "123456")
+        dispatcher.join()
+
+        self.assertEqual(len(self.server.received), 3)
+        self.assertFalse(dispatcher.breaker.is_open)
+
+    def test_does_not_retry_rejections(self):
+        self.server.script = [(401, {"message": "bad key"})]
+        dispatcher = self.dispatcher(max_attempts=3)
+        failures = []
+        with self.assertLogs("accounts.sms", "WARNING"):
+            dispatcher.send_otp("9876500001", "123456", on_failure=failures.append)
+            dispatcher.join()
+
+        self.assertEqual(len(self.server.received), 1)
+        self.assertEqual(failures, ["OTP provider HTTP 401: bad key"])
+
+    def test_breaker_opens_and_fails_fast(self):
+        self.server.script = [(500, {})] * 2
+        dispatcher = self.dispatcher(max_attempts=2, breaker=CircuitBreaker(threshold=2, reset_seconds=60))
+        with self.assertLogs("accounts.sms", "WARNING"):
+            dispatcher.send_otp("9876500001", "123456")
+            dispatcher.join()
+
+        self.assertTrue(dispatcher.breaker.is_open)
+        with self.assertRaises(SmsUnavailable):
+            dispatcher.send_otp("9876500002", "123456")
+        self.assertEqual(len(self.server.received), 2)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_half_open_probe(self):
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=1, reset_seconds=10, clock=lambda: now[0])
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 11
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one probe at a time
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+
+@override_settings(OTP_MAX_ATTEMPTS=2, OTP_RESEND_COOLDOWN_SECONDS=30)
+class OTPStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def check_store(self, store):
+        login = PhoneOTP.Purpose.LOGIN
+        code = store.issue("9876500001", login)
+        with self.assertRaises(RateLimited):
+            store.issue("9876500001", login)
+
+        self.assertEqual(store.verify("9876500001", login, "000000"), (False, "Invalid OTP"))
+        self.assertEqual(store.verify("9876500001", login, code), (True, None))
+        self.assertFalse(store.verify("9876500001", login, code)[0])
+
+    def check_attempt_limit(self, store):
+        signup = PhoneOTP.Purpose.SIGNUP
+        code = store.issue("9876500002", signup)
+        store.verify("9876500002", signup, "000000")
+        store.verify("9876500002", signup, "000000")
+        self.assertEqual(
+            store.verify("9876500002", signup, code),
+            (False, "Maximum attempts reached. Request a new OTP"),
+        )
+
+    def check_undelivered(self, store):
+        login = PhoneOTP.Purpose.LOGIN
+        code = store.issue("9876500003", login)
+        store.fail("9876500003", login, code, "OTP provider HTTP 401: bad key")
+
+        self.assertEqual(store.last_failure("9876500003", login), "OTP provider HTTP 401: bad key")
+        self.assertEqual(store.verify("9876500003", login, code), (False, UNDELIVERED_MESSAGE))
+        # No cooldown left; the new code clears the failure.
+        code = store.issue("9876500003", login)
+        self.assertIsNone(store.last_failure("9876500003", login))
+        self.assertEqual(store.verify("9876500003", login, code), (True, None))
+
+    def test_cache_store(self):
+        self.check_store(CacheOTPStore())
+        self.check_attempt_limit(CacheOTPStore())
+        self.check_undelivered(CacheOTPStore())
+        self.assertFalse(PhoneOTP.objects.exists())
+
+    def test_database_store(self):
+        self.check_store(DatabaseOTPStore())
+        self.check_attempt_limit(DatabaseOTPStore())
+        self.check_undelivered(DatabaseOTPStore())
+
+
+@override_settings(DEBUG=False, NINZA_SMS_AUTH_KEY="key", NINZA_SMS_SENDER_ID="SENDER", OTP_RESEND_COOLDOWN_SECONDS=30)
+class SendOTPUnavailableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        UserPhone.objects.create(user=user, phone="9876500004")
+        # No workers: queued messages just wait, nothing is sent.
+        self.breaker = CircuitBreaker(threshold=1, reset_seconds=60)
+        dispatcher = SmsDispatcher("http://127.0.0.1:9/", api_key="key", sender_id="SENDER", workers=0, breaker=self.breaker)
+        patcher = mock.patch("accounts.sms._dispatcher", dispatcher)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check_resend(self, store):
+        cache.clear()
+        client = APIClient()
+        self.breaker.record_failure()
+        with override_settings(OTP_STORE=store):
+            response = client.post("/api/accounts/auth/otp/send/", {"phone": "9876500004"})
+            self.assertEqual(response.status_code, 502)
+
+            self.breaker.record_success()
+            response = client.post("/api/accounts/auth/otp/send/", {"phone": "9876500004"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("could not be delivered", response.json()["message"])
+
+    def test_resend_after_breaker_open_is_not_held_by_the_cooldown(self):
+        self.check_resend("cache")
+        self.check_resend("database")
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_previous_window_decays(self):
+        now = [1000.0]
+        limiter = SlidingWindowLimiter("test", limit=3, window_seconds=100, clock=lambda: now[0])
+        for _ in range(3):
+            limiter.hit("9876500001")
+        with self.assertRaises(RateLimited):
+            limiter.hit("9876500001")
+        limiter.hit("9876500002")
+
+        # Half way into the next window the previous one still counts 1.5.
+        now[0] = 1150.0
+        limiter.hit("9876500001")
+        with self.assertRaises(RateLimited) as raised:
+            limiter.hit("9876500001")
+        self.assertEqual(raised.exception.retry_after, 17)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        UserPhone.objects.create(user=self.user, phone="9876500001")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}"
+        )
+
+    def test_second_request_skips_user_lookup(self):
+        with self.assertNumQueries(1):
+            first = self.client.get("/api/accounts/me/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/accounts/me/")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.json()["phone"], "9876500001")
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.client.get("/api/accounts/me/")
+        admin = User.objects.create_user("admin", password="pw", role=User.Role.ADMIN)
+        admin_client = APIClient()
+        admin_client.force_authenticate(admin)
+        admin_client.post(f"/api/accounts/admin/users/{self.user.id}/toggle/")
+
+        self.assertEqual(self.client.get("/api/accounts/me/").status_code, 401)
+
+
+class StreamTicketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        self.factory = RequestFactory()
+
+    def _stream_user(self, **params):
+        return _authenticate(self.factory.get("/api/accounts/notifications/stream/", params))
+
+    def test_ticket_opens_one_stream(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        ticket = client.post("/api/accounts/notifications/stream/ticket/").json()["ticket"]
+
+        self.assertEqual(self._stream_user(ticket=ticket), self.user)
+        self.assertIsNone(self._stream_user(ticket=ticket))
+
+    def test_jwt_in_query_string_is_rejected(self):
+        token = str(ClaimsRefreshToken.for_user(self.user).access_token)
+        self.assertIsNone(self._stream_user(token=token))
+        self.assertIsNone(self._stream_user(ticket=token))
+
+
+class NotificationHubTests(TestCase):
+    def test_row_committed_after_a_higher_id_is_still_pushed(self):
+        user = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        late = Notification.objects.create(user=user, message="late")
+        early = Notification.objects.create(user=user, message="early")
+        hub = NotificationHub()
+
+        async def subscribe():
+            queue = hub.subscribe(user.id)
+            hub._task.cancel()
+            return queue
+
+        queue = asyncio.run(subscribe())
+        # The first poll only saw ``early``; ``late`` committed afterwards.
+        hub.deliver(Notification.objects.filter(id=early.id).values("id", "user_id", "message"))
+        cursor, rows = _fetch_new(early.id, [user.id])
+        self.assertEqual(cursor, early.id)
+        self.assertEqual(hub.deliver(rows), {user.id})
+        self.assertEqual(hub.deliver(_fetch_new(cursor, [user.id])[1]), set())
+
+        pushed = []
+        while not queue.empty():
+            pushed.append(queue.get_nowait()[1]["id"])
+        self.assertEqual(pushed, [early.id, late.id])
+
+
+class _StubGeocoder:
+    def __init__(self, results=None, delay=0):
+        self.results = results or {}
+        self.delay = delay
+        self.calls = 0
+
+    def reverse(self, lat, lon):
+        self.calls += 1
+        time.sleep(self.delay)
+        result = self.results.get(int(lat))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class ReverseGeocoderTests(TestCase):
+    BENGALURU = {"display_name": "MG Road, Bengaluru", "city": "Bengaluru", "postcode": "560001",
+                 "state": "Karnataka", "country": "India"}
+
+    def test_geohash(self):
+        self.assertEqual(geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_nearby_points_share_one_upstream_call(self):
+        client = _StubGeocoder({12: self.BENGALURU})
+        geocoder = ReverseGeocoder(client)
+        self.assertEqual(geocoder.reverse(12.971600, 77.594600), self.BENGALURU)
+        self.assertEqual(geocoder.reverse(12.971601, 77.594601), self.BENGALURU)
+        self.assertEqual(client.calls, 1)
+
+        # A fresh process finds the cell in the table.
+        other = ReverseGeocoder(client)
+        self.assertEqual(other.reverse(12.97160, 77.59460), self.BENGALURU)
+        self.assertEqual(client.calls, 1)
+
+        # 150 m away is another address and goes upstream again.
+        geocoder.reverse(12.97300, 77.59460)
+        self.assertEqual(client.calls, 2)
+
+    def test_negative_and_failed_lookups_are_cached(self):
+        client = _StubGeocoder({0: None, 1: GeocodeUnavailable("timeout")})
+        geocoder = ReverseGeocoder(client)
+        self.assertIsNone(geocoder.reverse(0.0, 0.0))
+        self.assertIsNone(geocoder.reverse(0.0, 0.0))
+        self.assertTrue(GeocodeCacheEntry.objects.filter(result__isnull=True).exists())
+
+        for _ in range(2):
+            with self.assertRaises(GeocodeUnavailable):
+                geocoder.reverse(1.0, 1.0)
+        self.assertEqual(client.calls, 2)
+
+    def test_outage_falls_back_to_the_locality_without_street_address(self):
+        client = _StubGeocoder({12: self.BENGALURU})
+        geocoder = ReverseGeocoder(client)
+        geocoder.reverse(12.97160, 77.59460)
+
+        client.results[12] = GeocodeUnavailable("timeout")
+        result = geocoder.reverse(12.97300, 77.59500)
+        self.assertEqual(result["city"], "Bengaluru")
+        self.assertEqual(result["display_name"], "")
+
+    def test_expired_entries_are_refetched(self):
+        now = [1000.0]
+        client = _StubGeocoder({12: self.BENGALURU})
+        geocoder = ReverseGeocoder(client, ttl=60, clock=lambda: now[0])
+        geocoder.reverse(12.9716, 77.5946)
+        now[0] += 61
+        GeocodeCacheEntry.objects.update(expires_at=timezone.now())
+        geocoder.reverse(12.9716, 77.5946)
+        self.assertEqual(client.calls, 2)
+
+
+class _MemoryOnlyGeocoder(ReverseGeocoder):
+    # Worker threads cannot see the test transaction, so keep the table out.
+    def _load(self, cell):
+        return None
+
+    def _save(self, cell, result, ttl):
+        pass
+
+
+class GeocodeCoalescingTests(SimpleTestCase):
+    def test_concurrent_lookups_of_one_cell_share_a_call(self):
+        client = _StubGeocoder({12: ReverseGeocoderTests.BENGALURU}, delay=0.2)
+        geocoder = _MemoryOnlyGeocoder(client)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(geocoder.reverse(12.9716, 77.5946)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(results, [ReverseGeocoderTests.BENGALURU] * 5)
+
+
+class GazetteerTests(TestCase):
+    def test_nearest_city_matches_a_linear_scan(self):
+        cities = read_dataset()
+        gazetteer = Gazetteer(cities)
+        for lat, lon in [(12.93, 77.62), (19.10, 72.90), (28.50, 77.10), (9.95, 76.30), (26.15, 91.70)]:
+            nearest = min(cities, key=lambda c: (c["latitude"] - lat) ** 2 + (c["longitude"] - lon) ** 2)
+            self.assertEqual(gazetteer.nearest(lat, lon)["city"], nearest["name"])
+
+    def test_far_from_any_city(self):
+        self.assertIsNone(Gazetteer(read_dataset()).nearest(-33.87, 151.21, max_km=75))
+
+    def test_lookups_follow_the_loaded_table(self):
+        load_dataset([{"name": "Bengaluru", "state": "Karnataka", "country": "India",
+                       "latitude": 12.9716, "longitude": 77.5946}])
+        with override_settings(GAZETTEER_REFRESH_SECONDS=0):
+            self.assertEqual(nearest_city(13.0, 77.6)["city"], "Bengaluru")
+            self.assertIsNone(nearest_city(19.07, 72.88))
+
+
+class ProviderListTests(TestCase):
+    def test_search_by_name_prefix(self):
+        User.objects.create_user("ravi_k", password="pw", role=User.Role.PROVIDER)
+        User.objects.create_user("anil", password="pw", role=User.Role.PROVIDER, first_name="Ravindra")
+        User.objects.create_user("suresh", password="pw", role=User.Role.PROVIDER)
+
+        response = APIClient().get("/api/accounts/providers/", {"search": "RAV"})
+        self.assertEqual(sorted(p["username"] for p in response.json()["results"]), ["anil", "ravi_k"])
+
+
+class CityKeyTests(TestCase):
+    def test_spellings_share_a_key(self):
+        for spelling in ["Bengaluru", " bangalore ", "BANGALORE", "Bengaluru (Urban)"]:
+            self.assertEqual(city_key(spelling), "bengaluru")
+        self.assertEqual(city_key("Thiruvananthapuram"), city_key("Trivandrum"))
+        self.assertEqual(city_key("Navi-Mumbai"), "navi mumbai")
+        self.assertEqual(city_key("?!"), "")
+
+    def test_aliases_resolve_to_gazetteer_names(self):
+        names = {city_key(row["name"]) for row in read_dataset()}
+        self.assertLessEqual(set(ALIASES.values()), names)
+
+    def test_save_keeps_key_in_step(self):
+        user = User.objects.create_user("p1", password="pw", role=User.Role.PROVIDER)
+        profile = ProviderProfile.objects.create(user=user, city="Bangalore")
+        self.assertEqual(profile.city_key, "bengaluru")
+
+        profile.city = "Bombay"
+        profile.save(update_fields=["city"])
+        self.assertEqual(ProviderProfile.objects.get(pk=profile.pk).city_key, "mumbai")
+
+    def test_backfill_rekeys_stale_rows(self):
+        user = User.objects.create_user("c1", password="pw", role=User.Role.CUSTOMER)
+        CustomerProfile.objects.create(user=user, city="Bombay")
+        CustomerProfile.objects.update(city_key="")  # As a bulk write would leave it.
+        self.assertEqual(backfill(CustomerProfile, dry_run=True), 1)
+        self.assertEqual(backfill(CustomerProfile), 1)
+        self.assertEqual(CustomerProfile.objects.get(user=user).city_key, "mumbai")
+        self.assertEqual(backfill(CustomerProfile), 0)
+
+    def test_provider_search_matches_alias(self):
+        service = Service.objects.create(
+            category=ServiceCategory.objects.create(name="Cleaning"), name="Deep clean", base_price=500
+        )
+        for username, city in [("p1", "Bengaluru"), ("p2", "Mumbai")]:
+            provider = User.objects.create_user(username, password="pw", role=User.Role.PROVIDER)
+            profile = ProviderProfile.objects.create(user=provider, city=city)
+            profile.services.add(service)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("c1", password="pw", role=User.Role.CUSTOMER))
+
+        response = client.get(f"/api/services/{service.id}/providers/", {"city": "bangalore"})
+        self.assertEqual([p["username"] for p in response.json()["results"]], ["p1"])
@@ -6,6 +6,8 @@ from .views import (
     NotificationListAPIView,
     NotificationReadAPIView,
     NotificationReadAllAPIView,
+    NotificationStreamTicketAPIView,
+    NotificationUnreadCountAPIView,
     AdminUserListAPIView,
     AdminUserToggleAPIView,
     AdminUserDeleteAPIView,
@@ -21,6 +23,7 @@ from .views import (
     ProviderServicePriceMeAPIView,
     ReverseGeocodeAPIView,
 )
+from .streaming import notification_stream
 
 
 urlpatterns = [
@@ -29,6 +32,9 @@ urlpatterns = [
     path('me/', ProfileAPIView.as_view()),
     path("providers/", ProviderListAPIView.as_view()),
     path("notifications/", NotificationListAPIView.as_view()),
+    path("notifications/stream/", notification_stream),
+    path("notifications/stream/ticket/", NotificationStreamTicketAPIView.as_view()),
+    path("notifications/unread-count/", NotificationUnreadCountAPIView.as_view()),
     path("notifications/read/<int:notification_id>/", NotificationReadAPIView.as_view()),
     path("notifications/read-all/", NotificationReadAllAPIView.as_view()),
     path("admin/users/", AdminUserListAPIView.as_view()),
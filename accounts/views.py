@@ -4,49 +4,27 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import AllowAny
 from django.conf import settings
-from django.utils import timezone
-import json
-import random
-from datetime import timedelta
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
-from rest_framework_simplejwt.tokens import RefreshToken
-from .models import User, Notification, ProviderProfile, CustomerProfile, PhoneOTP, UserPhone, ProviderServicePrice
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from .models import User, Notification, NotificationCounter, ProviderProfile, CustomerProfile, PhoneOTP, UserPhone, ProviderServicePrice
 from .serializers import ProviderListSerializer
 from .serializers import CustomerSignupSerializer, ProviderSignupSerializer
 from .serializers import NotificationSerializer
 from .serializers import UserAdminSerializer
 from .serializers import normalize_indian_phone, validate_indian_phone
+from . import gazetteer, geocode, otp, sms, streaming
+from .jwt import ClaimsRefreshToken
+from .pagination import AdminUserCursorPagination, NotificationCursorPagination, ProviderPagination
+from services.catalog import refresh_starts_from
 from services.models import Service
 from accounts.permissions import IsAdmin, IsProvider
+from bookings.utils import ranked_providers
 
 
 def _consume_signup_otp(phone, otp_code):
     if not otp_code:
         return False, "otp is required"
-
-    max_attempts = int(getattr(settings, "OTP_MAX_ATTEMPTS", 5))
-    otp = PhoneOTP.objects.filter(
-        phone=phone,
-        purpose=PhoneOTP.Purpose.SIGNUP,
-        is_used=False,
-        expires_at__gt=timezone.now(),
-    ).order_by("-created_at").first()
-
-    if not otp:
-        return False, "OTP expired or not found"
-
-    if otp.attempts >= max_attempts:
-        return False, "Maximum attempts reached. Request a new OTP"
-
-    if otp.code != str(otp_code).strip():
-        otp.attempts += 1
-        otp.save(update_fields=["attempts"])
-        return False, "Invalid OTP"
-
-    otp.is_used = True
-    otp.save(update_fields=["is_used"])
-    return True, None
+    return otp.get_store().verify(phone, PhoneOTP.Purpose.SIGNUP, otp_code)
 
 
 class CustomerSignupAPIView(APIView):
@@ -91,76 +69,37 @@ class ProviderSignupAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-def _send_sms_otp(phone, otp):
-    api_key = (getattr(settings, "NINZA_SMS_AUTH_KEY", "") or "").strip()
-    sender_id = (getattr(settings, "NINZA_SMS_SENDER_ID", "") or "").strip()
-    route = (getattr(settings, "NINZA_SMS_ROUTE", "") or "").strip()
+def _rate_limited(exc):
+    response = Response({"error": str(exc)}, status=429)
+    response["Retry-After"] = str(exc.retry_after)
+    return response
 
-    if not api_key:
-        return False, "NINZA_SMS_AUTH_KEY is not configured"
-    if not sender_id:
-        return False, "NINZA_SMS_SENDER_ID is not configured"
 
-    payload = {
-        "sender_id": sender_id,
-        "variables_values": otp,
-        "numbers": phone,
-    }
-    if route:
-        payload["rout"] = route
-    body = json.dumps(payload).encode("utf-8")
+def _send_sms_otp(phone, code, purpose):
+    # Only queues the message; accounts.sms delivers it in the background.
+    store = otp.get_store()
 
-    try:
-        req = Request(
-            "https://ninzasms.in.net/auth/send_sms",
-            data=body,
-            method="POST",
-            headers={
-                "authorization": api_key,
-                "Content-Type": "application/json",
-            },
-        )
-        with urlopen(req, timeout=8) as resp:
-            response_data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-
-        return_value = response_data.get("return")
-        status_value = str(response_data.get("status", "")).strip().lower()
-        message_value = str(response_data.get("message", "")).strip().lower()
-
-        success = (
-            return_value is True
-            or str(return_value).strip().lower() in {"true", "1", "yes"}
-            or status_value in {"success", "ok", "sent", "200", "1", "true"}
-            or ("success" in message_value or "sent" in message_value)
-        )
-        if success:
-            return True, None
-        return False, response_data.get("message") or "OTP provider rejected request"
-    except HTTPError as exc:
+    def undelivered(reason):
+        # Runs on an SMS worker thread: withdraw the code so a resend is not held by the cooldown.
         try:
-            raw = exc.read().decode("utf-8", errors="ignore")
-            payload = {}
-            if raw:
-                try:
-                    payload = json.loads(raw)
-                except Exception:
-                    payload = {"raw": raw}
-            errors = payload.get("errors") or []
-            first_error = errors[0] if isinstance(errors, list) and errors else {}
-            message = (
-                first_error.get("message")
-                or payload.get("message")
-                or payload.get("error")
-                or payload.get("raw")
-                or "Forbidden"
-            )
-            return False, f"OTP provider HTTP {exc.code}: {message}"
-        except Exception:
-            return False, f"OTP provider HTTP error: {exc.code}"
-    except URLError as exc:
-        return False, f"OTP network error: {exc.reason}"
-    except Exception as exc:
-        return False, f"OTP request failed: {str(exc)}"
+            store.fail(phone, purpose, code, reason)
+        finally:
+            close_old_connections()
+
+    try:
+        sms.send_otp(phone, code, on_failure=undelivered)
+    except sms.SmsUnavailable as exc:
+        # Never queued, so withdraw it here too; DEBUG still hands it back as dev_otp.
+        if not settings.DEBUG:
+            store.fail(phone, purpose, code, str(exc))
+        return False, str(exc)
+    return True, None
+
+
+def _otp_sent_response(previous_failure):
+    if previous_failure:
+        return Response({"message": "Your last OTP could not be delivered. A new one is being sent via SMS"})
+    return Response({"message": "OTP is being sent via SMS"})
 
 
 class SendLoginOTPAPIView(APIView):
@@ -176,36 +115,24 @@ class SendLoginOTPAPIView(APIView):
         if not UserPhone.objects.filter(phone=phone, user__is_active=True).exists():
             return Response({"error": "No active account found for this mobile number"}, status=404)
 
-        cooldown_seconds = int(getattr(settings, "OTP_RESEND_COOLDOWN_SECONDS", 30))
-        latest = PhoneOTP.objects.filter(
-            phone=phone,
-            purpose=PhoneOTP.Purpose.LOGIN,
-            is_used=False,
-            expires_at__gt=timezone.now(),
-        ).order_by("-created_at").first()
-        if latest and (timezone.now() - latest.created_at).total_seconds() < cooldown_seconds:
-            wait = cooldown_seconds - int((timezone.now() - latest.created_at).total_seconds())
-            return Response({"error": f"Please wait {max(wait, 1)} seconds before requesting a new OTP"}, status=429)
-
-        otp = f"{random.randint(100000, 999999)}"
-        expiry_seconds = int(getattr(settings, "OTP_EXPIRY_SECONDS", 300))
-        PhoneOTP.objects.create(
-            phone=phone,
-            code=otp,
-            purpose=PhoneOTP.Purpose.LOGIN,
-            expires_at=timezone.now() + timedelta(seconds=expiry_seconds),
-        )
-
-        sent, reason = _send_sms_otp(phone, otp)
+        try:
+            otp.check_send_limits(request, phone)
+            store = otp.get_store()
+            previous_failure = store.last_failure(phone, PhoneOTP.Purpose.LOGIN)
+            code = store.issue(phone, PhoneOTP.Purpose.LOGIN)
+        except otp.RateLimited as exc:
+            return _rate_limited(exc)
+
+        sent, reason = _send_sms_otp(phone, code, PhoneOTP.Purpose.LOGIN)
         if not sent:
             if settings.DEBUG:
                 return Response({
                     "message": "OTP generated (debug mode fallback)",
-                    "dev_otp": otp,
+                    "dev_otp": code,
                 })
             return Response({"error": reason or "Failed to send OTP"}, status=502)
 
-        return Response({"message": "OTP sent successfully via SMS"})
+        return _otp_sent_response(previous_failure)
 
 
 class SendSignupOTPAPIView(APIView):
@@ -221,36 +148,24 @@ class SendSignupOTPAPIView(APIView):
         if UserPhone.objects.filter(phone=phone, user__is_active=True).exists():
             return Response({"error": "This mobile number is already registered"}, status=400)
 
-        cooldown_seconds = int(getattr(settings, "OTP_RESEND_COOLDOWN_SECONDS", 30))
-        latest = PhoneOTP.objects.filter(
-            phone=phone,
-            purpose=PhoneOTP.Purpose.SIGNUP,
-            is_used=False,
-            expires_at__gt=timezone.now(),
-        ).order_by("-created_at").first()
-        if latest and (timezone.now() - latest.created_at).total_seconds() < cooldown_seconds:
-            wait = cooldown_seconds - int((timezone.now() - latest.created_at).total_seconds())
-            return Response({"error": f"Please wait {max(wait, 1)} seconds before requesting a new OTP"}, status=429)
-
-        otp = f"{random.randint(100000, 999999)}"
-        expiry_seconds = int(getattr(settings, "OTP_EXPIRY_SECONDS", 300))
-        PhoneOTP.objects.create(
-            phone=phone,
-            code=otp,
-            purpose=PhoneOTP.Purpose.SIGNUP,
-            expires_at=timezone.now() + timedelta(seconds=expiry_seconds),
-        )
-
-        sent, reason = _send_sms_otp(phone, otp)
+        try:
+            otp.check_send_limits(request, phone)
+            store = otp.get_store()
+            previous_failure = store.last_failure(phone, PhoneOTP.Purpose.SIGNUP)
+            code = store.issue(phone, PhoneOTP.Purpose.SIGNUP)
+        except otp.RateLimited as exc:
+            return _rate_limited(exc)
+
+        sent, reason = _send_sms_otp(phone, code, PhoneOTP.Purpose.SIGNUP)
         if not sent:
             if settings.DEBUG:
                 return Response({
                     "message": "OTP generated (debug mode fallback)",
-                    "dev_otp": otp,
+                    "dev_otp": code,
                 })
             return Response({"error": reason or "Failed to send OTP"}, status=502)
 
-        return Response({"message": "OTP sent successfully via SMS"})
+        return _otp_sent_response(previous_failure)
 
 
 class VerifyLoginOTPAPIView(APIView):
@@ -262,34 +177,21 @@ class VerifyLoginOTPAPIView(APIView):
         if not phone or not otp_code:
             return Response({"error": "phone and otp are required"}, status=400)
 
-        max_attempts = int(getattr(settings, "OTP_MAX_ATTEMPTS", 5))
-        otp = PhoneOTP.objects.filter(
-            phone=phone,
-            purpose=PhoneOTP.Purpose.LOGIN,
-            is_used=False,
-            expires_at__gt=timezone.now(),
-        ).order_by("-created_at").first()
-
-        if not otp:
-            return Response({"error": "OTP expired or not found"}, status=400)
-
-        if otp.attempts >= max_attempts:
-            return Response({"error": "Maximum attempts reached. Request a new OTP"}, status=400)
-
-        if otp.code != otp_code:
-            otp.attempts += 1
-            otp.save(update_fields=["attempts"])
-            return Response({"error": "Invalid OTP"}, status=400)
+        try:
+            otp.check_verify_limits(request)
+        except otp.RateLimited as exc:
+            return _rate_limited(exc)
 
-        otp.is_used = True
-        otp.save(update_fields=["is_used"])
+        ok, err = otp.get_store().verify(phone, PhoneOTP.Purpose.LOGIN, otp_code)
+        if not ok:
+            return Response({"error": err}, status=400)
 
         phone_record = UserPhone.objects.filter(phone=phone, user__is_active=True).select_related("user").first()
         if not phone_record:
             return Response({"error": "No active account found for this mobile number"}, status=404)
 
         user = phone_record.user
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         return Response({
             "access": str(refresh.access_token),
             "refresh": str(refresh),
@@ -308,7 +210,8 @@ class ProfileAPIView(APIView):
             if request.user.is_staff or request.user.is_superuser
             else request.user.role
         )
-        phone_record = UserPhone.objects.filter(user=request.user).first()
+        # Loaded with the user by CachedJWTAuthentication.
+        phone_record = getattr(request.user, "phone_record", None)
         full_name = (f"{request.user.first_name} {request.user.last_name}").strip()
         return Response({
             "username": request.user.username,
@@ -381,17 +284,27 @@ class ProviderListAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        providers = User.objects.filter(role="PROVIDER")
-
-        # Sort by rating (high → low)
-        providers = sorted(
-            providers,
-            key=lambda u: u.average_rating(),
-            reverse=True
-        )
+        service_id = request.query_params.get("service_id")
+        if service_id and not service_id.isdigit():
+            return Response({"error": "service_id must be an integer"}, status=400)
+        city = (request.query_params.get("city") or "").strip()
+
+        # Sorted by rating (high → low) in the database
+        providers = ranked_providers(service_id=service_id, city=city)
+
+        # Prefix search for pickers; uses the user name indexes.
+        search = (request.query_params.get("search") or "").strip()
+        if search:
+            providers = providers.filter(
+                Q(username__istartswith=search)
+                | Q(first_name__istartswith=search)
+                | Q(last_name__istartswith=search)
+            )
 
-        serializer = ProviderListSerializer(providers, many=True)
-        return Response(serializer.data)
+        paginator = ProviderPagination()
+        page = paginator.paginate_queryset(providers, request, view=self)
+        serializer = ProviderListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 
@@ -399,32 +312,55 @@ class NotificationListAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(
-            user=request.user
-        ).order_by("-created_at")
+        notifications = Notification.objects.filter(user=request.user)
+
+        # Incremental fetch: only notifications newer than the client's last seen id.
+        since_id = request.query_params.get("since_id")
+        if since_id:
+            if not since_id.isdigit():
+                return Response({"error": "since_id must be an integer"}, status=400)
+            notifications = notifications.filter(id__gt=int(since_id))
+
+        paginator = NotificationCursorPagination()
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class NotificationUnreadCountAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": NotificationCounter.unread_for(request.user.id)})
 
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data)
+
+class NotificationStreamTicketAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            "ticket": streaming.issue_ticket(request.user),
+            "expires_in": streaming.ticket_seconds(),
+        })
 
 
 class NotificationReadAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, notification_id):
-        try:
-            notification = Notification.objects.get(
-                id=notification_id,
-                user=request.user
-            )
-        except Notification.DoesNotExist:
+        notifications = Notification.objects.filter(id=notification_id, user=request.user)
+        with transaction.atomic():
+            # Only an unread -> read transition moves the counter.
+            updated = notifications.filter(is_read=False).update(is_read=True)
+            if updated:
+                NotificationCounter.mark_read(request.user.id, updated)
+
+        if not updated and not notifications.exists():
             return Response(
                 {"error": "Notification not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        notification.is_read = True
-        notification.save()
-
         return Response({"message": "Marked as read"})
 
 
@@ -432,26 +368,70 @@ class NotificationReadAllAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).update(is_read=True)
+        NotificationCounter.mark_all_read(request.user.id)
         return Response({"message": "All notifications marked as read"})
 
 
+def _filter_admin_users(users, params):
+    """
+    Apply the admin user list filters: role, active, city (prefix) and
+    search, a prefix match on username, first/last name or mobile number.
+
+    Every text filter is a prefix match so it can use the search indexes
+    from migration 0010 instead of scanning the user table.
+    """
+    role = (params.get("role") or "").strip().upper()
+    if role:
+        users = users.filter(role=role)
+
+    active = (params.get("active") or "").strip().lower()
+    if active in ("true", "1"):
+        users = users.filter(is_active=True)
+    elif active in ("false", "0"):
+        users = users.filter(is_active=False)
+
+    city = (params.get("city") or "").strip()
+    if city:
+        users = users.filter(
+            Q(provider_profile__city__istartswith=city) | Q(customerprofile__city__istartswith=city)
+        )
+
+    phone = normalize_indian_phone(params.get("phone", ""))
+    if phone:
+        users = users.filter(phone_record__phone__istartswith=phone)
+
+    search = (params.get("search") or "").strip()
+    if search:
+        first, _, rest = search.partition(" ")
+        match = (
+            Q(username__istartswith=search)
+            | Q(first_name__istartswith=search)
+            | Q(last_name__istartswith=search)
+        )
+        if rest.strip():
+            match |= Q(first_name__iexact=first, last_name__istartswith=rest.strip())
+        if search.replace(" ", "").lstrip("+").isdigit():
+            match |= Q(phone_record__phone__istartswith=normalize_indian_phone(search))
+        users = users.filter(match)
+    return users
+
+
 class AdminUserListAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        users = User.objects.all().prefetch_related(
-            "provider_profile__services"
-        ).select_related(
+        users = User.objects.all().select_related(
             "customerprofile",
             "provider_profile",
             "phone_record",
-        ).order_by("-date_joined")
-        serializer = UserAdminSerializer(users, many=True)
-        return Response(serializer.data)
+        )
+        users = _filter_admin_users(users, request.query_params)
+
+        paginator = AdminUserCursorPagination()
+        # Services are prefetched for the current page only.
+        page = paginator.paginate_queryset(users.prefetch_related("provider_profile__services"), request, view=self)
+        serializer = UserAdminSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class AdminUserToggleAPIView(APIView):
@@ -466,6 +446,13 @@ class AdminUserToggleAPIView(APIView):
         user.is_active = not user.is_active
         user.save()
 
+        if user.role == User.Role.PROVIDER:
+            refresh_starts_from(
+                ProviderServicePrice.objects.filter(
+                    provider_profile__user=user
+                ).values_list("service_id", flat=True)
+            )
+
         return Response({"message": "User updated", "is_active": user.is_active})
 
 
@@ -683,36 +670,21 @@ class ReverseGeocodeAPIView(APIView):
         except (TypeError, ValueError):
             return Response({"error": "lat and lon are required"}, status=400)
 
-        url = (
-            "https://nominatim.openstreetmap.org/reverse"
-            f"?format=jsonv2&lat={lat_val}&lon={lon_val}&zoom=18&addressdetails=1"
-        )
-        req = Request(
-            url,
-            headers={
-                "User-Agent": "serviceapp/1.0 (support@serviceapp.local)",
-                "Accept": "application/json",
-            },
-        )
+        if not (-90 <= lat_val <= 90 and -180 <= lon_val <= 180):
+            return Response({"error": "lat and lon are out of range"}, status=400)
 
         try:
-            with urlopen(req, timeout=8) as resp:
-                payload = json.loads(resp.read().decode("utf-8"))
-        except Exception:
-            return Response({"error": "Unable to resolve address"}, status=502)
-
-        addr = payload.get("address", {}) or {}
-        city = addr.get("city") or addr.get("town") or addr.get("village") or addr.get("county") or ""
-
-        return Response(
-            {
-                "display_name": payload.get("display_name", ""),
-                "city": city,
-                "postcode": addr.get("postcode", ""),
-                "state": addr.get("state", ""),
-                "country": addr.get("country", ""),
-            }
-        )
+            result = geocode.reverse(lat_val, lon_val)
+        except geocode.GeocodeUnavailable:
+            # Offline fallback: the nearest known city, without a street address.
+            match = gazetteer.nearest_city(lat_val, lon_val)
+            if not match:
+                return Response({"error": "Unable to resolve address"}, status=502)
+            result = {**geocode.EMPTY_RESULT, "city": match["city"], "state": match["state"],
+                      "country": match["country"]}
+        return Response(result or geocode.EMPTY_RESULT)
+
+
 def _sync_provider_service_prices(profile):
     service_ids = list(profile.services.values_list("id", flat=True))
     if not service_ids:
@@ -742,3 +714,5 @@ def _sync_provider_service_prices(profile):
         )
         for s in services
     ])
+    # bulk_create skips post_save, so refresh starts_from (and the catalog) here.
+    refresh_starts_from(missing_ids)
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Booking,Review
+from .models import Booking, ProviderSlot, Review
 
 admin.site.register(Booking)
 admin.site.register(Review)
+admin.site.register(ProviderSlot)
 
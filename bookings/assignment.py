@@ -0,0 +1,98 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from accounts.models import User
+from . import rollups
+from .availability import release_slots, reserve_slots
+from .models import Booking, NotificationOutbox
+from .outbox import enqueue_notifications
+
+# Bookings an admin may (re)assign; later states belong to their provider.
+ASSIGNABLE_STATUSES = {
+    Booking.Status.PENDING,
+    Booking.Status.ASSIGNED,
+    Booking.Status.CONFIRMED,
+}
+
+
+def _result(booking_id, provider_id, result, error=""):
+    return {"booking_id": booking_id, "provider_id": provider_id, "result": result, "error": error}
+
+
+def bulk_assign(pairs):
+    """
+    Apply many (booking_id, provider_id) assignments in one transaction.
+
+    Each pair succeeds or fails on its own; returns one result dict per pair,
+    in request order, with ``result`` of "assigned", "unchanged" or "failed".
+    """
+    providers = User.objects.filter(
+        id__in={provider_id for _, provider_id in pairs},
+        role=User.Role.PROVIDER,
+        is_active=True,
+    ).in_bulk()
+
+    results = [None] * len(pairs)
+    with transaction.atomic():
+        bookings = Booking.objects.select_for_update().in_bulk({booking_id for booking_id, _ in pairs})
+
+        planned = []
+        seen = set()
+        for index, (booking_id, provider_id) in enumerate(pairs):
+            booking = bookings.get(booking_id)
+            provider = providers.get(provider_id)
+            if booking_id in seen:
+                error = "Booking appears more than once in this request"
+            elif booking is None:
+                error = "Booking not found"
+            elif provider is None:
+                error = "Invalid provider"
+            elif booking.status not in ASSIGNABLE_STATUSES:
+                error = f"Cannot assign a {booking.status} booking"
+            else:
+                error = ""
+            seen.add(booking_id)
+
+            if error:
+                results[index] = _result(booking_id, provider_id, "failed", error)
+            elif booking.provider_id == provider.id:
+                results[index] = _result(booking_id, provider_id, "unchanged")
+            else:
+                planned.append((index, booking, provider))
+
+        # Take the new slots before giving back the old ones so a failed
+        # reservation leaves the booking exactly as it was.
+        granted = reserve_slots(
+            Counter((provider.id, booking.scheduled_date, booking.time_slot) for _, booking, provider in planned)
+        )
+        released = Counter()
+        changed = []
+        moved_from = defaultdict(list)
+        for index, booking, provider in planned:
+            key = (provider.id, booking.scheduled_date, booking.time_slot)
+            if not granted.get(key):
+                results[index] = _result(
+                    booking.id, provider.id, "failed", "Provider is fully booked for this time slot"
+                )
+                continue
+            granted[key] -= 1
+            if booking.provider_id:
+                released[(booking.provider_id, booking.scheduled_date, booking.time_slot)] += 1
+            moved_from[booking.status].append(booking)
+            booking.provider = provider
+            booking.status = Booking.Status.ASSIGNED
+            booking.version += 1
+            changed.append(booking)
+            results[index] = _result(booking.id, provider.id, "assigned")
+
+        release_slots(released)
+        for old_status, moved in moved_from.items():
+            rollups.move(moved, old_status, Booking.Status.ASSIGNED)
+        # bulk_update skips post_save, so nothing is re-derived per booking.
+        Booking.objects.bulk_update(changed, ["provider", "status", "version"], batch_size=500)
+        enqueue_notifications(
+            (booking, NotificationOutbox.Event.REQUESTED, booking.provider, f"New booking assigned (#{booking.id})", None)
+            for booking in changed
+        )
+    return results
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Booking, ProviderSlot
+
+# Bookings in these states no longer hold their provider's slot.
+RELEASED_STATUSES = {Booking.Status.CANCELLED}
+
+MAX_RANGE_DAYS = 62
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+def default_capacity():
+    return int(getattr(settings, "PROVIDER_SLOT_CAPACITY", 1))
+
+
+def reserve_slot(provider_id, date, time_slot):
+    """Take one unit of a provider's (date, time_slot) or raise SlotUnavailable.
+
+    The conditional UPDATE is the check: concurrent reservations serialise on
+    the row and at most ``capacity`` of them can succeed.
+    """
+    with transaction.atomic():
+        slot, _ = ProviderSlot.objects.get_or_create(
+            provider_id=provider_id,
+            date=date,
+            time_slot=time_slot,
+            defaults={"capacity": default_capacity()},
+        )
+        taken = ProviderSlot.objects.filter(pk=slot.pk, booked__lt=F("capacity")).update(
+            booked=F("booked") + 1
+        )
+    if not taken:
+        raise SlotUnavailable("Provider is fully booked for this time slot")
+
+
+def reserve_slots(per_key):
+    """Batch reserve_slot. ``per_key`` maps (provider_id, date, time_slot) -> units wanted.
+
+    Returns the units actually granted per key, which is less than asked
+    where a slot has too little room left.
+    """
+    capacity = default_capacity()
+    ProviderSlot.objects.bulk_create(
+        [
+            ProviderSlot(provider_id=p, date=d, time_slot=t, capacity=capacity)
+            for p, d, t in per_key
+        ],
+        ignore_conflicts=True,
+    )
+    granted = {}
+    for (provider_id, date, time_slot), count in per_key.items():
+        slot = ProviderSlot.objects.filter(provider_id=provider_id, date=date, time_slot=time_slot)
+        if slot.filter(booked__lte=F("capacity") - count).update(booked=F("booked") + count):
+            granted[(provider_id, date, time_slot)] = count
+            continue
+        # Not enough room for all of them: take what is left one unit at a time.
+        taken = 0
+        while taken < count and slot.filter(booked__lt=F("capacity")).update(booked=F("booked") + 1):
+            taken += 1
+        granted[(provider_id, date, time_slot)] = taken
+    return granted
+
+
+def release_slot(provider_id, date, time_slot):
+    ProviderSlot.objects.filter(
+        provider_id=provider_id,
+        date=date,
+        time_slot=time_slot,
+        booked__gt=0,
+    ).update(booked=F("booked") - 1)
+
+
+def release_slots(per_key):
+    """Batch release_slot. ``per_key`` maps (provider_id, date, time_slot) -> units to return."""
+    for (provider_id, date, time_slot), count in per_key.items():
+        ProviderSlot.objects.filter(
+            provider_id=provider_id,
+            date=date,
+            time_slot=time_slot,
+        ).update(booked=Greatest(F("booked") - count, 0))
+
+
+def free_slots(provider_id, date_from, date_to):
+    """Every (date, time_slot) in the range with room left, from one range scan."""
+    capacity = default_capacity()
+    held = {
+        (row.date, row.time_slot): row
+        for row in ProviderSlot.objects.filter(
+            provider_id=provider_id,
+            date__gte=date_from,
+            date__lte=date_to,
+        )
+    }
+
+    slots = []
+    day = date_from
+    while day <= date_to:
+        for time_slot in Booking.TimeSlot.values:
+            row = held.get((day, time_slot))
+            available = row.capacity - row.booked if row else capacity
+            if available > 0:
+                slots.append({"date": day, "time_slot": time_slot, "available": available})
+        day += timedelta(days=1)
+    return slots
+
+
+def rebuild_slots():
+    """Recount every ProviderSlot from the bookings that hold one, keeping capacity overrides."""
+    overrides = {
+        (row.provider_id, row.date, row.time_slot): row.capacity
+        for row in ProviderSlot.objects.all()
+    }
+    rows = (
+        Booking.objects.filter(provider__isnull=False)
+        .exclude(status__in=RELEASED_STATUSES)
+        .values("provider", "scheduled_date", "time_slot")
+        .annotate(count=Count("id"))
+    )
+    capacity = default_capacity()
+    slots = [
+        ProviderSlot(
+            provider_id=row["provider"],
+            date=row["scheduled_date"],
+            time_slot=row["time_slot"],
+            # Never below what is already booked, or the check constraint fails.
+            capacity=max(
+                overrides.get((row["provider"], row["scheduled_date"], row["time_slot"]), capacity),
+                row["count"],
+            ),
+            booked=row["count"],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        ProviderSlot.objects.update(booked=0)
+        ProviderSlot.objects.bulk_create(
+            slots,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["provider", "date", "time_slot"],
+            update_fields=["capacity", "booked"],
+        )
+    return len(slots)
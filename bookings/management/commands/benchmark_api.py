@@ -0,0 +1,154 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from accounts.jwt import ClaimsRefreshToken
+from accounts.models import User
+from config.query_budget import percentile
+from services.models import Service
+
+from .seed_load_data import PREFIX
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the key API endpoints through the Django test client against "
+        "data from seed_load_data and print p50/p95 latency, query counts and "
+        "peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--output", default="", help="Also write the JSON report to this file.")
+        parser.add_argument("--baseline", default="",
+                            help="Earlier report to compare p50/p95 and query counts against.")
+
+    def handle(self, *args, **options):
+        customer = self._seeded_user(User.Role.CUSTOMER)
+        admin = User.objects.filter(username=f"{PREFIX}admin").first()
+        if not customer or not admin:
+            raise CommandError("No seeded users found; run seed_load_data first.")
+        service = (
+            Service.objects.filter(is_active=True, providers__user__username__startswith=PREFIX)
+            .order_by("id")
+            .first()
+        )
+
+        endpoints = [
+            ("bookings_my", customer, "/api/bookings/my/"),
+            ("bookings_admin_all", admin, "/api/bookings/admin/all/"),
+            ("services_categories", customer, "/api/services/categories/"),
+            ("accounts_providers", customer, "/api/accounts/providers/"),
+        ]
+        if service:
+            endpoints.append(("service_providers", customer, f"/api/services/{service.id}/providers/"))
+
+        results = {}
+        # The benchmark measures itself; keep the query budget middleware out of the numbers.
+        with override_settings(ALLOWED_HOSTS=["testserver"], QUERY_BUDGET_ENABLED=False):
+            for name, user, url in endpoints:
+                results[name] = self._run(user, url, options["iterations"], options["warmup"])
+
+        report = {
+            "commit": _git_commit(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "endpoints": results,
+        }
+        if options["baseline"]:
+            report["comparison"] = self._compare(options["baseline"], results)
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+        self.stdout.write(payload)
+
+    def _seeded_user(self, role):
+        return (
+            User.objects.filter(username__startswith=PREFIX, role=role)
+            .order_by("id")
+            .first()
+        )
+
+    def _run(self, user, url, iterations, warmup):
+        client = APIClient()
+        token = str(ClaimsRefreshToken.for_user(user).access_token)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        for _ in range(warmup):
+            client.get(url)
+
+        timings = []
+        queries = []
+        status_code = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+            status_code = response.status_code
+
+        # Separate pass: tracemalloc would distort the latency numbers.
+        tracemalloc.start()
+        try:
+            client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "url": url,
+            "status": status_code,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "response_bytes": len(response.content),
+        }
+
+    def _compare(self, path, results):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                baseline = json.load(fh).get("endpoints", {})
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read baseline {path}: {exc}")
+
+        comparison = {}
+        for name, current in results.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            comparison[name] = {
+                key: {
+                    "before": before.get(key),
+                    "after": current[key],
+                    "ratio": round(current[key] / before[key], 3) if before.get(key) else None,
+                }
+                for key in ("p50_ms", "p95_ms", "queries", "peak_memory_kb")
+            }
+        return comparison
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookings.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued booking notifications from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--max-attempts", type=int,
+                            default=int(getattr(settings, "NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 5)))
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when idle.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle in --loop mode.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = drain_outbox(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Delivered {sent}, failed {failed}")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: {total_sent} delivered, {total_failed} failed."
+        ))
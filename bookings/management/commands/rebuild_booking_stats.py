@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bookings import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily booking rollups (BookingDailyStat) from bookings, prices and reviews."
+
+    def handle(self, *args, **options):
+        total = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} daily booking stat row(s)."))
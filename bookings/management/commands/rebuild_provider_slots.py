@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bookings.availability import rebuild_slots
+
+
+class Command(BaseCommand):
+    help = "Recount provider slot occupancy from bookings, keeping per-slot capacity overrides."
+
+    def handle(self, *args, **options):
+        total = rebuild_slots()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} occupied provider slot(s)."))
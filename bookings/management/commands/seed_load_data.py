@@ -0,0 +1,214 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.cities import city_key
+from accounts.models import (
+    CustomerProfile,
+    ProviderProfile,
+    ProviderRating,
+    ProviderServicePrice,
+    User,
+    UserPhone,
+)
+from bookings import rollups
+from bookings.availability import rebuild_slots
+from bookings.models import Booking, Review
+from services.catalog import refresh_starts_from
+from services.models import Service
+
+PREFIX = "load_"
+PASSWORD = "loadtest123"
+CITIES = [
+    "Bengaluru",
+    "Mumbai",
+    "Delhi",
+    "Hyderabad",
+    "Chennai",
+    "Pune",
+    "Kolkata",
+    "Ahmedabad",
+]
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a reproducible load-test dataset (customers, providers, prices, "
+        f"bookings, reviews). All seeded usernames start with '{PREFIX}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=500)
+        parser.add_argument("--providers", type=int, default=100)
+        parser.add_argument("--bookings", type=int, default=5000)
+        parser.add_argument("--review-ratio", type=float, default=0.6,
+                            help="Share of completed bookings that get a review.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--start-date", type=date.fromisoformat, default=date(2026, 1, 1),
+                            help="First scheduled_date (bookings span the following 120 days).")
+        parser.add_argument("--flush", action="store_true",
+                            help="Delete previously seeded data before seeding.")
+
+    def handle(self, *args, **options):
+        services = list(Service.objects.filter(is_active=True).order_by("id"))
+        if not services:
+            raise CommandError("No active services found; run migrations first.")
+
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            if not options["flush"]:
+                raise CommandError("Seeded data already exists; pass --flush to replace it.")
+            self._flush()
+
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            password = make_password(PASSWORD)
+            User.objects.create_user(
+                username=f"{PREFIX}admin",
+                password=PASSWORD,
+                role=User.Role.ADMIN,
+                is_staff=True,
+            )
+            customers = self._seed_customers(options["customers"], password, rng)
+            providers = self._seed_providers(options["providers"], password, services, rng)
+            bookings = self._seed_bookings(
+                options["bookings"], customers, providers, options["start_date"], rng
+            )
+            reviews = self._seed_reviews(bookings, options["review_ratio"], rng)
+            rebuilt = ProviderRating.rebuild()
+            refresh_starts_from()
+            rebuild_slots()
+            rollups.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(customers)} customers, {len(providers)} providers, "
+            f"{len(bookings)} bookings, {reviews} reviews "
+            f"({rebuilt} provider rating aggregates). Password: {PASSWORD}"
+        ))
+
+    def _flush(self):
+        with transaction.atomic():
+            # Bookings and reviews cascade from their customer.
+            User.objects.filter(username__startswith=PREFIX).delete()
+            ProviderRating.rebuild()
+            refresh_starts_from()
+            rebuild_slots()
+            rollups.rebuild()
+
+    def _seed_customers(self, count, password, rng):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{PREFIX}customer_{i}",
+                    first_name="Customer",
+                    last_name=str(i),
+                    email=f"{PREFIX}customer_{i}@example.com",
+                    password=password,
+                    role=User.Role.CUSTOMER,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        users = list(User.objects.filter(username__startswith=f"{PREFIX}customer_").order_by("id"))
+        profiles = CustomerProfile.objects.bulk_create(
+            [
+                CustomerProfile(user=u, city=city, city_key=city_key(city))
+                for u, city in zip(users, [rng.choice(CITIES) for _ in users])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for user, profile in zip(users, profiles):
+            user.seeded_city = profile.city
+        UserPhone.objects.bulk_create(
+            [UserPhone(user=u, phone=f"9{i:09d}") for i, u in enumerate(users)],
+            batch_size=BATCH_SIZE,
+        )
+        return users
+
+    def _seed_providers(self, count, password, services, rng):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{PREFIX}provider_{i}",
+                    first_name="Provider",
+                    last_name=str(i),
+                    email=f"{PREFIX}provider_{i}@example.com",
+                    password=password,
+                    role=User.Role.PROVIDER,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        users = list(User.objects.filter(username__startswith=f"{PREFIX}provider_").order_by("id"))
+        ProviderProfile.objects.bulk_create(
+            [
+                ProviderProfile(user=u, city=city, city_key=city_key(city))
+                for u, city in zip(users, [rng.choice(CITIES) for _ in users])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        UserPhone.objects.bulk_create(
+            [UserPhone(user=u, phone=f"8{i:09d}") for i, u in enumerate(users)],
+            batch_size=BATCH_SIZE,
+        )
+
+        profiles = list(ProviderProfile.objects.filter(user__in=users).order_by("user_id"))
+        through = ProviderProfile.services.through
+        links = []
+        prices = []
+        for profile in profiles:
+            offered = rng.sample(services, k=min(len(services), rng.randint(1, 5)))
+            profile.offered_services = offered
+            for service in offered:
+                links.append(through(providerprofile_id=profile.id, service_id=service.id))
+                factor = Decimal(rng.randint(80, 150)) / 100
+                prices.append(ProviderServicePrice(
+                    provider_profile=profile,
+                    service=service,
+                    price=(service.base_price * factor).quantize(Decimal("0.01")),
+                ))
+        through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+        ProviderServicePrice.objects.bulk_create(prices, batch_size=BATCH_SIZE)
+        return profiles
+
+    def _seed_bookings(self, count, customers, providers, start, rng):
+        if not customers or not providers:
+            return []
+        statuses = Booking.Status.values
+        slots = Booking.TimeSlot.values
+        bookings = []
+        for _ in range(count):
+            profile = rng.choice(providers)
+            status = rng.choice(statuses)
+            customer = rng.choice(customers)
+            bookings.append(Booking(
+                customer=customer,
+                city=customer.seeded_city,
+                provider_id=None if status == Booking.Status.PENDING else profile.user_id,
+                service=rng.choice(profile.offered_services),
+                address=f"{rng.randint(1, 999)} Load Street, {profile.city}",
+                scheduled_date=start + timedelta(days=rng.randint(0, 120)),
+                time_slot=rng.choice(slots),
+                status=status,
+            ))
+        return Booking.objects.bulk_create(bookings, batch_size=BATCH_SIZE)
+
+    def _seed_reviews(self, bookings, ratio, rng):
+        reviews = [
+            Review(
+                booking=b,
+                author_id=b.customer_id,
+                rating=rng.randint(1, 5),
+                comment="",
+            )
+            for b in bookings
+            if b.status == Booking.Status.COMPLETED and b.provider_id and rng.random() < ratio
+        ]
+        Review.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
+        return len(reviews)
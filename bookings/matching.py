@@ -0,0 +1,206 @@
+"""
+Batch matching of unassigned PENDING bookings to providers.
+
+One run loads the pending bookings of a date window, every provider that
+offers one of their services, those providers' prices, ratings and slot
+occupancy, then scores candidates in memory and assigns greedily in booking
+order. A booking with a city is only offered providers in that city; if none
+of them is free it stays PENDING. Everything is written back in the caller's transaction: slots are
+taken with conditional UPDATEs (see bookings/availability.py), bookings with
+one bulk_update and provider notifications with one outbox insert.
+"""
+
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db.models import Prefetch
+
+from accounts.cities import city_key
+from accounts.models import ProviderProfile, User
+from services.models import Service
+from . import rollups
+from .availability import default_capacity, reserve_slots
+from .models import Booking, NotificationOutbox, ProviderSlot
+from .outbox import enqueue_notifications
+
+# Relative weight of each normalised (0..1) score component.
+WEIGHTS = {
+    "rating": 2.0,
+    "price": 1.5,
+    "capacity": 0.5,
+}
+# Reviews-worth of weight pulling a provider's rating toward PRIOR_RATING,
+# so a single 5-star review does not outrank a long good track record.
+PRIOR_REVIEWS = 3
+PRIOR_RATING = 3.5
+
+
+class _Candidate:
+    __slots__ = ("user", "city", "service_ids", "prices", "rating")
+
+    def __init__(self, profile):
+        self.user = profile.user
+        self.city = profile.city_key
+        self.service_ids = {s.id for s in profile.services.all()}
+        self.prices = {p.service_id: p.price for p in profile.service_prices.all()}
+        summary = getattr(profile.user, "rating_summary", None)
+        total = summary.rating_sum if summary else 0
+        count = summary.rating_count if summary else 0
+        self.rating = (total + PRIOR_RATING * PRIOR_REVIEWS) / (count + PRIOR_REVIEWS)
+
+    def price_for(self, services):
+        return sum((self.prices.get(s.id, s.base_price) for s in services), Decimal("0"))
+
+
+def _pending_bookings(date_from, date_to, limit):
+    bookings = (
+        Booking.objects.select_for_update(skip_locked=True, of=("self",))
+        .filter(status=Booking.Status.PENDING, provider__isnull=True)
+        .select_related("service")
+        .prefetch_related(
+            Prefetch("additional_services", queryset=Service.objects.only("id", "base_price"))
+        )
+        .order_by("created_at", "id")
+    )
+    if date_from:
+        bookings = bookings.filter(scheduled_date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(scheduled_date__lte=date_to)
+    if limit:
+        bookings = bookings[:limit]
+    return list(bookings)
+
+
+def _candidates(service_ids):
+    profiles = (
+        ProviderProfile.objects.filter(
+            user__role=User.Role.PROVIDER,
+            user__is_active=True,
+            services__id__in=service_ids,
+        )
+        .distinct()
+        .select_related("user__rating_summary")
+        .prefetch_related(
+            Prefetch("services", queryset=Service.objects.only("id")),
+            "service_prices",
+        )
+    )
+    by_service = defaultdict(list)
+    for profile in profiles:
+        candidate = _Candidate(profile)
+        for service_id in candidate.service_ids:
+            by_service[service_id].append(candidate)
+    return by_service
+
+
+def _score(candidates, services, free, capacity):
+    """Best of a non-empty candidate list. ``free``/``capacity`` map provider id -> slot units."""
+    prices = {c.user.id: c.price_for(services) for c in candidates}
+    low, high = min(prices.values()), max(prices.values())
+    spread = high - low
+
+    def score(c):
+        price_score = float((high - prices[c.user.id]) / spread) if spread else 1.0
+        return (
+            WEIGHTS["rating"] * (c.rating / 5)
+            + WEIGHTS["price"] * price_score
+            + WEIGHTS["capacity"] * (free[c.user.id] / capacity[c.user.id])
+        )
+
+    return max(candidates, key=lambda c: (score(c), -c.user.id))
+
+
+def match_pending_bookings(date_from=None, date_to=None, limit=None):
+    """
+    Assign providers to unassigned PENDING bookings scheduled in the window.
+
+    Must be called inside a transaction (the bookings are row-locked for the
+    run). Returns ``{"considered", "matched", "unmatched", "seconds"}``.
+    """
+    started = time.perf_counter()
+    bookings = _pending_bookings(date_from, date_to, limit)
+    if not bookings:
+        return {"considered": 0, "matched": 0, "unmatched": 0, "seconds": 0.0}
+
+    needed = {b.service_id for b in bookings}
+    for b in bookings:
+        needed.update(s.id for s in b.additional_services.all())
+    by_service = _candidates(needed)
+
+    provider_ids = {c.user.id for cands in by_service.values() for c in cands}
+    dates = [b.scheduled_date for b in bookings]
+    slots = {
+        (s.provider_id, s.date, s.time_slot): [s.capacity, s.booked]
+        for s in ProviderSlot.objects.filter(
+            provider_id__in=provider_ids,
+            date__gte=min(dates),
+            date__lte=max(dates),
+        )
+    }
+    default = default_capacity()
+
+    assignments = []
+    for booking in bookings:
+        services = [booking.service, *booking.additional_services.all()]
+        wanted = {s.id for s in services}
+        # The city snapshotted on the booking, not the customer's current one.
+        city = city_key(booking.city)
+        eligible = []
+        free = {}
+        capacity = {}
+        for c in by_service.get(booking.service_id, ()):
+            if not wanted <= c.service_ids:
+                continue
+            if city and c.city != city:
+                continue
+            cap, booked = slots.get((c.user.id, booking.scheduled_date, booking.time_slot), (default, 0))
+            if booked >= cap:
+                continue
+            eligible.append(c)
+            free[c.user.id] = cap - booked
+            capacity[c.user.id] = cap
+        if not eligible:
+            continue
+
+        best = _score(eligible, services, free, capacity)
+        key = (best.user.id, booking.scheduled_date, booking.time_slot)
+        slot = slots.setdefault(key, [default, 0])
+        slot[1] += 1
+        assignments.append((booking, best.user))
+
+    assignments = _take_slots(assignments)
+
+    for booking, provider in assignments:
+        booking.provider = provider
+        booking.status = Booking.Status.ASSIGNED
+        booking.version += 1
+    Booking.objects.bulk_update(
+        [b for b, _ in assignments], ["provider", "status", "version"], batch_size=500
+    )
+    rollups.move([b for b, _ in assignments], Booking.Status.PENDING, Booking.Status.ASSIGNED)
+    enqueue_notifications(
+        (booking, NotificationOutbox.Event.REQUESTED, provider, f"New booking assigned (#{booking.id})", None)
+        for booking, provider in assignments
+    )
+
+    return {
+        "considered": len(bookings),
+        "matched": len(assignments),
+        "unmatched": len(bookings) - len(assignments),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _take_slots(assignments):
+    """Persist slot usage; drop assignments whose slot filled up concurrently."""
+    granted = reserve_slots(
+        Counter((provider.id, booking.scheduled_date, booking.time_slot) for booking, provider in assignments)
+    )
+    kept = []
+    for booking, provider in assignments:
+        key = (provider.id, booking.scheduled_date, booking.time_slot)
+        if granted.get(key):
+            granted[key] -= 1
+            kept.append((booking, provider))
+    return kept
@@ -0,0 +1,35 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_booking_cursor_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationOutbox",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("event", models.CharField(choices=[("REQUESTED", "Booking requested"), ("ACCEPTED", "Booking accepted"), ("REJECTED", "Booking rejected"), ("COMPLETED", "Booking completed")], max_length=20)),
+                ("message", models.CharField(max_length=255)),
+                ("dedupe_key", models.CharField(max_length=100, unique=True)),
+                ("state", models.CharField(choices=[("PENDING", "Pending"), ("SENT", "Sent"), ("FAILED", "Failed")], default="PENDING", max_length=10)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                ("available_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("booking", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="outbox_events", to="bookings.booking")),
+                ("recipient", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["state", "available_at", "id"], name="outbox_pending_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_provider_slots(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    ProviderSlot = apps.get_model("bookings", "ProviderSlot")
+
+    capacity = int(getattr(settings, "PROVIDER_SLOT_CAPACITY", 1))
+    rows = (
+        Booking.objects.filter(provider__isnull=False)
+        .exclude(status="CANCELLED")
+        .values("provider", "scheduled_date", "time_slot")
+        .annotate(count=Count("id"))
+    )
+    ProviderSlot.objects.bulk_create(
+        [
+            ProviderSlot(
+                provider_id=row["provider"],
+                date=row["scheduled_date"],
+                time_slot=row["time_slot"],
+                capacity=max(capacity, row["count"]),
+                booked=row["count"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_notificationoutbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProviderSlot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("time_slot", models.CharField(choices=[("MORNING", "Morning (8 AM - 12 PM)"), ("AFTERNOON", "Afternoon (12 PM - 4 PM)"), ("EVENING", "Evening (4 PM - 8 PM)")], max_length=20)),
+                ("capacity", models.PositiveSmallIntegerField()),
+                ("booked", models.PositiveSmallIntegerField(default=0)),
+                ("provider", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="booking_slots", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("provider", "date", "time_slot"), name="provider_slot_unique"),
+                    models.CheckConstraint(condition=models.Q(("booked__lte", models.F("capacity"))), name="provider_slot_within_capacity"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_provider_slots, migrations.RunPython.noop),
+    ]
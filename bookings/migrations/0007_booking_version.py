@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_providerslot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,121 @@
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+
+
+def backfill_booking_city(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    CustomerProfile = apps.get_model("accounts", "CustomerProfile")
+
+    Booking.objects.update(
+        city=Subquery(
+            CustomerProfile.objects.filter(user_id=OuterRef("customer_id")).values("city")[:1]
+        )
+    )
+    Booking.objects.filter(city__isnull=True).update(city="")
+
+
+def backfill_booking_daily_stats(apps, schema_editor):
+    # Same result as bookings.rollups.rebuild(), on the historical models.
+    Booking = apps.get_model("bookings", "Booking")
+    BookingDailyStat = apps.get_model("bookings", "BookingDailyStat")
+    Review = apps.get_model("bookings", "Review")
+    Service = apps.get_model("services", "Service")
+    ProviderServicePrice = apps.get_model("accounts", "ProviderServicePrice")
+
+    rows = {}
+
+    def row(key):
+        if key not in rows:
+            day, status, service_id, city = key
+            rows[key] = BookingDailyStat(day=day, status=status, service_id=service_id, city=city)
+        return rows[key]
+
+    counts = (
+        Booking.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "status", "service_id", "city")
+        .annotate(n=Count("id"))
+    )
+    for r in counts:
+        row((r["day"], r["status"], r["service_id"], r["city"])).bookings = r["n"]
+
+    base_prices = dict(Service.objects.values_list("id", "base_price"))
+    provider_prices = {
+        (user_id, service_id): price
+        for user_id, service_id, price in ProviderServicePrice.objects.values_list(
+            "provider_profile__user_id", "service_id", "price"
+        )
+    }
+    extras = defaultdict(list)
+    for booking_id, service_id in Booking.additional_services.through.objects.filter(
+        booking__status="COMPLETED"
+    ).values_list("booking_id", "service_id").iterator(chunk_size=5000):
+        extras[booking_id].append(service_id)
+
+    completed = (
+        Booking.objects.filter(status="COMPLETED")
+        .annotate(day=TruncDate("created_at"))
+        .values_list("id", "day", "service_id", "city", "provider_id")
+        .iterator(chunk_size=5000)
+    )
+    for booking_id, day, service_id, city, provider_id in completed:
+        service_ids = dict.fromkeys([service_id, *extras.get(booking_id, ())])
+        row((day, "COMPLETED", service_id, city)).revenue += sum(
+            (provider_prices.get((provider_id, sid), base_prices[sid]) for sid in service_ids),
+            Decimal("0"),
+        )
+
+    ratings = (
+        Review.objects.annotate(day=TruncDate("booking__created_at"))
+        .values_list("day", "booking__status", "booking__service_id", "booking__city", "rating")
+        .iterator(chunk_size=5000)
+    )
+    for day, status, service_id, city, rating in ratings:
+        target = row((day, status, service_id, city))
+        target.rating_sum += rating
+        target.rating_count += 1
+
+    BookingDailyStat.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_notificationcounter"),
+        ("bookings", "0007_booking_version"),
+        ("services", "0005_service_starts_from"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="city",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.CreateModel(
+            name="BookingDailyStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("status", models.CharField(choices=[("PENDING", "Pending"), ("ASSIGNED", "Assigned"), ("CONFIRMED", "Confirmed"), ("IN_PROGRESS", "In Progress"), ("COMPLETED", "Completed"), ("CANCELLED", "Cancelled")], max_length=20)),
+                ("city", models.CharField(blank=True, max_length=100)),
+                ("bookings", models.IntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("rating_sum", models.IntegerField(default=0)),
+                ("rating_count", models.IntegerField(default=0)),
+                ("service", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="daily_stats", to="services.service")),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("day", "status", "service", "city"), name="booking_daily_stat_unique"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_booking_city, migrations.RunPython.noop),
+        # From here on signals keep it current; `manage.py rebuild_booking_stats` recomputes it.
+        migrations.RunPython(backfill_booking_daily_stats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from services.models import Service
 
 User = settings.AUTH_USER_MODEL
@@ -41,6 +42,8 @@ class Booking(models.Model):
         related_name="extra_service_bookings",
     )
     address = models.TextField()
+    # The customer's city when the booking was made; keys the daily rollups.
+    city = models.CharField(max_length=100, blank=True)
     scheduled_date = models.DateField()
     time_slot = models.CharField(
         max_length=20,
@@ -55,6 +58,15 @@ class Booking(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every state transition; see bookings/transitions.py.
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="booking_created_idx"),
+            models.Index(fields=["customer", "-created_at", "-id"], name="booking_customer_created_idx"),
+            models.Index(fields=["provider", "-created_at", "-id"], name="booking_provider_created_idx"),
+        ]
 
     def __str__(self):
         return f"Booking #{self.id}"
@@ -79,3 +91,112 @@ class Review(models.Model):
         return f"Review for Booking #{self.booking_id}"
 
 
+class BookingDailyStat(models.Model):
+    """
+    Daily booking rollup per (created day, status, service, city), maintained
+    by bookings/rollups.py as bookings are created, move status and get
+    reviewed. Revenue is only counted on COMPLETED rows.
+    """
+
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Booking.Status.choices)
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name="daily_stats"
+    )
+    city = models.CharField(max_length=100, blank=True)
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "service", "city"],
+                name="booking_daily_stat_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} service #{self.service_id} {self.city}: {self.bookings}"
+
+
+class ProviderSlot(models.Model):
+    """How many bookings a provider holds in one (date, time_slot), see bookings/availability.py."""
+
+    provider = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="booking_slots"
+    )
+    date = models.DateField()
+    time_slot = models.CharField(max_length=20, choices=Booking.TimeSlot.choices)
+    capacity = models.PositiveSmallIntegerField()
+    booked = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index availability lookups walk: (provider, date range).
+            models.UniqueConstraint(
+                fields=["provider", "date", "time_slot"],
+                name="provider_slot_unique",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(booked__lte=models.F("capacity")),
+                name="provider_slot_within_capacity",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.provider_id} {self.date} {self.time_slot}: {self.booked}/{self.capacity}"
+
+
+
+
+class NotificationOutbox(models.Model):
+    """Notifications recorded in the booking's transaction, delivered later by drain_notification_outbox."""
+
+    class Event(models.TextChoices):
+        REQUESTED = "REQUESTED", "Booking requested"
+        ACCEPTED = "ACCEPTED", "Booking accepted"
+        REJECTED = "REJECTED", "Booking rejected"
+        COMPLETED = "COMPLETED", "Booking completed"
+
+    class State(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name="outbox_events"
+    )
+    event = models.CharField(max_length=20, choices=Event.choices)
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    message = models.CharField(max_length=255)
+    dedupe_key = models.CharField(max_length=100, unique=True)
+    state = models.CharField(
+        max_length=10,
+        choices=State.choices,
+        default=State.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "available_at", "id"], name="outbox_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} for Booking #{self.booking_id} ({self.state})"
@@ -0,0 +1,136 @@
+import logging
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from accounts.models import Notification, NotificationCounter
+from .models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+Event = NotificationOutbox.Event
+
+# Events that can legitimately repeat for a booking when its provider changes.
+PROVIDER_SCOPED_EVENTS = {Event.REQUESTED, Event.ACCEPTED, Event.REJECTED}
+
+
+def _dedupe_key(booking_id, event, provider_id):
+    if event in PROVIDER_SCOPED_EVENTS:
+        return f"{booking_id}:{event}:{provider_id or 0}"
+    return f"{booking_id}:{event}"
+
+
+def enqueue_notification(booking, event, recipient, message, provider_id=None):
+    """Record a notification in the caller's transaction; duplicates of (booking, event) are dropped.
+
+    ``provider_id`` defaults to ``booking.provider_id``; pass it for events
+    (like a rejection) written after the provider has been cleared.
+    """
+    enqueue_notifications([(booking, event, recipient, message, provider_id)])
+
+
+def enqueue_notifications(entries):
+    """Batch form of enqueue_notification: one INSERT for many
+    ``(booking, event, recipient, message, provider_id)`` tuples."""
+    rows = []
+    for booking, event, recipient, message, provider_id in entries:
+        if provider_id is None:
+            provider_id = booking.provider_id
+        rows.append(
+            NotificationOutbox(
+                booking=booking,
+                event=event,
+                recipient=recipient,
+                message=message,
+                dedupe_key=_dedupe_key(booking.id, event, provider_id),
+            )
+        )
+    if rows:
+        NotificationOutbox.objects.bulk_create(rows, ignore_conflicts=True)
+        if getattr(settings, "NOTIFICATION_OUTBOX_FLUSH_ON_COMMIT", True):
+            # bulk_create with ignore_conflicts does not return ids, so the
+            # flush finds this transaction's rows by their dedupe keys.
+            transaction.on_commit(partial(flush_outbox, [row.dedupe_key for row in rows]))
+
+
+def flush_outbox(dedupe_keys):
+    """Deliver the rows one transaction enqueued, right after it commits.
+
+    Only those rows: the backlog and any row that fails here (it keeps its
+    retry time) are left to ``drain_notification_outbox``.
+    """
+    try:
+        drain_outbox(
+            batch_size=len(dedupe_keys),
+            max_attempts=int(getattr(settings, "NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 5)),
+            dedupe_keys=dedupe_keys,
+        )
+    except DatabaseError:
+        logger.exception("Notification outbox flush failed; rows stay queued")
+
+
+def _retry_delay(attempts):
+    base = int(getattr(settings, "NOTIFICATION_OUTBOX_RETRY_SECONDS", 30))
+    return timedelta(seconds=base * (2 ** max(attempts - 1, 0)))
+
+
+def _mark_failed(rows, exc, max_attempts, now):
+    for row in rows:
+        row.attempts += 1
+        row.last_error = str(exc)[:1000]
+        if row.attempts >= max_attempts:
+            row.state = NotificationOutbox.State.FAILED
+            row.processed_at = now
+        else:
+            row.available_at = now + _retry_delay(row.attempts)
+    NotificationOutbox.objects.bulk_update(
+        rows, ["attempts", "last_error", "state", "processed_at", "available_at"]
+    )
+
+
+def _deliver(rows):
+    Notification.objects.bulk_create(
+        [Notification(user_id=row.recipient_id, message=row.message) for row in rows]
+    )
+    NotificationCounter.add_unread(row.recipient_id for row in rows)
+
+
+def drain_outbox(batch_size=500, max_attempts=5, dedupe_keys=None):
+    """Deliver one batch of due outbox rows, limited to ``dedupe_keys`` when
+    given. Returns ``(sent, failed)``."""
+    now = timezone.now()
+    sent = failed = 0
+    due = NotificationOutbox.objects.filter(state=NotificationOutbox.State.PENDING, available_at__lte=now)
+    if dedupe_keys is not None:
+        due = due.filter(dedupe_key__in=dedupe_keys)
+    with transaction.atomic():
+        rows = list(due.select_for_update(skip_locked=True).order_by("id")[:batch_size])
+        if not rows:
+            return 0, 0
+
+        try:
+            with transaction.atomic():
+                _deliver(rows)
+            delivered = rows
+        except DatabaseError:
+            # Fall back to one row at a time so a single bad row cannot block the batch.
+            delivered = []
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        _deliver([row])
+                    delivered.append(row)
+                except DatabaseError as exc:
+                    _mark_failed([row], exc, max_attempts, now)
+                    failed += 1
+
+        if delivered:
+            NotificationOutbox.objects.filter(id__in=[row.id for row in delivered]).update(
+                state=NotificationOutbox.State.SENT,
+                processed_at=now,
+            )
+            sent = len(delivered)
+    return sent, failed
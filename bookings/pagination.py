@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BookingCursorPagination(CursorPagination):
+    # The cursor is a created_at position (DRF breaks ties with an offset, not
+    # id), so page N costs about the same as page 1. "-id" only fixes the
+    # order within a timestamp; both line up with the (-created_at, -id) indexes.
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,150 @@
+"""
+Incremental maintenance of BookingDailyStat.
+
+Every booking lives in exactly one rollup row, keyed by its created day,
+current status, primary service and city snapshot. Writers call the helpers
+below in the same transaction as the change they describe:
+
+- a new booking adds 1 to its row (post_save signal);
+- a status change moves 1 between rows (apply_transition, bulk assignment,
+  matching);
+- completion adds the booking's estimated revenue;
+- reviews add to the rating sum/count of the booking's row (review signals).
+
+rebuild_booking_stats recomputes everything from the source tables.
+"""
+
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import ProviderServicePrice
+from services.models import Service
+from .models import Booking, BookingDailyStat, Review
+
+
+def stat_key(booking, status=None):
+    return (
+        timezone.localtime(booking.created_at).date(),
+        status or booking.status,
+        booking.service_id,
+        booking.city or "",
+    )
+
+
+def bump(key, **deltas):
+    """Add ``deltas`` (bookings/revenue/rating_sum/rating_count) to one rollup row."""
+    day, status, service_id, city = key
+    rows = BookingDailyStat.objects.filter(day=day, status=status, service_id=service_id, city=city)
+    changes = {field: F(field) + value for field, value in deltas.items() if value}
+    if not changes or rows.update(**changes):
+        return
+    if not any(value > 0 for value in deltas.values()):
+        # Only ever subtracts: the row is gone (rebuilt or cascaded away), and
+        # a negative row would be wrong or point at a deleted service.
+        return
+    try:
+        with transaction.atomic():
+            BookingDailyStat.objects.create(
+                day=day, status=status, service_id=service_id, city=city, **deltas
+            )
+    except IntegrityError:
+        # Created concurrently between our UPDATE and INSERT.
+        rows.update(**changes)
+
+
+def move(bookings, old_status, new_status, revenue=None):
+    """Move bookings that all went ``old_status`` -> ``new_status``.
+
+    ``revenue`` maps booking id -> amount to add on the new row.
+    """
+    if old_status == new_status:
+        return
+    moved = Counter()
+    earned = defaultdict(Decimal)
+    for booking in bookings:
+        moved[stat_key(booking, old_status)] -= 1
+        new_key = stat_key(booking, new_status)
+        moved[new_key] += 1
+        if revenue:
+            earned[new_key] += revenue.get(booking.id, 0)
+    for key, delta in moved.items():
+        bump(key, bookings=delta, revenue=earned.get(key, 0))
+
+
+def estimated_revenue(booking):
+    """What the booking's provider charges for its services; base price where no provider price is set."""
+    services = list({s.id: s for s in [booking.service, *booking.additional_services.all()]}.values())
+    prices = {}
+    if booking.provider_id:
+        prices = dict(
+            ProviderServicePrice.objects.filter(
+                provider_profile__user_id=booking.provider_id,
+                service__in=services,
+            ).values_list("service_id", "price")
+        )
+    return sum((prices.get(s.id, s.base_price) for s in services), Decimal("0"))
+
+
+def rebuild():
+    """Recompute every rollup row from bookings, provider prices and reviews."""
+    rows = {}
+
+    def row(key):
+        if key not in rows:
+            day, status, service_id, city = key
+            rows[key] = BookingDailyStat(day=day, status=status, service_id=service_id, city=city)
+        return rows[key]
+
+    counts = (
+        Booking.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "status", "service_id", "city")
+        .annotate(n=Count("id"))
+    )
+    for r in counts:
+        row((r["day"], r["status"], r["service_id"], r["city"])).bookings = r["n"]
+
+    base_prices = dict(Service.objects.values_list("id", "base_price"))
+    provider_prices = {
+        (user_id, service_id): price
+        for user_id, service_id, price in ProviderServicePrice.objects.values_list(
+            "provider_profile__user_id", "service_id", "price"
+        )
+    }
+    extras = defaultdict(list)
+    for booking_id, service_id in Booking.additional_services.through.objects.filter(
+        booking__status=Booking.Status.COMPLETED
+    ).values_list("booking_id", "service_id").iterator(chunk_size=5000):
+        extras[booking_id].append(service_id)
+
+    completed = (
+        Booking.objects.filter(status=Booking.Status.COMPLETED)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("id", "day", "service_id", "city", "provider_id")
+        .iterator(chunk_size=5000)
+    )
+    for booking_id, day, service_id, city, provider_id in completed:
+        service_ids = dict.fromkeys([service_id, *extras.get(booking_id, ())])
+        row((day, Booking.Status.COMPLETED, service_id, city)).revenue += sum(
+            (provider_prices.get((provider_id, sid), base_prices[sid]) for sid in service_ids),
+            Decimal("0"),
+        )
+
+    ratings = (
+        Review.objects.annotate(day=TruncDate("booking__created_at"))
+        .values_list("day", "booking__status", "booking__service_id", "booking__city", "rating")
+        .iterator(chunk_size=5000)
+    )
+    for day, status, service_id, city, rating in ratings:
+        target = row((day, status, service_id, city))
+        target.rating_sum += rating
+        target.rating_count += 1
+
+    with transaction.atomic():
+        BookingDailyStat.objects.all().delete()
+        BookingDailyStat.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
@@ -1,7 +1,21 @@
 from rest_framework import serializers
+from .availability import SlotUnavailable, reserve_slot
 from .models import Booking, Review
+from accounts.models import CustomerProfile
 from services.models import Service
 
+
+def booking_service_names(booking):
+    # Iterates the related manager so a prefetched additional_services is reused.
+    names = [booking.service.name]
+    names.extend(s.name for s in booking.additional_services.all())
+    unique = []
+    for name in names:
+        if name not in unique:
+            unique.append(name)
+    return unique
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     service_ids = serializers.ListField(
         child=serializers.IntegerField(min_value=1),
@@ -64,8 +78,28 @@ class BookingCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         requested_services = validated_data.pop("_requested_services", [])
         validated_data.pop("service_ids", None)
+        # The primary service is the first of the resolved list, not the raw field.
+        validated_data.pop("service", None)
+        customer = validated_data.get("customer")
+        if customer is not None:
+            validated_data["city"] = (
+                CustomerProfile.objects.filter(user=customer).values_list("city", flat=True).first() or ""
+            )
 
         primary_service = requested_services[0]
+        provider = validated_data.get("provider")
+        if provider:
+            # Runs inside the view's transaction, so a failed booking insert
+            # gives the slot back.
+            try:
+                reserve_slot(
+                    provider.id,
+                    validated_data["scheduled_date"],
+                    validated_data.get("time_slot", Booking.TimeSlot.MORNING),
+                )
+            except SlotUnavailable as exc:
+                raise serializers.ValidationError({"time_slot": [str(exc)]})
+
         booking = Booking.objects.create(service=primary_service, **validated_data)
         extra_services = [s for s in requested_services[1:] if s.id != primary_service.id]
         if extra_services:
@@ -103,6 +137,7 @@ class BookingListSerializer(serializers.ModelSerializer):
             "scheduled_date",
             "time_slot",
             "status",
+            "version",
             "created_at",
             "has_review",
             "review_rating",
@@ -128,19 +163,22 @@ class BookingListSerializer(serializers.ModelSerializer):
         return f"{obj.provider.first_name} {obj.provider.last_name}".strip()
 
     def get_service_names(self, obj):
-        names = [obj.service.name]
-        names.extend(obj.additional_services.values_list("name", flat=True))
-        unique = []
-        for name in names:
-            if name not in unique:
-                unique.append(name)
-        return unique
+        return booking_service_names(obj)
 
 
 class AssignProviderSerializer(serializers.Serializer):
     provider_id = serializers.IntegerField()
 
 
+class BulkAssignItemSerializer(serializers.Serializer):
+    booking_id = serializers.IntegerField(min_value=1)
+    provider_id = serializers.IntegerField(min_value=1)
+
+
+class BulkAssignSerializer(serializers.Serializer):
+    assignments = BulkAssignItemSerializer(many=True, allow_empty=False, max_length=500)
+
+
 class ReviewCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
@@ -193,6 +231,7 @@ class ProviderBookingSerializer(serializers.ModelSerializer):
             "scheduled_date",
             "time_slot",
             "status",
+            "version",
             "provider_rating",
             "created_at",
         ]
@@ -203,10 +242,4 @@ class ProviderBookingSerializer(serializers.ModelSerializer):
         return obj.provider.average_rating()
 
     def get_service_names(self, obj):
-        names = [obj.service.name]
-        names.extend(obj.additional_services.values_list("name", flat=True))
-        unique = []
-        for name in names:
-            if name not in unique:
-                unique.append(name)
-        return unique
+        return booking_service_names(obj)
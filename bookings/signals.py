@@ -1,23 +1,88 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Booking
-from accounts.models import Notification
+from .models import Booking, NotificationOutbox, Review
+from .outbox import enqueue_notification
+from . import rollups
+from .availability import RELEASED_STATUSES, release_slot
+from accounts.models import ProviderRating
+from services.models import Service, ServiceCategory
 
 
 @receiver(post_save, sender=Booking)
 def booking_notifications(sender, instance, created, **kwargs):
+    # Written to the outbox in the booking's transaction; the outbox
+    # de-duplicates repeated saves of the same (booking, event).
 
     # 🔔 Provider gets notification when booking is assigned
-    if created and instance.provider:
-        Notification.objects.create(
-            user=instance.provider,
-            message=f"New booking assigned (#{instance.id})"
+    if created and instance.provider_id:
+        enqueue_notification(
+            instance,
+            NotificationOutbox.Event.REQUESTED,
+            recipient=instance.provider,
+            message=f"New booking assigned (#{instance.id})",
         )
 
     # 🔔 Customer gets notification when booking is completed
     if instance.status == Booking.Status.COMPLETED:
-        Notification.objects.create(
-            user=instance.customer,
-            message=f"Booking #{instance.id} completed. Please leave a review."
+        enqueue_notification(
+            instance,
+            NotificationOutbox.Event.COMPLETED,
+            recipient=instance.customer,
+            message=f"Booking #{instance.id} completed. Please leave a review.",
         )
+
+
+@receiver(post_save, sender=Booking)
+def booking_stats_created(sender, instance, created, **kwargs):
+    if created:
+        rollups.bump(rollups.stat_key(instance), bookings=1)
+
+
+def _service_deleted(origin):
+    # Deleting a service (or its category) cascades to its bookings and to
+    # their rollup rows, so there is nothing left to subtract from.
+    return isinstance(origin, (Service, ServiceCategory))
+
+
+@receiver(post_delete, sender=Booking)
+def booking_stats_deleted(sender, instance, origin=None, **kwargs):
+    if _service_deleted(origin):
+        return
+    revenue = 0
+    if instance.status == Booking.Status.COMPLETED:
+        revenue = -rollups.estimated_revenue(instance)
+    rollups.bump(rollups.stat_key(instance), bookings=-1, revenue=revenue)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_slot_released(sender, instance, **kwargs):
+    # Deleting a customer cascades to their bookings; give back the slots
+    # those bookings still held.
+    if instance.provider_id and instance.status not in RELEASED_STATUSES:
+        release_slot(instance.provider_id, instance.scheduled_date, instance.time_slot)
+
+
+def _review_booking(review):
+    return (
+        Booking.objects.filter(id=review.booking_id)
+        .only("provider_id", "created_at", "status", "service_id", "city")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_rating_created(sender, instance, created, **kwargs):
+    if created:
+        booking = _review_booking(instance)
+        ProviderRating.apply_review(booking and booking.provider_id, instance.rating, delta=1)
+        if booking:
+            rollups.bump(rollups.stat_key(booking), rating_sum=instance.rating, rating_count=1)
+
+
+@receiver(post_delete, sender=Review)
+def review_rating_deleted(sender, instance, origin=None, **kwargs):
+    booking = _review_booking(instance)
+    ProviderRating.apply_review(booking and booking.provider_id, instance.rating, delta=-1)
+    if booking and not _service_deleted(origin):
+        rollups.bump(rollups.stat_key(booking), rating_sum=-instance.rating, rating_count=-1)
@@ -1,3 +1,258 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import CustomerProfile, Notification, ProviderProfile, User
+from config.query_budget import QueryBudgetExceeded
+from services.models import Service, ServiceCategory
+from . import rollups
+from .availability import reserve_slot
+from .matching import match_pending_bookings
+from .models import Booking, BookingDailyStat, NotificationOutbox, ProviderSlot, Review
+
+
+class BookingListQueryCountTests(TestCase):
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Test Category")
+        self.services = [
+            Service.objects.create(
+                category=category,
+                name=f"Test Service {i}",
+                description="",
+                base_price=100,
+            )
+            for i in range(3)
+        ]
+        self.customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        self.provider = User.objects.create_user("provider", password="pw", role=User.Role.PROVIDER)
+        self.admin = User.objects.create_user("admin", password="pw", role=User.Role.ADMIN)
+        self.client = APIClient()
+
+    def _add_bookings(self, count):
+        for _ in range(count):
+            booking = Booking.objects.create(
+                customer=self.customer,
+                provider=self.provider,
+                service=self.services[0],
+                address="Somewhere",
+                scheduled_date=date(2026, 1, 1),
+                status=Booking.Status.COMPLETED,
+            )
+            booking.additional_services.set(self.services[1:])
+            Review.objects.create(booking=booking, author=self.customer, rating=4)
+
+    def _count_queries(self, user, url):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data["results"]
+
+    def test_query_count_does_not_grow_with_list_size(self):
+        endpoints = [
+            (self.customer, "/api/bookings/my/"),
+            (self.admin, "/api/bookings/admin/all/"),
+            (self.provider, "/api/bookings/provider/dashboard/"),
+        ]
+        self._add_bookings(1)
+        small = {url: self._count_queries(user, url) for user, url in endpoints}
+
+        self._add_bookings(9)
+        for user, url in endpoints:
+            queries, results = self._count_queries(user, url)
+            self.assertEqual(len(results), 10)
+            self.assertEqual(queries, small[url][0], url)
+
+    def test_list_reads_prefetched_relations(self):
+        self._add_bookings(1)
+        _, results = self._count_queries(self.customer, "/api/bookings/my/")
+        row = results[0]
+        self.assertEqual(row["service_names"], [s.name for s in self.services])
+        self.assertEqual(row["category"], "Test Category")
+        self.assertTrue(row["has_review"])
+        self.assertEqual(row["review_rating"], 4)
+
+        _, results = self._count_queries(self.provider, "/api/bookings/provider/dashboard/")
+        self.assertEqual(results[0]["provider_rating"], 4.0)
+
+    def test_provider_stats_count_every_booking(self):
+        self._add_bookings(3)
+        Booking.objects.filter(id=Booking.objects.first().id).update(status=Booking.Status.PENDING)
+        self.client.force_authenticate(self.provider)
+        with self.assertNumQueries(1):
+            data = self.client.get("/api/bookings/provider/stats/").json()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(data["by_status"]["PENDING"], 1)
+        self.assertEqual(data["by_status"]["COMPLETED"], 2)
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True)
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def test_reports_query_count_and_timing_headers(self):
+        response = self.client.get("/api/bookings/my/")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+
+    @override_settings(QUERY_BUDGETS={"api/bookings/my/": 0})
+    def test_exceeding_budget_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/api/bookings/my/")
+
+
+class BookingDailyStatTests(TestCase):
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(name="Stats Category")
+        self.service = Service.objects.create(category=self.category, name="Stats Service", base_price=100)
+        self.customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        self.admin = User.objects.create_user("admin", password="pw", role=User.Role.ADMIN)
+        booking = Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            address="Somewhere",
+            scheduled_date=date(2026, 1, 1),
+            status=Booking.Status.COMPLETED,
+        )
+        Review.objects.create(booking=booking, author=self.customer, rating=4)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_deleting_a_service_with_bookings(self):
+        response = self.client.delete(f"/api/services/admin/services/{self.service.id}/")
+        self.assertEqual(response.status_code, 200)
+        connection.check_constraints()
+        self.assertFalse(BookingDailyStat.objects.exists())
+
+    def test_deleting_a_category_with_bookings(self):
+        response = self.client.delete(f"/api/services/admin/categories/{self.category.id}/")
+        self.assertEqual(response.status_code, 200)
+        connection.check_constraints()
+        self.assertFalse(BookingDailyStat.objects.exists())
+
+    def test_deleting_a_booking_updates_its_row(self):
+        rollups.rebuild()
+        Booking.objects.get().delete()
+        stat = BookingDailyStat.objects.get()
+        self.assertEqual((stat.bookings, stat.revenue, stat.rating_count), (0, 0, 0))
+
+
+class ProviderSlotReleaseTests(TestCase):
+    def test_deleting_a_customer_frees_their_slots(self):
+        service = Service.objects.create(
+            category=ServiceCategory.objects.create(name="Slots"), name="Slot Service", base_price=100
+        )
+        customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        provider = User.objects.create_user("provider", password="pw", role=User.Role.PROVIDER)
+        admin = User.objects.create_user("admin", password="pw", role=User.Role.ADMIN)
+        day = date(2026, 1, 1)
+        reserve_slot(provider.id, day, Booking.TimeSlot.MORNING)
+        Booking.objects.create(
+            customer=customer,
+            provider=provider,
+            service=service,
+            address="Somewhere",
+            scheduled_date=day,
+            time_slot=Booking.TimeSlot.MORNING,
+            status=Booking.Status.CONFIRMED,
+        )
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.delete(f"/api/accounts/admin/users/{customer.id}/")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(ProviderSlot.objects.get().booked, 0)
+        reserve_slot(provider.id, day, Booking.TimeSlot.MORNING)
+
+
+class MatchingTests(TestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            category=ServiceCategory.objects.create(name="Matching"), name="Matching Service", base_price=100
+        )
+        self.customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        self.profile = CustomerProfile.objects.create(user=self.customer, city="Bangalore")
+
+    def _provider(self, username, city):
+        provider = User.objects.create_user(username, password="pw", role=User.Role.PROVIDER)
+        ProviderProfile.objects.create(user=provider, city=city).services.add(self.service)
+        return provider
+
+    def _booking(self):
+        return Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            address="Somewhere",
+            scheduled_date=date(2026, 1, 1),
+            city=self.profile.city,
+        )
+
+    def test_no_provider_in_the_booking_city_leaves_it_pending(self):
+        self._provider("mumbai", "Mumbai")
+        booking = self._booking()
+        self.assertEqual(match_pending_bookings()["matched"], 0)
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.provider_id), (Booking.Status.PENDING, None))
+
+    def test_matches_on_the_city_booked_from(self):
+        local = self._provider("bengaluru", "Bengaluru")
+        self._provider("mumbai", "Mumbai")
+        booking = self._booking()
+        self.profile.city = "Mumbai"
+        self.profile.save()
+
+        self.assertEqual(match_pending_bookings()["matched"], 1)
+        booking.refresh_from_db()
+        self.assertEqual(booking.provider, local)
+
+
+class NotificationOutboxTests(TestCase):
+    def test_notifications_are_delivered_on_commit(self):
+        service = Service.objects.create(
+            category=ServiceCategory.objects.create(name="Outbox"), name="Outbox Service", base_price=100
+        )
+        customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        provider = User.objects.create_user("provider", password="pw", role=User.Role.PROVIDER)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                customer=customer,
+                provider=provider,
+                service=service,
+                address="Somewhere",
+                scheduled_date=date(2026, 1, 1),
+            )
+
+        self.assertEqual(
+            list(Notification.objects.filter(user=provider).values_list("message", flat=True)),
+            [f"New booking assigned (#{booking.id})"],
+        )
+        self.assertFalse(booking.outbox_events.filter(state=NotificationOutbox.State.PENDING).exists())
+
+    def test_flush_leaves_the_backlog_to_the_worker(self):
+        service = Service.objects.create(
+            category=ServiceCategory.objects.create(name="Outbox"), name="Outbox Service", base_price=100
+        )
+        customer = User.objects.create_user("customer", password="pw", role=User.Role.CUSTOMER)
+        provider = User.objects.create_user("provider", password="pw", role=User.Role.PROVIDER)
+        with self.captureOnCommitCallbacks(execute=False):
+            queued = Booking.objects.create(
+                customer=customer, provider=provider, service=service,
+                address="Somewhere", scheduled_date=date(2026, 1, 1),
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                customer=customer, provider=provider, service=service,
+                address="Somewhere", scheduled_date=date(2026, 1, 2),
+            )
+
+        self.assertFalse(booking.outbox_events.filter(state=NotificationOutbox.State.PENDING).exists())
+        self.assertTrue(queued.outbox_events.filter(state=NotificationOutbox.State.PENDING).exists())
@@ -0,0 +1,69 @@
+from django.db.models import F
+
+from . import rollups
+from .models import Booking
+
+Status = Booking.Status
+
+# action -> (statuses it may start from, status it leads to)
+TRANSITIONS = {
+    "assign": ({Status.PENDING, Status.ASSIGNED, Status.CONFIRMED}, Status.ASSIGNED),
+    "accept": ({Status.PENDING, Status.ASSIGNED}, Status.CONFIRMED),
+    "reject": ({Status.PENDING, Status.ASSIGNED, Status.CONFIRMED}, Status.PENDING),
+    "start": ({Status.CONFIRMED}, Status.IN_PROGRESS),
+    "complete": ({Status.IN_PROGRESS}, Status.COMPLETED),
+}
+
+# The actions a provider drives through UpdateBookingStatusAPIView, in order.
+PROVIDER_PROGRESS = ("start", "complete")
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+class TransitionConflict(Exception):
+    """The booking changed between read and write (status or version moved)."""
+
+
+def progress_action(current_status):
+    """The provider progress action available from ``current_status``, or None."""
+    for action in PROVIDER_PROGRESS:
+        if current_status in TRANSITIONS[action][0]:
+            return action
+    return None
+
+
+def apply_transition(booking, action, expected_version=None, **changes):
+    """
+    Move ``booking`` along ``action`` with one conditional UPDATE.
+
+    The row is only written if it still has the status and version this
+    request read (or ``expected_version`` sent by the client); otherwise
+    TransitionConflict is raised and nothing changes. Only status, version
+    and ``changes`` are written, and post_save does not fire.
+    """
+    sources, target = TRANSITIONS[action]
+    previous = booking.status
+    if previous not in sources:
+        raise InvalidTransition(f"Cannot {action} a booking that is {previous}")
+
+    version = booking.version if expected_version is None else expected_version
+    updated = Booking.objects.filter(
+        pk=booking.pk,
+        status=booking.status,
+        version=version,
+    ).update(status=target, version=F("version") + 1, **changes)
+    if not updated:
+        raise TransitionConflict("Booking was changed by another request; reload and try again")
+
+    booking.status = target
+    booking.version = version + 1
+    for field, value in changes.items():
+        setattr(booking, field, value)
+
+    revenue = None
+    if target == Status.COMPLETED:
+        revenue = {booking.id: rollups.estimated_revenue(booking)}
+    rollups.move([booking], previous, target, revenue)
+    return booking
@@ -5,22 +5,34 @@ from .views import (
     CustomerBookingsAPIView,
     AdminBookingsAPIView,
     AssignProviderAPIView,      
+    BulkAssignProviderAPIView,
     ProviderActionAPIView,
     ProviderDashboardAPIView,
+    ProviderBookingStatsAPIView,
     UpdateBookingStatusAPIView,
     CreateReviewAPIView,
     AdminReviewListAPIView,
+    ProviderAvailabilityAPIView,
+    AdminBookingExportAPIView,
+    AdminReviewExportAPIView,
+    AdminStatsAPIView,
 )
 
 urlpatterns = [
     path("create/", CreateBookingAPIView.as_view()),
     path("provider-services/<int:provider_id>/", ProviderServicesForBookingAPIView.as_view()),
+    path("availability/<int:provider_id>/", ProviderAvailabilityAPIView.as_view()),
     path("my/", CustomerBookingsAPIView.as_view()),
     path("admin/all/", AdminBookingsAPIView.as_view()),
     path("assign/<int:booking_id>/", AssignProviderAPIView.as_view()),
+    path("admin/bulk-assign/", BulkAssignProviderAPIView.as_view()),
     path("provider/action/<int:booking_id>/", ProviderActionAPIView.as_view()),
     path("provider/dashboard/", ProviderDashboardAPIView.as_view()),
+    path("provider/stats/", ProviderBookingStatsAPIView.as_view()),
     path("provider/update-status/<int:booking_id>/", UpdateBookingStatusAPIView.as_view()),
      path("review/<int:booking_id>/",CreateReviewAPIView.as_view(),),
     path("admin/reviews/", AdminReviewListAPIView.as_view()),
+    path("admin/stats/", AdminStatsAPIView.as_view()),
+    path("admin/export/bookings/", AdminBookingExportAPIView.as_view()),
+    path("admin/export/reviews/", AdminReviewExportAPIView.as_view()),
 ]
@@ -1,16 +1,123 @@
+from django.db.models import F, FloatField, IntegerField, Prefetch, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
+
+from accounts.cities import city_key
 from accounts.models import User
+from services.models import Service
+from .models import Booking, ProviderSlot
+
+
+def with_list_relations(bookings):
+    """Load everything BookingListSerializer/ProviderBookingSerializer read, in a fixed number of queries."""
+    return bookings.select_related(
+        "service__category",
+        "customer",
+        "provider__rating_summary",
+        "review",
+    ).prefetch_related(
+        Prefetch("additional_services", queryset=Service.objects.only("id", "name")),
+    )
+
+
+def filter_bookings(bookings, params):
+    """Apply the status/time_slot/scheduled_date filters shared by booking lists.
+
+    Returns ``(queryset, error)``; ``error`` is a message for a 400 response.
+    """
+    statuses = [s.strip().upper() for s in (params.get("status") or "").split(",") if s.strip()]
+    if statuses:
+        if any(s not in Booking.Status.values for s in statuses):
+            return None, "Invalid status"
+        bookings = bookings.filter(status__in=statuses)
+
+    time_slot = (params.get("time_slot") or "").strip().upper()
+    if time_slot:
+        if time_slot not in Booking.TimeSlot.values:
+            return None, "Invalid time_slot"
+        bookings = bookings.filter(time_slot=time_slot)
+
+    dates, error = parse_date_params(params, ("date_from", "date_to"))
+    if error:
+        return None, error
+    if "date_from" in dates:
+        bookings = bookings.filter(scheduled_date__gte=dates["date_from"])
+    if "date_to" in dates:
+        bookings = bookings.filter(scheduled_date__lte=dates["date_to"])
 
-def get_best_provider():
-    providers = User.objects.filter(role="PROVIDER")
+    return bookings, None
 
-    if not providers.exists():
-        return None
 
-    # Sort providers by rating (high → low)
-    providers = sorted(
-        providers,
-        key=lambda p: p.average_rating(),
-        reverse=True
+def parse_date_params(params, names):
+    """Parse optional YYYY-MM-DD query params. Returns ``({name: date}, error)``."""
+    values = {}
+    for name in names:
+        raw = (params.get(name) or "").strip()
+        if not raw:
+            continue
+        try:
+            value = parse_date(raw)
+        except ValueError:
+            value = None
+        if not value:
+            return None, f"{name} must be a date (YYYY-MM-DD)"
+        values[name] = value
+    return values, None
+
+
+def filter_reviews(reviews, params):
+    """rating and created_at date-range filters for review lists/exports. Returns ``(queryset, error)``."""
+    rating = (params.get("rating") or "").strip()
+    if rating:
+        if rating not in {"1", "2", "3", "4", "5"}:
+            return None, "rating must be between 1 and 5"
+        reviews = reviews.filter(rating=int(rating))
+
+    dates, error = parse_date_params(params, ("date_from", "date_to"))
+    if error:
+        return None, error
+    if "date_from" in dates:
+        reviews = reviews.filter(created_at__date__gte=dates["date_from"])
+    if "date_to" in dates:
+        reviews = reviews.filter(created_at__date__lte=dates["date_to"])
+    return reviews, None
+
+
+def ranked_providers(service_id=None, city=None):
+    """Providers ordered by stored rating (high → low), ranked in SQL."""
+    providers = User.objects.filter(role=User.Role.PROVIDER)
+
+    if service_id:
+        providers = providers.filter(provider_profile__services__id=service_id)
+    if city:
+        key = city_key(city)
+        providers = providers.filter(provider_profile__city_key=key) if key else providers.none()
+
+    return providers.select_related("rating_summary").annotate(
+        rating=Coalesce(
+            "rating_summary__average_rating", Value(0.0), output_field=FloatField()
+        ),
+        rating_count=Coalesce(
+            "rating_summary__rating_count", Value(0), output_field=IntegerField()
+        ),
+    ).order_by(
+        F("rating_summary__average_rating").desc(nulls_last=True),
+        F("rating_summary__rating_count").desc(nulls_last=True),
+        "id",
     )
 
-    return providers[0]
+
+def get_best_provider(service_id=None, city=None, date=None, time_slot=None):
+    """Top-ranked active provider; with ``date``/``time_slot``, only one with a free slot.
+
+    For assigning many bookings at once use bookings.matching instead.
+    """
+    providers = ranked_providers(service_id=service_id, city=city).filter(is_active=True)
+    if date and time_slot:
+        full = ProviderSlot.objects.filter(
+            date=date,
+            time_slot=time_slot,
+            booked__gte=F("capacity"),
+        ).values("provider_id")
+        providers = providers.exclude(id__in=full)
+    return providers.first()
@@ -6,8 +6,23 @@ from accounts.permissions import IsCustomer
 from .serializers import BookingCreateSerializer, ReviewCreateSerializer, ReviewListSerializer
 from rest_framework.permissions import IsAuthenticated
 from accounts.permissions import IsCustomer
-from .serializers import BookingListSerializer
-from .models import Booking
+from .serializers import BookingListSerializer, BulkAssignSerializer
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .assignment import bulk_assign
+from .availability import MAX_RANGE_DAYS, SlotUnavailable, free_slots, release_slot, reserve_slot
+from .models import Booking, BookingDailyStat, NotificationOutbox
+from .outbox import enqueue_notification
+from .transitions import TRANSITIONS, InvalidTransition, TransitionConflict, apply_transition, progress_action
+from .pagination import BookingCursorPagination
+from .export import BOOKING_COLUMNS, FORMATS, REVIEW_COLUMNS, export_response
+from .utils import filter_bookings, filter_reviews, parse_date_params, with_list_relations
 from accounts.permissions import IsAdmin
 from accounts.models import User
 from accounts.permissions import IsProvider
@@ -25,6 +40,17 @@ from accounts.models import Notification
 from .serializers import BookingCreateSerializer
 
 
+def _expected_version(request):
+    """Optional ``version`` the client last saw. Returns ``(version, error)``."""
+    raw = request.data.get("version")
+    if raw in (None, ""):
+        return None, None
+    try:
+        return int(raw), None
+    except (TypeError, ValueError):
+        return None, "version must be an integer"
+
+
 class CreateBookingAPIView(APIView):
     permission_classes = [IsAuthenticated, IsCustomer]
 
@@ -45,14 +71,11 @@ class CreateBookingAPIView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-            booking = serializer.save(
-                customer=request.user
-            )
-
-            if provider:
-                Notification.objects.create(
-                    user=provider,
-                    message=f"New booking request"
+            # The provider's "new booking" notification is queued by the
+            # post_save signal inside this transaction.
+            with transaction.atomic():
+                booking = serializer.save(
+                    customer=request.user
                 )
 
             return Response(
@@ -70,12 +93,17 @@ class CustomerBookingsAPIView(APIView):
     permission_classes = [IsAuthenticated, IsCustomer]
 
     def get(self, request):
-        bookings = Booking.objects.filter(
-            customer=request.user
-        ).order_by("-created_at")
+        bookings, error = filter_bookings(
+            with_list_relations(Booking.objects.filter(customer=request.user)),
+            request.query_params,
+        )
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = BookingListSerializer(bookings, many=True)
-        return Response(serializer.data)
+        paginator = BookingCursorPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = BookingListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     
 
@@ -85,13 +113,45 @@ class AdminBookingsAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        bookings = Booking.objects.all().order_by("-created_at")
-        serializer = BookingListSerializer(bookings, many=True)
-        return Response(serializer.data)
+        bookings, error = filter_bookings(
+            with_list_relations(Booking.objects.all()),
+            request.query_params,
+        )
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = BookingCursorPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = BookingListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
 
 
 
+class BulkAssignProviderAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        serializer = BulkAssignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_assign([
+            (item["booking_id"], item["provider_id"])
+            for item in serializer.validated_data["assignments"]
+        ])
+        summary = Counter(r["result"] for r in results)
+        return Response(
+            {
+                "assigned": summary["assigned"],
+                "unchanged": summary["unchanged"],
+                "failed": summary["failed"],
+                "results": results,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
 class AssignProviderAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
@@ -111,9 +171,21 @@ class AssignProviderAPIView(APIView):
         except User.DoesNotExist:
             return Response({"error": "Invalid provider"}, status=400)
 
-        booking.provider = provider
-        booking.status = Booking.Status.ASSIGNED
-        booking.save()
+        expected_version, error = _expected_version(request)
+        if error:
+            return Response({"error": error}, status=400)
+
+        try:
+            with transaction.atomic():
+                if booking.provider_id != provider.id:
+                    reserve_slot(provider.id, booking.scheduled_date, booking.time_slot)
+                    if booking.provider_id:
+                        release_slot(booking.provider_id, booking.scheduled_date, booking.time_slot)
+                apply_transition(booking, "assign", expected_version, provider=provider)
+        except (SlotUnavailable, InvalidTransition) as exc:
+            return Response({"error": str(exc)}, status=400)
+        except TransitionConflict as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
 
         return Response(
             {"message": "Provider assigned successfully"},
@@ -139,25 +211,42 @@ class ProviderActionAPIView(APIView):
         except Booking.DoesNotExist:
             return Response({"error": "Booking not found"}, status=404)
 
+        provider_id = booking.provider_id
+        changes = {}
         if action == "accept":
-            booking.status = Booking.Status.CONFIRMED
+            event = NotificationOutbox.Event.ACCEPTED
             message = "Your booking has been accepted 🎉"
 
         elif action == "reject":
-            booking.status = Booking.Status.PENDING
-            booking.provider = None
+            changes["provider"] = None
+            event = NotificationOutbox.Event.REJECTED
             message = "Your booking was rejected ❌"
 
         else:
             return Response({"error": "Invalid action"}, status=400)
 
-        booking.save()
+        expected_version, error = _expected_version(request)
+        if error:
+            return Response({"error": error}, status=400)
 
-        # 🔔 NOTIFY CUSTOMER
-        Notification.objects.create(
-            user=booking.customer,
-            message=message
-        )
+        try:
+            with transaction.atomic():
+                apply_transition(booking, action, expected_version, **changes)
+                if action == "reject":
+                    release_slot(provider_id, booking.scheduled_date, booking.time_slot)
+
+                # 🔔 NOTIFY CUSTOMER
+                enqueue_notification(
+                    booking,
+                    event,
+                    recipient=booking.customer,
+                    message=message,
+                    provider_id=provider_id,
+                )
+        except InvalidTransition as exc:
+            return Response({"error": str(exc)}, status=400)
+        except TransitionConflict as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
 
         return Response({"message": f"Booking {action}ed successfully"})
 
@@ -176,12 +265,30 @@ class ProviderDashboardAPIView(APIView):
     permission_classes = [IsAuthenticated, IsProvider]
 
     def get(self, request):
-        bookings = Booking.objects.filter(
-            provider=request.user
-        ).order_by("-created_at")
+        bookings, error = filter_bookings(
+            with_list_relations(Booking.objects.filter(provider=request.user)),
+            request.query_params,
+        )
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = ProviderBookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+        paginator = BookingCursorPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = ProviderBookingSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ProviderBookingStatsAPIView(APIView):
+    """Booking counts for the provider dashboard, over all of the provider's bookings."""
+
+    permission_classes = [IsAuthenticated, IsProvider]
+
+    def get(self, request):
+        by_status = {s: 0 for s in Booking.Status.values}
+        rows = Booking.objects.filter(provider=request.user).values("status").annotate(n=Count("id"))
+        for row in rows.order_by():
+            by_status[row["status"]] = row["n"]
+        return Response({"total": sum(by_status.values()), "by_status": by_status})
 
 
 
@@ -204,30 +311,41 @@ class UpdateBookingStatusAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Allowed transitions
-        allowed_transitions = {
-            Booking.Status.CONFIRMED: Booking.Status.IN_PROGRESS,
-            Booking.Status.IN_PROGRESS: Booking.Status.COMPLETED,
-        }
-
         current_status = booking.status
+        action = progress_action(current_status)
 
-        if current_status not in allowed_transitions:
+        if action is None:
             return Response(
                 {"error": f"Cannot update status from {current_status}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if new_status != allowed_transitions[current_status]:
+        allowed_status = TRANSITIONS[action][1]
+        if new_status != allowed_status:
             return Response(
                 {
-                    "error": f"Invalid transition. Allowed: {allowed_transitions[current_status]}"
+                    "error": f"Invalid transition. Allowed: {allowed_status}"
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        booking.status = new_status
-        booking.save()
+        expected_version, error = _expected_version(request)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                apply_transition(booking, action, expected_version)
+                # The conditional UPDATE skips post_save, so queue this here.
+                if booking.status == Booking.Status.COMPLETED:
+                    enqueue_notification(
+                        booking,
+                        NotificationOutbox.Event.COMPLETED,
+                        recipient=booking.customer,
+                        message=f"Booking #{booking.id} completed. Please leave a review.",
+                    )
+        except TransitionConflict as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
 
         return Response(
             {
@@ -310,6 +428,32 @@ class ProviderServicesForBookingAPIView(APIView):
         return Response(data)
 
 
+class ProviderAvailabilityAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, provider_id):
+        if not User.objects.filter(id=provider_id, role=User.Role.PROVIDER).exists():
+            return Response({"error": "Provider not found"}, status=404)
+
+        today = timezone.localdate()
+        try:
+            date_from = parse_date(request.query_params.get("date_from") or "") or today
+            date_to = parse_date(request.query_params.get("date_to") or "") or date_from + timedelta(days=6)
+        except ValueError:
+            return Response({"error": "date_from and date_to must be dates (YYYY-MM-DD)"}, status=400)
+        if date_to < date_from:
+            return Response({"error": "date_to must not be before date_from"}, status=400)
+        if (date_to - date_from).days >= MAX_RANGE_DAYS:
+            return Response({"error": f"Date range is limited to {MAX_RANGE_DAYS} days"}, status=400)
+
+        return Response({
+            "provider_id": provider_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "slots": free_slots(provider_id, date_from, date_to),
+        })
+
+
 class AdminReviewListAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
@@ -317,3 +461,133 @@ class AdminReviewListAPIView(APIView):
         reviews = Review.objects.select_related("booking", "author", "booking__provider", "booking__service").order_by("-created_at")
         serializer = ReviewListSerializer(reviews, many=True)
         return Response(serializer.data)
+
+
+def _export_format(request):
+    # Not "format": DRF reserves that for renderer selection.
+    fmt = (request.query_params.get("output") or "csv").lower()
+    return fmt if fmt in FORMATS else None
+
+
+class AdminBookingExportAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        fmt = _export_format(request)
+        if not fmt:
+            return Response({"error": "output must be csv or ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+
+        bookings, error = filter_bookings(Booking.objects.all(), request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return export_response(request, bookings, BOOKING_COLUMNS, "bookings", fmt)
+
+
+class AdminReviewExportAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        fmt = _export_format(request)
+        if not fmt:
+            return Response({"error": "output must be csv or ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+
+        reviews, error = filter_reviews(Review.objects.all(), request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return export_response(request, reviews, REVIEW_COLUMNS, "reviews", fmt)
+
+
+class AdminStatsAPIView(APIView):
+    """Dashboard figures answered from the BookingDailyStat rollup, not from raw bookings."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        dates, error = parse_date_params(request.query_params, ("date_from", "date_to"))
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        stats = BookingDailyStat.objects.all()
+        if "date_from" in dates:
+            stats = stats.filter(day__gte=dates["date_from"])
+        if "date_to" in dates:
+            stats = stats.filter(day__lte=dates["date_to"])
+        sums = {
+            "bookings": Sum("bookings"),
+            "revenue": Sum("revenue"),
+            "rating_sum": Sum("rating_sum"),
+            "rating_count": Sum("rating_count"),
+        }
+
+        by_status = {s: 0 for s in Booking.Status.values}
+        for row in stats.values("status").annotate(n=Sum("bookings")):
+            by_status[row["status"]] = row["n"]
+
+        by_service = []
+        by_category = {}
+        totals = {"bookings": 0, "revenue": Decimal("0"), "rating_sum": 0, "rating_count": 0}
+        rows = stats.values("service_id", "service__name", "service__category__name").annotate(**sums)
+        for row in rows.order_by("-bookings"):
+            by_service.append({
+                "service_id": row["service_id"],
+                "service": row["service__name"],
+                "category": row["service__category__name"],
+                "bookings": row["bookings"],
+                "revenue": _money(row["revenue"]),
+                "average_rating": _average(row["rating_sum"], row["rating_count"]),
+            })
+            category = by_category.setdefault(
+                row["service__category__name"],
+                {"category": row["service__category__name"], "bookings": 0, "revenue": Decimal("0")},
+            )
+            category["bookings"] += row["bookings"]
+            category["revenue"] += row["revenue"]
+            for key in totals:
+                totals[key] += row[key]
+
+        by_city = [
+            {"city": row["city"], "bookings": row["bookings"], "revenue": _money(row["revenue"])}
+            for row in stats.values("city").annotate(
+                bookings=Sum("bookings"), revenue=Sum("revenue")
+            ).order_by("-bookings")
+        ]
+
+        # Without an explicit range, the daily series covers the last 30 days.
+        daily_stats = stats
+        if "date_from" not in dates:
+            daily_stats = daily_stats.filter(day__gte=timezone.localdate() - timedelta(days=29))
+        daily = [
+            {"day": row["day"], "bookings": row["bookings"], "revenue": _money(row["revenue"])}
+            for row in daily_stats.values("day").annotate(
+                bookings=Sum("bookings"), revenue=Sum("revenue")
+            ).order_by("day")
+        ]
+
+        return Response({
+            "date_from": dates.get("date_from"),
+            "date_to": dates.get("date_to"),
+            "totals": {
+                "bookings": totals["bookings"],
+                "revenue": _money(totals["revenue"]),
+                "reviews": totals["rating_count"],
+                "average_rating": _average(totals["rating_sum"], totals["rating_count"]),
+                "users": User.objects.count(),
+                "services": Service.objects.count(),
+            },
+            "by_status": by_status,
+            "by_category": [
+                {**c, "revenue": _money(c["revenue"])}
+                for c in sorted(by_category.values(), key=lambda c: -c["bookings"])
+            ],
+            "by_service": by_service,
+            "by_city": by_city,
+            "daily": daily,
+        })
+
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def _money(value):
+    return (value or Decimal("0")).quantize(Decimal("0.01"))
@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+This is the entry point the Procfile serves; the notification SSE stream
+(accounts/streaming.py) needs it to hold connections without a worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
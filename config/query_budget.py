@@ -0,0 +1,140 @@
+"""
+Opt-in per-request SQL instrumentation.
+
+QueryBudgetMiddleware counts the queries a request runs, times them and the
+response rendering, and reports the numbers in ``Server-Timing`` /
+``X-Query-Count`` headers. With ``QUERY_BUDGET_LOG`` set, every request is
+appended as a JSON line for the ``query_budget_report`` management command.
+Routes listed in ``QUERY_BUDGETS`` that run more queries than allowed are
+logged, or raise ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_log_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # SQL still carries placeholders here, so it doubles as the fingerprint.
+            self.statements[sql] += 1
+
+    def duplicates(self):
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+
+def request_route(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.route or match.view_name or "<unresolved>"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty sequence; shared by the
+    query_budget_report and benchmark_api commands."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._query_budget_render = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        route = request_route(request)
+        db_ms = recorder.duration * 1000
+        render_ms = request._query_budget_render * 1000
+        duplicates = recorder.duplicates()
+
+        response["X-Query-Count"] = str(recorder.count)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f"render;dur={render_ms:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+        if duplicates:
+            response["X-Query-Duplicates"] = str(sum(n - 1 for n in duplicates.values()))
+
+        self._write_log(request, response, route, recorder, db_ms, render_ms, total, duplicates)
+        self._check_budget(request, route, recorder, duplicates)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to JSON) right after this hook.
+        started = time.perf_counter()
+
+        def _rendered(_response):
+            request._query_budget_render = time.perf_counter() - started
+
+        response.add_post_render_callback(_rendered)
+        return response
+
+    def _write_log(self, request, response, route, recorder, db_ms, render_ms, total, duplicates):
+        path = getattr(settings, "QUERY_BUDGET_LOG", "")
+        if not path:
+            return
+        entry = {
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(db_ms, 3),
+            "render_ms": round(render_ms, 3),
+            "total_ms": round(total * 1000, 3),
+            "duplicates": duplicates,
+        }
+        line = json.dumps(entry) + "\n"
+        with _log_lock:
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+
+    def _check_budget(self, request, route, recorder, duplicates):
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(route)
+        if budget is None or recorder.count <= budget:
+            return
+        message = (
+            f"{request.method} /{route} ran {recorder.count} queries "
+            f"(budget {budget}, {len(duplicates)} duplicated statement(s))"
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
@@ -58,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -107,6 +109,25 @@ if os.getenv("DATABASE_URL"):
     )
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Rendered catalog payloads are keyed by services.CatalogVersion, so this
+# only bounds how long an unused version lingers in the cache.
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "3600"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -153,7 +174,7 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.jwt.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -165,6 +186,26 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+# Reverse geocoding (accounts/geocode.py): geohash cells cached in memory and
+# in GeocodeCacheEntry. GEOCODE_CLIENT is swappable for a stub.
+GEOCODE_CLIENT = os.getenv("GEOCODE_CLIENT", "accounts.geocode.NominatimClient")
+# Address cells (9 ~ 5 m) and the locality cells whose city-level fields
+# answer during an upstream outage (6 ~ 1 km).
+GEOCODE_PRECISION = int(os.getenv("GEOCODE_PRECISION", "9"))
+GEOCODE_LOCALITY_PRECISION = int(os.getenv("GEOCODE_LOCALITY_PRECISION", "6"))
+GEOCODE_TIMEOUT_SECONDS = float(os.getenv("GEOCODE_TIMEOUT_SECONDS", "5"))
+GEOCODE_CACHE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 86400)))
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", "86400"))
+GEOCODE_ERROR_TTL_SECONDS = int(os.getenv("GEOCODE_ERROR_TTL_SECONDS", "30"))
+GEOCODE_LRU_SIZE = int(os.getenv("GEOCODE_LRU_SIZE", "5000"))
+
+# Offline city gazetteer (accounts/gazetteer.py, load with load_gazetteer).
+GAZETTEER_MAX_DISTANCE_KM = float(os.getenv("GAZETTEER_MAX_DISTANCE_KM", "75"))
+GAZETTEER_REFRESH_SECONDS = float(os.getenv("GAZETTEER_REFRESH_SECONDS", "600"))
+
+# Per-process cache of JWT-authenticated users (accounts/jwt.py).
+AUTH_USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
 
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
@@ -185,6 +226,69 @@ CSRF_COOKIE_SECURE = not DEBUG
 NINZA_SMS_AUTH_KEY = os.getenv("NINZA_SMS_AUTH_KEY", "")
 NINZA_SMS_SENDER_ID = os.getenv("NINZA_SMS_SENDER_ID", "")
 NINZA_SMS_ROUTE = os.getenv("NINZA_SMS_ROUTE", "")
+NINZA_SMS_URL = os.getenv("NINZA_SMS_URL", "https://ninzasms.in.net/auth/send_sms")
+# Background OTP SMS dispatch (accounts/sms.py), per process.
+SMS_DISPATCH_WORKERS = int(os.getenv("SMS_DISPATCH_WORKERS", "4"))
+SMS_DISPATCH_QUEUE_SIZE = int(os.getenv("SMS_DISPATCH_QUEUE_SIZE", "1000"))
+SMS_MAX_ATTEMPTS = int(os.getenv("SMS_MAX_ATTEMPTS", "3"))
+SMS_RETRY_BACKOFF_SECONDS = float(os.getenv("SMS_RETRY_BACKOFF_SECONDS", "0.5"))
+SMS_TIMEOUT_SECONDS = float(os.getenv("SMS_TIMEOUT_SECONDS", "8"))
+SMS_BREAKER_THRESHOLD = int(os.getenv("SMS_BREAKER_THRESHOLD", "5"))
+SMS_BREAKER_RESET_SECONDS = float(os.getenv("SMS_BREAKER_RESET_SECONDS", "30"))
 OTP_EXPIRY_SECONDS = int(os.getenv("OTP_EXPIRY_SECONDS", "300"))
 OTP_RESEND_COOLDOWN_SECONDS = int(os.getenv("OTP_RESEND_COOLDOWN_SECONDS", "30"))
 OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+# OTP codes, cooldowns and attempts (accounts/otp.py). "cache" needs a cache
+# shared by every worker, so without Redis the PhoneOTP table is used.
+OTP_STORE = os.getenv("OTP_STORE", "cache" if os.getenv("REDIS_URL") else "database")
+OTP_CACHE_ALIAS = os.getenv("OTP_CACHE_ALIAS", "default")
+OTP_SEND_WINDOW_SECONDS = int(os.getenv("OTP_SEND_WINDOW_SECONDS", "3600"))
+OTP_SEND_LIMIT_PER_PHONE = int(os.getenv("OTP_SEND_LIMIT_PER_PHONE", "10"))
+OTP_SEND_LIMIT_PER_IP = int(os.getenv("OTP_SEND_LIMIT_PER_IP", "30"))
+OTP_VERIFY_LIMIT_PER_IP = int(os.getenv("OTP_VERIFY_LIMIT_PER_IP", "60"))
+OTP_RETENTION_HOURS = int(os.getenv("OTP_RETENTION_HOURS", "24"))
+
+# Notification outbox (bookings/outbox.py). Rows are delivered as soon as the
+# enqueuing transaction commits; drain_notification_outbox (the Procfile
+# worker) retries whatever failed there.
+NOTIFICATION_OUTBOX_FLUSH_ON_COMMIT = os.getenv("NOTIFICATION_OUTBOX_FLUSH_ON_COMMIT", "True").lower() == "true"
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", "5"))
+NOTIFICATION_OUTBOX_RETRY_SECONDS = int(os.getenv("NOTIFICATION_OUTBOX_RETRY_SECONDS", "30"))
+
+# Bookings a provider can hold per (date, time_slot); see bookings/availability.py.
+PROVIDER_SLOT_CAPACITY = int(os.getenv("PROVIDER_SLOT_CAPACITY", "1"))
+
+# Notification SSE stream (accounts/streaming.py); served under ASGI.
+NOTIFICATION_STREAM_POLL_SECONDS = float(os.getenv("NOTIFICATION_STREAM_POLL_SECONDS", "2"))
+NOTIFICATION_STREAM_KEEPALIVE_SECONDS = float(os.getenv("NOTIFICATION_STREAM_KEEPALIVE_SECONDS", "15"))
+NOTIFICATION_STREAM_MAX_SECONDS = float(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", "300"))
+# Recent rows re-read on every poll, so ones that commit out of id order are not skipped.
+NOTIFICATION_STREAM_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_STREAM_WINDOW_SECONDS", "10"))
+# Lifetime of the single-use ?ticket= a browser opens the stream with.
+NOTIFICATION_STREAM_TICKET_SECONDS = int(os.getenv("NOTIFICATION_STREAM_TICKET_SECONDS", "30"))
+
+# Read notifications older than this are deleted by purge_notifications.
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+
+# Per-request query instrumentation (config/query_budget.py). Always on under
+# `manage.py test` so QUERY_BUDGETS regressions fail the suite.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", "False").lower() == "true" or TESTING
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "False").lower() == "true" or TESTING
+QUERY_BUDGET_LOG = os.getenv("QUERY_BUDGET_LOG", "")
+# Max SQL queries per URL route, keyed by the resolved route pattern.
+QUERY_BUDGETS = {
+    "api/accounts/providers/": 4,
+    "api/accounts/notifications/": 3,
+    "api/accounts/notifications/unread-count/": 2,
+    "api/bookings/my/": 4,
+    "api/bookings/admin/all/": 4,
+    "api/bookings/provider/dashboard/": 4,
+    "api/bookings/provider/stats/": 1,
+    "api/services/categories/": 3,
+    "api/services/categories/public/": 2,
+    "api/services/<int:service_id>/providers/": 4,
+    "api/bookings/availability/<int:provider_id>/": 3,
+    "api/bookings/admin/stats/": 7,
+    "api/accounts/admin/users/": 3,
+}
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class ServicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'services'
+
+    def ready(self):
+        import services.signals
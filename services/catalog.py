@@ -0,0 +1,83 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Min, OuterRef, Subquery
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+
+from .models import CatalogVersion, Service, ServiceCategory
+from .serializers import ServiceCategorySerializer
+
+CATALOG_VERSION_ID = 1
+
+
+def catalog_version():
+    version = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).values_list("version", flat=True).first()
+    return version or 0
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog payload (and ETag) across processes."""
+    updated = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).update(version=F("version") + 1)
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=CATALOG_VERSION_ID, defaults={"version": 1})
+
+
+def refresh_starts_from(service_ids=None):
+    """Recompute Service.starts_from for the given services (all when None) in one UPDATE."""
+    from accounts.models import ProviderServicePrice
+
+    services = Service.objects.all()
+    if service_ids is not None:
+        service_ids = set(service_ids)
+        if not service_ids:
+            return 0
+        services = services.filter(id__in=service_ids)
+
+    min_price = (
+        ProviderServicePrice.objects.filter(
+            service=OuterRef("pk"),
+            provider_profile__user__is_active=True,
+        )
+        .order_by()
+        .values("service")
+        .annotate(v=Min("price"))
+        .values("v")
+    )
+    updated = services.update(starts_from=Subquery(min_price))
+    if updated:
+        bump_catalog_version()
+    return updated
+
+
+def catalog_payload(version):
+    """JSON bytes for the active catalog at ``version``, rendered once per process cache."""
+    key = f"services:catalog:v{version}"
+    payload = cache.get(key)
+    if payload is None:
+        categories = ServiceCategory.objects.filter(is_active=True).prefetch_related("services")
+        data = ServiceCategorySerializer(categories, many=True).data
+        payload = json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+        cache.set(key, payload, getattr(settings, "CATALOG_CACHE_TIMEOUT", 3600))
+    return payload
+
+
+def catalog_response(request, public=False):
+    version = catalog_version()
+    etag = f'"catalog-{version}"'
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(catalog_payload(version), content_type="application/json")
+
+    response["ETag"] = etag
+    # Clients may keep a copy but must revalidate; unchanged catalogs cost a 304.
+    if public:
+        patch_cache_control(response, no_cache=True, public=True)
+    else:
+        patch_cache_control(response, no_cache=True, private=True)
+    return response
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_starts_from(apps, schema_editor):
+    Service = apps.get_model("services", "Service")
+    ProviderServicePrice = apps.get_model("accounts", "ProviderServicePrice")
+
+    min_price = (
+        ProviderServicePrice.objects.filter(
+            service=OuterRef("pk"),
+            provider_profile__user__is_active=True,
+        )
+        .order_by()
+        .values("service")
+        .annotate(v=Min("price"))
+        .values("v")
+    )
+    Service.objects.update(starts_from=Subquery(min_price))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0004_catalogversion"),
+        ("accounts", "0005_providerserviceprice"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="starts_from",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True),
+        ),
+        migrations.RunPython(backfill_starts_from, migrations.RunPython.noop),
+    ]
@@ -20,8 +20,20 @@ class Service(models.Model):
     description = models.TextField()
     image_url = models.URLField(blank=True)
     base_price = models.DecimalField(max_digits=8, decimal_places=2)
+    # Lowest price among active providers; maintained by services.catalog.refresh_starts_from.
+    starts_from = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.name} ({self.category.name})"
+
+
+class CatalogVersion(models.Model):
+    """Single-row counter bumped whenever the public catalog changes."""
+
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
@@ -1,6 +1,5 @@
 from rest_framework import serializers
 from .models import ServiceCategory, Service
-from django.db.models import Min
 
 class ServiceSerializer(serializers.ModelSerializer):
     starts_from = serializers.SerializerMethodField()
@@ -20,10 +19,9 @@ class ServiceSerializer(serializers.ModelSerializer):
         ]
 
     def get_starts_from(self, obj):
-        min_price = obj.provider_prices.filter(
-            provider_profile__user__is_active=True
-        ).aggregate(v=Min("price"))["v"]
-        return float(min_price) if min_price is not None else float(obj.base_price)
+        if obj.starts_from is not None:
+            return float(obj.starts_from)
+        return float(obj.base_price)
 
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
@@ -54,9 +52,14 @@ class ProviderListSerializer(serializers.ModelSerializer):
         return f"{obj.user.first_name} {obj.user.last_name}".strip()
 
     def get_rating(self, obj):
+        rating = getattr(obj, "rating", None)
+        if rating is not None:
+            return rating
         return obj.user.average_rating()
 
     def get_price(self, obj):
+        if hasattr(obj, "price"):
+            return float(obj.price) if obj.price is not None else None
         service_id = self.context.get("service_id")
         if not service_id:
             return None
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import ProviderServicePrice
+from .catalog import bump_catalog_version, refresh_starts_from
+from .models import Service, ServiceCategory
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=ProviderServicePrice)
+@receiver(post_delete, sender=ProviderServicePrice)
+def provider_price_changed(sender, instance, **kwargs):
+    refresh_starts_from([instance.service_id])
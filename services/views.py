@@ -8,51 +8,84 @@ from django.utils.text import get_valid_filename
 from pathlib import Path
 from uuid import uuid4
 
+from .catalog import catalog_response
 from .models import ServiceCategory
-from .serializers import ServiceCategorySerializer, ServiceCategoryAdminSerializer, ServiceAdminSerializer
+from .serializers import ServiceCategoryAdminSerializer, ServiceAdminSerializer
 
 
 class ServiceCategoryListAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        categories = ServiceCategory.objects.filter(is_active=True)
-        serializer = ServiceCategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return catalog_response(request)
 
 
 class PublicServiceCategoryListAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        categories = ServiceCategory.objects.filter(is_active=True)
-        serializer = ServiceCategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return catalog_response(request, public=True)
 
 
 # services/views.py
-from accounts.models import ProviderProfile
+from django.db.models import F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from accounts.cities import city_key
+from accounts.models import ProviderProfile, ProviderServicePrice
+from accounts.pagination import ProviderPagination
 from .models import Service
 from .serializers import ProviderListSerializer
 
 class ServiceProvidersAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    orderings = {
+        "rating": (F("rating").asc(), "id"),
+        "-rating": (F("rating").desc(), "id"),
+        "price": (F("price").asc(nulls_last=True), "id"),
+        "-price": (F("price").desc(nulls_last=True), "id"),
+    }
+
     def get(self, request, service_id):
+        ordering = request.query_params.get("ordering") or "-rating"
+        if ordering not in self.orderings:
+            return Response(
+                {"error": f"ordering must be one of: {', '.join(self.orderings)}"},
+                status=400,
+            )
+
+        price = ProviderServicePrice.objects.filter(
+            provider_profile=OuterRef("pk"),
+            service_id=service_id,
+        ).values("price")[:1]
         providers = ProviderProfile.objects.filter(
             services__id=service_id,
             user__is_active=True
+        ).select_related(
+            "user__rating_summary",
+            "user__phone_record",
+        ).annotate(
+            rating=Coalesce(
+                "user__rating_summary__average_rating", Value(0.0), output_field=FloatField()
+            ),
+            price=Subquery(price),
         )
-        city = request.query_params.get("city")
+        city = (request.query_params.get("city") or "").strip()
         if city:
-            providers = providers.filter(city__iexact=city)
+            # Exact match on the indexed canonical key ("Bangalore" finds Bengaluru).
+            key = city_key(city)
+            providers = providers.filter(city_key=key) if key else providers.none()
 
+        providers = providers.order_by(*self.orderings[ordering])
+
+        paginator = ProviderPagination()
+        page = paginator.paginate_queryset(providers, request, view=self)
         serializer = ProviderListSerializer(
-            providers,
+            page,
             many=True,
             context={"service_id": service_id},
         )
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class AdminCategoryListCreateAPIView(APIView):
@@ -10,8 +10,11 @@
   const filterSearch = document.getElementById("filter-booking-search");
   const filterStatus = document.getElementById("filter-booking-status");
   const filterProvider = document.getElementById("filter-booking-provider");
+  const loadMoreBtn = document.getElementById("admin-bookings-load-more");
   let bookingsCache = [];
-  let providersCache = [];
+  let nextBookingsUrl = null;
+  // username -> provider id, for every provider any picker has offered.
+  const providerIds = new Map();
 
   async function refreshAccessToken() {
     const refresh = localStorage.getItem("refresh");
@@ -72,29 +75,77 @@
     return `<span class="inline-flex rounded-full border px-3 py-1 text-xs font-bold ${colors[status] || "bg-slate-100 text-slate-700 border-slate-200"}">${status.replace("_", " ")}</span>`;
   }
 
+  function firstBookingsUrl() {
+    // Status is filtered on the server so older matches are reachable with "Load more".
+    const params = new URLSearchParams({ page_size: "50" });
+    if (filterStatus?.value) params.set("status", filterStatus.value);
+    return `/api/bookings/admin/all/?${params.toString()}`;
+  }
+
+  async function loadBookings(url, append) {
+    if (loadMoreBtn) loadMoreBtn.disabled = true;
+    const res = await authFetch(url);
+    if (res.status === 401) {
+      handleUnauthorized();
+      return;
+    }
+    if (loadMoreBtn) loadMoreBtn.disabled = false;
+    if (!res.ok) return;
+
+    const page = (await res.json()) || {};
+    const results = page.results || [];
+    bookingsCache = append ? bookingsCache.concat(results) : results;
+    nextBookingsUrl = page.next || null;
+    if (loadMoreBtn) loadMoreBtn.classList.toggle("hidden", !nextBookingsUrl);
+    renderBookings();
+  }
+
   async function loadData() {
     try {
-      const [bookingsRes, providersRes] = await Promise.all([
-        authFetch("/api/bookings/admin/all/"),
-        authFetch("/api/accounts/providers/"),
-      ]);
-
-      if (bookingsRes.status === 401 || providersRes.status === 401) {
-        handleUnauthorized();
-        return;
-      }
-
-      bookingsCache = (await bookingsRes.json()) || [];
-      providersCache = (await providersRes.json()) || [];
-      renderBookings();
+      await loadBookings(firstBookingsUrl(), false);
     } catch (_) {
       // ignore
     }
   }
 
+  async function searchProviders(query) {
+    const params = new URLSearchParams({ page_size: "20" });
+    if (query) params.set("search", query);
+    const res = await authFetch(`/api/accounts/providers/?${params.toString()}`);
+    if (res.status === 401) {
+      handleUnauthorized();
+      return [];
+    }
+    if (!res.ok) return [];
+    const providers = ((await res.json()) || {}).results || [];
+    providers.forEach((p) => providerIds.set(p.username, p.id));
+    return providers;
+  }
+
+  function bindProviderPickers() {
+    document.querySelectorAll("[data-provider-search]").forEach((input) => {
+      const options = document.getElementById(input.getAttribute("list"));
+      let timer = null;
+      input.addEventListener("input", () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+          const providers = await searchProviders(input.value.trim());
+          options.innerHTML = providers
+            .map((p) => `<option value="${p.username}"></option>`)
+            .join("");
+        }, 250);
+      });
+    });
+  }
+
+  async function resolveProviderId(username) {
+    if (!username) return "";
+    if (!providerIds.has(username)) await searchProviders(username);
+    return providerIds.get(username) || "";
+  }
+
   function renderBookings() {
     const q = (filterSearch?.value || "").toLowerCase();
-    const status = filterStatus?.value || "";
     const providerQ = (filterProvider?.value || "").toLowerCase();
 
     const filtered = bookingsCache.filter((b) => {
@@ -104,9 +155,8 @@
         (b.service_name || "").toLowerCase().includes(q) ||
         (b.customer_username || "").toLowerCase().includes(q) ||
         (b.provider_username || "").toLowerCase().includes(q);
-      const matchStatus = !status || b.status === status;
       const matchProvider = !providerQ || (b.provider_username || "").toLowerCase().includes(providerQ);
-      return matchSearch && matchStatus && matchProvider;
+      return matchSearch && matchProvider;
     });
 
     list.innerHTML = "";
@@ -119,16 +169,12 @@
 
     filtered.forEach((b) => {
       const tr = document.createElement("tr");
-      const providerOptions = providersCache
-        .map((p) => `<option value="${p.id}">${p.username}</option>`)
-        .join("");
 
       const providerCell = b.provider_username
         ? `<span class="font-semibold text-slate-900">${b.provider_username}</span>`
-        : `<select class="select-modern text-sm" data-provider-select="${b.id}">
-            <option value="">Select provider</option>
-            ${providerOptions}
-          </select>`;
+        : `<input class="input-modern text-sm" placeholder="Search provider" autocomplete="off"
+            data-provider-search="${b.id}" list="provider-options-${b.id}" />
+          <datalist id="provider-options-${b.id}"></datalist>`;
 
       const actionCell = b.provider_username
         ? `<span class="text-sm text-slate-500">Assigned</span>`
@@ -146,16 +192,20 @@
     });
 
     bindAssignButtons();
+    bindProviderPickers();
   }
 
   function bindAssignButtons() {
     document.querySelectorAll("[data-assign-btn]").forEach((btn) => {
       btn.addEventListener("click", async () => {
         const bookingId = btn.getAttribute("data-assign-btn");
-        const select = document.querySelector(`[data-provider-select="${bookingId}"]`);
-        const providerId = select ? select.value : "";
+        const input = document.querySelector(`[data-provider-search="${bookingId}"]`);
+        const providerId = await resolveProviderId(input ? input.value.trim() : "");
 
-        if (!providerId) return;
+        if (!providerId) {
+          if (input) input.classList.add("border-rose-400");
+          return;
+        }
 
         const res = await authFetch(`/api/bookings/assign/${bookingId}/`, {
           method: "POST",
@@ -175,10 +225,20 @@
 
   loadData();
 
-  [filterSearch, filterStatus, filterProvider].forEach((el) => {
+  [filterSearch, filterProvider].forEach((el) => {
     if (el) {
       el.addEventListener("input", renderBookings);
       el.addEventListener("change", renderBookings);
     }
   });
+
+  if (filterStatus) {
+    filterStatus.addEventListener("change", () => loadBookings(firstBookingsUrl(), false));
+  }
+
+  if (loadMoreBtn) {
+    loadMoreBtn.addEventListener("click", () => {
+      if (nextBookingsUrl) loadBookings(nextBookingsUrl, true);
+    });
+  }
 })();
@@ -58,27 +58,19 @@
 
   async function loadCounts() {
     try {
-      const [bookingsRes, usersRes, servicesRes, reviewsRes] = await Promise.all([
-        authFetch("/api/bookings/admin/all/"),
-        authFetch("/api/accounts/admin/users/"),
-        authFetch("/api/services/admin/services/"),
-        authFetch("/api/bookings/admin/reviews/"),
-      ]);
-
-      if ([bookingsRes, usersRes, servicesRes, reviewsRes].some((r) => r.status === 401)) {
+      // One call: the server answers from daily rollups instead of raw lists.
+      const res = await authFetch("/api/bookings/admin/stats/");
+      if (res.status === 401) {
         handleUnauthorized();
         return;
       }
+      if (!res.ok) return;
 
-      const bookings = await bookingsRes.json();
-      const users = await usersRes.json();
-      const services = await servicesRes.json();
-      const reviews = await reviewsRes.json();
-
-      if (bookingsEl) bookingsEl.innerText = bookings.length || 0;
-      if (usersEl) usersEl.innerText = users.length || 0;
-      if (servicesEl) servicesEl.innerText = services.length || 0;
-      if (reviewsEl) reviewsEl.innerText = reviews.length || 0;
+      const totals = (await res.json()).totals || {};
+      if (bookingsEl) bookingsEl.innerText = totals.bookings || 0;
+      if (usersEl) usersEl.innerText = totals.users || 0;
+      if (servicesEl) servicesEl.innerText = totals.services || 0;
+      if (reviewsEl) reviewsEl.innerText = totals.reviews || 0;
     } catch {
       // ignore
     }
@@ -8,6 +8,13 @@
   const list = document.getElementById("admin-users-list");
   let servicesCache = [];
   let usersCache = [];
+  // Cursor URL of the page on screen; null means the first page for the current filters.
+  let pageUrl = null;
+  let nextUrl = null;
+  let previousUrl = null;
+  let filterTimer = null;
+  const pagePrev = document.getElementById("users-page-prev");
+  const pageNext = document.getElementById("users-page-next");
   const filterSearch = document.getElementById("filter-user-search");
   const filterRole = document.getElementById("filter-user-role");
   const filterActive = document.getElementById("filter-user-active");
@@ -69,11 +76,27 @@
     return res.json();
   }
 
+  function usersUrl() {
+    const qs = new URLSearchParams();
+    const search = (filterSearch?.value || "").trim();
+    const role = filterRole?.value || "";
+    const active = filterActive?.value || "";
+    const city = (filterCity?.value || "").trim();
+    const phone = (filterPhone?.value || "").trim();
+    if (search) qs.set("search", search);
+    if (role) qs.set("role", role);
+    if (active) qs.set("active", active);
+    if (city) qs.set("city", city);
+    if (phone) qs.set("phone", phone);
+    const query = qs.toString();
+    return `/api/accounts/admin/users/${query ? `?${query}` : ""}`;
+  }
+
   async function loadUsers() {
     try {
       const [usersRes, services] = await Promise.all([
-        authFetch("/api/accounts/admin/users/"),
-        loadServices(),
+        authFetch(pageUrl || usersUrl()),
+        servicesCache.length ? servicesCache : loadServices(),
       ]);
 
       if (usersRes.status === 401) {
@@ -82,13 +105,21 @@
       }
 
       servicesCache = services || [];
-      usersCache = (await usersRes.json()) || [];
+      const page = (await usersRes.json()) || {};
+      usersCache = page.results || [];
+      nextUrl = page.next || null;
+      previousUrl = page.previous || null;
       renderUsers();
     } catch (_) {
       // ignore
     }
   }
 
+  function renderPager() {
+    if (pagePrev) pagePrev.disabled = !previousUrl;
+    if (pageNext) pageNext.disabled = !nextUrl;
+  }
+
   function serviceChip(name) {
     return `<span class="mr-1 mb-1 inline-flex rounded-full border border-amber-200 bg-amber-50 px-3 py-1 text-xs font-semibold text-amber-900">${name}</span>`;
   }
@@ -98,27 +129,12 @@
   }
 
   function renderUsers() {
-    const q = (filterSearch?.value || "").toLowerCase();
-    const role = filterRole?.value || "";
-    const active = filterActive?.value;
-    const city = (filterCity?.value || "").toLowerCase();
-    const phone = (filterPhone?.value || "").toLowerCase();
-
-    const filtered = usersCache.filter((u) => {
-      const matchesSearch =
-        !q ||
-        (u.username || "").toLowerCase().includes(q) ||
-        (u.full_name || "").toLowerCase().includes(q) ||
-        (u.email || "").toLowerCase().includes(q);
-      const matchesRole = !role || u.role === role;
-      const matchesActive = active === "" ? true : String(u.is_active) === active;
-      const matchesCity = !city || (u.city || "").toLowerCase().includes(city);
-      const matchesPhone = !phone || (u.phone || "").toLowerCase().includes(phone);
-      return matchesSearch && matchesRole && matchesActive && matchesCity && matchesPhone;
-    });
-
     list.innerHTML = "";
-    filtered.forEach((u) => {
+    if (!usersCache.length) {
+      list.innerHTML = "<tr><td colspan='9' class='text-center text-slate-500'>No users match these filters.</td></tr>";
+    }
+    list.innerHTML = "";
+    usersCache.forEach((u) => {
       const tr = document.createElement("tr");
 
       const serviceChips = (u.provider_services || []).map((s) => serviceChip(s.name)).join("");
@@ -179,6 +195,7 @@
     bindDeleteButtons();
     bindServiceEditors();
     bindPriceEditors();
+    renderPager();
   }
 
   function bindToggleButtons() {
@@ -344,10 +361,30 @@
 
   loadUsers();
 
+  function onFilterChange() {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+      pageUrl = null;
+      loadUsers();
+    }, 300);
+  }
+
   [filterSearch, filterRole, filterActive, filterCity, filterPhone].forEach((el) => {
     if (el) {
-      el.addEventListener("input", renderUsers);
-      el.addEventListener("change", renderUsers);
+      el.addEventListener("input", onFilterChange);
+      el.addEventListener("change", onFilterChange);
     }
   });
+
+  pagePrev?.addEventListener("click", () => {
+    if (!previousUrl) return;
+    pageUrl = previousUrl;
+    loadUsers();
+  });
+
+  pageNext?.addEventListener("click", () => {
+    if (!nextUrl) return;
+    pageUrl = nextUrl;
+    loadUsers();
+  });
 })();
@@ -155,13 +155,13 @@ async function loadBookingSummary() {
 
     selectedServiceNameEl.textContent = service ? service.name : `Service #${serviceId}`;
 
-    const providersRes = await fetch(`/api/services/${serviceId}/providers/`, {
+    const providersRes = await fetch(`/api/services/${serviceId}/providers/?page_size=200`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     if (!providersRes.ok) return;
 
-    const providers = await providersRes.json();
-    const provider = (providers || []).find((p) => Number(p.user_id) === providerId);
+    const providers = ((await providersRes.json()) || {}).results || [];
+    const provider = providers.find((p) => Number(p.user_id) === providerId);
 
     if (!provider) {
       selectedProviderNameEl.textContent = `Provider #${providerId}`;
@@ -239,6 +239,25 @@ async function loadProviderServicesForSelection() {
   updateSelectedServicesCount();
 }
 
+async function loadSlotAvailability() {
+  if (!providerId || !dateInput.value) return;
+
+  const qs = new URLSearchParams({ date_from: dateInput.value, date_to: dateInput.value });
+  const res = await fetch(`/api/bookings/availability/${providerId}/?${qs.toString()}`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!res.ok) return;
+
+  const free = new Set(((await res.json()).slots || []).map((s) => s.time_slot));
+  Array.from(timeSlotInput.options).forEach((option) => {
+    option.disabled = !free.has(option.value);
+  });
+  if (timeSlotInput.selectedOptions[0]?.disabled) {
+    const firstFree = Array.from(timeSlotInput.options).find((o) => !o.disabled);
+    if (firstFree) timeSlotInput.value = firstFree.value;
+  }
+}
+
 function updateSelectedServicesCount() {
   if (!selectedServicesCountEl) return;
   selectedServicesCountEl.textContent = `${selectedServiceIds.size} selected`;
@@ -334,5 +353,8 @@ form.addEventListener("submit", async (e) => {
   }
 });
 
+dateInput.addEventListener("change", loadSlotAvailability);
+
 loadBookingSummary();
 loadProviderServicesForSelection();
+loadSlotAvailability();
@@ -5,6 +5,8 @@ if (!token) {
 
 const list = document.getElementById("booking-list");
 const empty = document.getElementById("empty");
+const loadMoreBtn = document.getElementById("load-more-bookings");
+let nextPageUrl = null;
 
 function statusBadge(status) {
   const colors = {
@@ -41,89 +43,111 @@ function updateStars(starWrap, rating) {
   });
 }
 
-fetch("/api/bookings/my/", {
-  headers: {
-    Authorization: `Bearer ${token}`,
-  },
-})
-  .then((res) => res.json())
-  .then((bookings) => {
-    list.innerHTML = "";
-
-    if (!bookings.length) {
-      empty.classList.remove("hidden");
-      return;
-    }
+function loadBookings(url, append) {
+  if (loadMoreBtn) loadMoreBtn.disabled = true;
+  return fetch(url, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  })
+    .then((res) => res.json())
+    .then((data) => {
+      nextPageUrl = (data && data.next) || null;
+      if (loadMoreBtn) {
+        loadMoreBtn.disabled = false;
+        loadMoreBtn.classList.toggle("hidden", !nextPageUrl);
+      }
+      renderBookings((data && data.results) || [], append);
+    });
+}
 
-    bookings.forEach((b) => {
-      const bookingServiceLabel = Array.isArray(b.service_names) && b.service_names.length
-        ? b.service_names.join(", ")
-        : b.service_name;
+function renderBookings(bookings, append) {
+  if (!append) list.innerHTML = "";
 
-      const card = document.createElement("div");
-      card.className = "page-shell content-inset";
+  if (!append && !bookings.length) {
+    empty.classList.remove("hidden");
+    return;
+  }
 
-      const showReviewForm = b.status === "COMPLETED" && !b.has_review;
-      const rating = b.review_rating || 0;
-      const stars = renderStars(rating);
+  bookings.forEach((b) => {
+    const bookingServiceLabel = Array.isArray(b.service_names) && b.service_names.length
+      ? b.service_names.join(", ")
+      : b.service_name;
+
+    const card = document.createElement("div");
+    card.className = "page-shell content-inset";
+
+    const showReviewForm = b.status === "COMPLETED" && !b.has_review;
+    const rating = b.review_rating || 0;
+    const stars = renderStars(rating);
+
+    const reviewMarkup = b.has_review
+      ? `
+        <div class="glass-row mt-4 p-4">
+          <p class="muted-label">Your review</p>
+          <div class="mt-2 leading-none">${stars}</div>
+          <p class="mt-2 text-sm text-slate-600">${b.review_comment || ""}</p>
+        </div>
+      `
+      : "";
 
-      const reviewMarkup = b.has_review
-        ? `
-          <div class="glass-row mt-4 p-4">
-            <p class="muted-label">Your review</p>
-            <div class="mt-2 leading-none">${stars}</div>
-            <p class="mt-2 text-sm text-slate-600">${b.review_comment || ""}</p>
+    const reviewForm = showReviewForm
+      ? `
+        <form class="mt-4 space-y-3" data-review-form="true" data-booking-id="${b.id}">
+          <div>
+            <label class="mb-2 block text-sm font-semibold text-slate-700">Rating</label>
+            <div class="flex items-center gap-1" data-stars>${renderStars(0)}</div>
+            <input type="hidden" name="rating" value="" />
           </div>
-        `
-        : "";
-
-      const reviewForm = showReviewForm
-        ? `
-          <form class="mt-4 space-y-3" data-review-form="true" data-booking-id="${b.id}">
-            <div>
-              <label class="mb-2 block text-sm font-semibold text-slate-700">Rating</label>
-              <div class="flex items-center gap-1" data-stars>${renderStars(0)}</div>
-              <input type="hidden" name="rating" value="" />
-            </div>
-            <div>
-              <label class="mb-2 block text-sm font-semibold text-slate-700">Comment</label>
-              <textarea name="comment" class="textarea-modern" rows="2"></textarea>
-            </div>
-            <button class="btn-primary px-5 py-3">Submit Review</button>
-            <p class="hidden text-sm text-red-600" data-error></p>
-          </form>
-        `
-        : "";
-
-      card.innerHTML = `
-        <div class="flex flex-col gap-4 lg:flex-row lg:items-start lg:justify-between">
           <div>
-            <div class="flex flex-wrap items-center gap-3">
-              <h3 class="section-title text-xl font-bold text-slate-900">#${b.id} ${bookingServiceLabel}</h3>
-              ${statusBadge(b.status)}
-            </div>
-            <p class="mt-2 text-sm text-slate-600">${b.category || "Service booking"}</p>
+            <label class="mb-2 block text-sm font-semibold text-slate-700">Comment</label>
+            <textarea name="comment" class="textarea-modern" rows="2"></textarea>
           </div>
-          <div class="grid grid-cols-2 gap-3 text-sm sm:grid-cols-4">
-            <div><p class="muted-label">Date</p><p class="mt-1 font-semibold text-slate-900">${b.scheduled_date}</p></div>
-            <div><p class="muted-label">Time</p><p class="mt-1 font-semibold text-slate-900">${(b.time_slot || "").replace("_", " ")}</p></div>
-            <div><p class="muted-label">Provider</p><p class="mt-1 font-semibold text-slate-900">${b.provider_full_name || b.provider_username || "Assigned"}</p></div>
-            <div><p class="muted-label">Address</p><p class="mt-1 font-semibold text-slate-900">${b.address}</p></div>
+          <button class="btn-primary px-5 py-3">Submit Review</button>
+          <p class="hidden text-sm text-red-600" data-error></p>
+        </form>
+      `
+      : "";
+
+    card.innerHTML = `
+      <div class="flex flex-col gap-4 lg:flex-row lg:items-start lg:justify-between">
+        <div>
+          <div class="flex flex-wrap items-center gap-3">
+            <h3 class="section-title text-xl font-bold text-slate-900">#${b.id} ${bookingServiceLabel}</h3>
+            ${statusBadge(b.status)}
           </div>
+          <p class="mt-2 text-sm text-slate-600">${b.category || "Service booking"}</p>
+        </div>
+        <div class="grid grid-cols-2 gap-3 text-sm sm:grid-cols-4">
+          <div><p class="muted-label">Date</p><p class="mt-1 font-semibold text-slate-900">${b.scheduled_date}</p></div>
+          <div><p class="muted-label">Time</p><p class="mt-1 font-semibold text-slate-900">${(b.time_slot || "").replace("_", " ")}</p></div>
+          <div><p class="muted-label">Provider</p><p class="mt-1 font-semibold text-slate-900">${b.provider_full_name || b.provider_username || "Assigned"}</p></div>
+          <div><p class="muted-label">Address</p><p class="mt-1 font-semibold text-slate-900">${b.address}</p></div>
         </div>
-        ${reviewMarkup}
-        ${reviewForm}
-      `;
+      </div>
+      ${reviewMarkup}
+      ${reviewForm}
+    `;
 
-      list.appendChild(card);
-    });
+    list.appendChild(card);
+  });
 
-    bindReviewForms();
+  bindReviewForms();
+}
+
+loadBookings("/api/bookings/my/?page_size=50", false);
+
+if (loadMoreBtn) {
+  loadMoreBtn.addEventListener("click", () => {
+    if (nextPageUrl) loadBookings(nextPageUrl, true);
   });
+}
 
 function bindReviewForms() {
-  const forms = document.querySelectorAll('form[data-review-form="true"]');
+  // Only forms added since the last call; earlier ones already have listeners.
+  const forms = document.querySelectorAll('form[data-review-form="true"]:not([data-bound])');
   forms.forEach((form) => {
+    form.setAttribute("data-bound", "true");
     const starWrap = form.querySelector("[data-stars]");
     const ratingInput = form.querySelector('input[name="rating"]');
 
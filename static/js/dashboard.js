@@ -70,26 +70,33 @@ async function initDashboard() {
   const ok = await ensureAccessTokenOrRedirect();
   if (!ok) return;
 
-  authFetch("/api/bookings/provider/dashboard/")
-    .then((res) => {
-      if (res.status === 401) {
+  Promise.all([
+    authFetch("/api/bookings/provider/stats/"),
+    authFetch("/api/bookings/provider/dashboard/?page_size=5"),
+  ])
+    .then(([statsRes, pageRes]) => {
+      if (statsRes.status === 401 || pageRes.status === 401) {
         localStorage.clear();
         window.location.href = "/login/";
         return null;
       }
-      return res.json();
+      return Promise.all([statsRes.json(), pageRes.json()]);
     })
-    .then((data) => {
-      if (!data) return;
+    .then((payload) => {
+      if (!payload) return;
+      const [stats, page] = payload;
+      const data = page.results || [];
+      const byStatus = stats.by_status || {};
 
-      document.getElementById("total-bookings").innerText = data.length;
-      document.getElementById("pending-bookings").innerText = data.filter((b) => b.status === "PENDING").length;
-      document.getElementById("completed-bookings").innerText = data.filter((b) => b.status === "COMPLETED").length;
+      // Totals cover every booking, not just the recent page below.
+      document.getElementById("total-bookings").innerText = stats.total || 0;
+      document.getElementById("pending-bookings").innerText = byStatus.PENDING || 0;
+      document.getElementById("completed-bookings").innerText = byStatus.COMPLETED || 0;
 
       const tbody = document.getElementById("booking-list");
       tbody.innerHTML = "";
 
-      data.slice(0, 5).forEach((b) => {
+      data.forEach((b) => {
         const tr = document.createElement("tr");
         tr.innerHTML = `
           <td>${b.service_name}</td>
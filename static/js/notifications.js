@@ -7,10 +7,17 @@ function initNotifications() {
 
   if (!bell || !dropdown || !list || !countSpan) return;
 
-  const POLL_INTERVAL_MS = 2000;
+  // Polling is only the fallback when the SSE stream is unavailable.
+  const POLL_INTERVAL_MS = 15000;
+  const STREAM_RETRY_MS = 5000;
+  const PAGE_SIZE = 30;
   let isDropdownOpen = false;
   let pollingTimer = null;
   let inFlight = false;
+  let items = [];
+  let lastId = 0;
+  let unreadCount = null;
+  let stream = null;
 
   async function refreshAccessToken() {
     const refresh = localStorage.getItem("refresh");
@@ -59,6 +66,15 @@ function initNotifications() {
     window.location.href = "/login/";
   }
 
+  function mergeNotifications(incoming) {
+    const known = new Set(items.map((n) => n.id));
+    const fresh = incoming.filter((n) => !known.has(n.id));
+    items = [...fresh, ...items].sort((a, b) => b.id - a.id);
+    items.forEach((n) => {
+      if (n.id > lastId) lastId = n.id;
+    });
+  }
+
   function renderNotifications(data) {
     list.innerHTML = "";
     let unread = 0;
@@ -83,6 +99,7 @@ function initNotifications() {
       list.appendChild(li);
     }
 
+    if (unreadCount !== null) unread = unreadCount;
     if (unread > 0) {
       countSpan.innerText = unread;
       countSpan.classList.remove("hidden");
@@ -91,7 +108,7 @@ function initNotifications() {
     }
   }
 
-  async function loadNotifications({ showLoading = false } = {}) {
+  async function loadNotifications({ showLoading = false, incremental = false } = {}) {
     if (inFlight) return;
     const token = localStorage.getItem("access");
     if (!token) return;
@@ -102,20 +119,80 @@ function initNotifications() {
     }
 
     try {
-      const res = await authFetch("/api/accounts/notifications/");
-      if (res.status === 401) {
+      const url = incremental && lastId
+        ? `/api/accounts/notifications/?since_id=${lastId}&page_size=100`
+        : `/api/accounts/notifications/?page_size=${PAGE_SIZE}`;
+      const [res, countRes] = await Promise.all([
+        authFetch(url),
+        authFetch("/api/accounts/notifications/unread-count/"),
+      ]);
+      if (res.status === 401 || countRes.status === 401) {
         handleUnauthorized();
         return;
       }
       if (!res.ok) return;
 
-      const data = await res.json();
-      renderNotifications(data || []);
+      const data = (await res.json()).results || [];
+      if (incremental) {
+        mergeNotifications(data);
+      } else {
+        items = [];
+        lastId = 0;
+        mergeNotifications(data);
+      }
+      // The dropdown only shows the newest page; older ones stay on the server.
+      items = items.slice(0, PAGE_SIZE);
+      if (countRes.ok) {
+        unreadCount = (await countRes.json()).unread_count;
+      }
+      renderNotifications(items);
     } finally {
       inFlight = false;
     }
   }
 
+  async function openStream() {
+    if (!localStorage.getItem("access") || !window.EventSource) {
+      startPolling();
+      return;
+    }
+
+    // A short-lived, single-use ticket keeps the JWT out of the URL (and access logs).
+    const ticketRes = await authFetch("/api/accounts/notifications/stream/ticket/", { method: "POST" });
+    if (!ticketRes.ok) {
+      startPolling();
+      window.setTimeout(openStream, STREAM_RETRY_MS);
+      return;
+    }
+    const { ticket } = await ticketRes.json();
+
+    const qs = new URLSearchParams({ ticket });
+    if (lastId) qs.set("since_id", String(lastId));
+    stream = new EventSource(`/api/accounts/notifications/stream/?${qs.toString()}`);
+
+    stream.addEventListener("open", stopPolling);
+    stream.addEventListener("notification", (event) => {
+      mergeNotifications([JSON.parse(event.data)]);
+      renderNotifications(items);
+    });
+    stream.addEventListener("unread", (event) => {
+      unreadCount = JSON.parse(event.data).unread_count;
+      renderNotifications(items);
+    });
+    stream.addEventListener("error", () => {
+      // Stream ended (its ticket is spent) or no ASGI server: poll until a new ticket reopens it.
+      closeStream();
+      startPolling();
+      window.setTimeout(openStream, STREAM_RETRY_MS);
+    });
+  }
+
+  function closeStream() {
+    if (!stream) return;
+    stream.close();
+    stream = null;
+  }
+
   async function markRead(id) {
     const res = await authFetch(`/api/accounts/notifications/read/${id}/`, {
       method: "POST",
@@ -131,7 +208,7 @@ function initNotifications() {
     if (pollingTimer) return;
     pollingTimer = window.setInterval(() => {
       if (document.visibilityState === "visible") {
-        loadNotifications();
+        loadNotifications({ incremental: true });
       }
     }, POLL_INTERVAL_MS);
   }
@@ -170,11 +247,13 @@ function initNotifications() {
     });
   }
 
-  // Initial unread count refresh and background updates.
-  loadNotifications();
-  startPolling();
+  // Initial load, then live updates over the SSE stream.
+  loadNotifications().then(openStream);
 
-  window.addEventListener("beforeunload", stopPolling);
+  window.addEventListener("beforeunload", () => {
+    stopPolling();
+    closeStream();
+  });
 }
 
 if (document.readyState === "loading") {
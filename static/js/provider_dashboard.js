@@ -19,8 +19,10 @@ const pendingEl = document.getElementById("provider-pending-bookings");
 const confirmedEl = document.getElementById("provider-confirmed-bookings");
 const inProgressEl = document.getElementById("provider-inprogress-bookings");
 const completedEl = document.getElementById("provider-completed-bookings");
+const loadMoreBtn = document.getElementById("provider-load-more");
 
 let bookingsCache = [];
+let nextBookingsUrl = null;
 let allServicesById = new Map();
 let availableServices = [];
 let myServices = [];
@@ -212,34 +214,49 @@ function renderOverviewSection() {
   });
 }
 
-function renderStats() {
-  const total = bookingsCache.length;
-  const pending = bookingsCache.filter((b) => b.status === "PENDING").length;
-  const confirmed = bookingsCache.filter((b) => b.status === "CONFIRMED").length;
-  const inProgress = bookingsCache.filter((b) => b.status === "IN_PROGRESS").length;
-  const completed = bookingsCache.filter((b) => b.status === "COMPLETED").length;
-
-  if (totalEl) totalEl.innerText = total;
-  if (pendingEl) pendingEl.innerText = pending;
-  if (confirmedEl) confirmedEl.innerText = confirmed;
-  if (inProgressEl) inProgressEl.innerText = inProgress;
-  if (completedEl) completedEl.innerText = completed;
+// Counts come from the stats endpoint so they cover every booking, not just the loaded pages.
+async function loadStats() {
+  const res = await authFetch("/api/bookings/provider/stats/");
+  if (!res.ok) return;
+
+  const stats = (await res.json()) || {};
+  const byStatus = stats.by_status || {};
+  if (totalEl) totalEl.innerText = stats.total || 0;
+  if (pendingEl) pendingEl.innerText = byStatus.PENDING || 0;
+  if (confirmedEl) confirmedEl.innerText = byStatus.CONFIRMED || 0;
+  if (inProgressEl) inProgressEl.innerText = byStatus.IN_PROGRESS || 0;
+  if (completedEl) completedEl.innerText = byStatus.COMPLETED || 0;
 }
 
-async function loadBookings() {
-  const res = await authFetch("/api/bookings/provider/dashboard/");
+async function loadBookings(url = "/api/bookings/provider/dashboard/?page_size=50", append = false) {
+  if (loadMoreBtn) loadMoreBtn.disabled = true;
+  const res = await authFetch(url);
   if (res.status === 401) {
     handleUnauthorized();
     return;
   }
+  if (loadMoreBtn) loadMoreBtn.disabled = false;
   if (!res.ok) return;
 
-  bookingsCache = await res.json();
-  renderStats();
-  renderOverviewSection();
+  const page = (await res.json()) || {};
+  const results = page.results || [];
+  bookingsCache = append ? bookingsCache.concat(results) : results;
+  nextBookingsUrl = page.next || null;
+  if (loadMoreBtn) loadMoreBtn.classList.toggle("hidden", !nextBookingsUrl);
+
+  if (!append) {
+    loadStats();
+    renderOverviewSection();
+  }
   renderBookingsSection();
 }
 
+if (loadMoreBtn) {
+  loadMoreBtn.addEventListener("click", () => {
+    if (nextBookingsUrl) loadBookings(nextBookingsUrl, true);
+  });
+}
+
 function renderServicePicker() {
   if (!servicePicker) return;
   servicePicker.innerHTML = "";
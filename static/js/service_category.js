@@ -312,10 +312,10 @@ async function loadProviders() {
   }
 
   const city = localStorage.getItem("location_city") || "";
-  const qs = new URLSearchParams();
+  const qs = new URLSearchParams({ page_size: "200" });
   if (city) qs.set("city", city);
 
-  const url = `/api/services/${selectedServiceId}/providers/${qs.toString() ? `?${qs.toString()}` : ""}`;
+  const url = `/api/services/${selectedServiceId}/providers/?${qs.toString()}`;
   const res = await authFetch(url);
 
   if (res.status === 401) {
@@ -328,7 +328,7 @@ async function loadProviders() {
     return;
   }
 
-  providersCache = (await res.json()) || [];
+  providersCache = ((await res.json()) || {}).results || [];
   renderProviders();
 }
 